@@ -29,11 +29,50 @@ class OpenCVCamera:
                 
             return frame
         return None
+
+    def get_raw_frame(self):
+        # BGR frame straight from the camera; FrameRenderer does the conversion and orientation
+        ret, frame = self.cap.read()
+        return frame if ret else None
         
     def release(self):
         if self.cap.isOpened():
             self.cap.release()
 
+class FrameRenderer:
+    # Draws camera frames to the screen the way the old cvtColor/rotate/rot90/make_surface/
+    # rotate/smoothscale chain did (frame rows run along the screen's x axis), in two passes:
+    # one cv.resize and one transpose (or flip, for portrait frames) into a preallocated buffer.
+    # The surface wraps that buffer in BGR order, so there is no color conversion and no copy
+    # before the blit.
+    def __init__(self):
+        self.key = None
+        self.resized = None
+        self.buffer = None
+        self.surface = None
+
+    def allocate(self, frame_shape, screen_size):
+        width, height = screen_size
+        if frame_shape[0] > frame_shape[1]:
+            # The old path rotated portrait frames clockwise, which with the transpose is a vertical flip
+            self.resized = np.empty((height, width, 3), dtype=np.uint8)
+        else:
+            self.resized = np.empty((width, height, 3), dtype=np.uint8)
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.buffer, (width, height), "BGR")
+        self.key = (frame_shape, screen_size)
+
+    def render(self, frame, screen):
+        screen_size = screen.get_size()
+        if self.key != (frame.shape, screen_size):
+            self.allocate(frame.shape, screen_size)
+        cv.resize(frame, self.resized.shape[1::-1], dst=self.resized, interpolation=cv.INTER_LINEAR)
+        if frame.shape[0] > frame.shape[1]:
+            cv.flip(self.resized, 0, dst=self.buffer)
+        else:
+            cv.transpose(self.resized, dst=self.buffer)
+        screen.blit(self.surface, (0, 0))
+
 class PygameDisplay:
     def __init__(self, width=1280, height=1720):  # Default to landscape aspect ratio
         pygame.init()
@@ -60,6 +99,7 @@ class CameraApp:
         display_width = max(self.camera.width, self.camera.height)
         display_height = min(self.camera.width, self.camera.height)
         self.display = PygameDisplay(display_width, display_height)
+        self.renderer = FrameRenderer()
 
         self.image_sizes = (75, 75)
 
@@ -135,14 +175,11 @@ class CameraApp:
 
         running = True
         while running:
-            frame = self.camera.get_frame()
+            frame = self.camera.get_raw_frame()
             if frame is None:
                 break
 
-            frame_surface = pygame.surfarray.make_surface(np.rot90(frame))
-            rotated_surface = pygame.transform.rotate(frame_surface, 90)
-            rotated_surface = pygame.transform.smoothscale(rotated_surface, (self.display.screen.get_width(), self.display.screen.get_height()))
-            self.display.screen.blit(rotated_surface, (0, 0))
+            self.renderer.render(frame, self.display.screen)
             self.location()
             pygame.display.flip()
             running = self.display.process_events()
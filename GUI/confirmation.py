@@ -5,9 +5,10 @@ import subprocess
 import time  # Keep this import
 from pygame import *
 
-pygame.init()
-screen = pygame.display.set_mode((1920, 1080), pygame.FULLSCREEN)
-pygame.display.set_caption("Confirmation")
+# Shared scanner modules live one folder up
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")))
+from scan_channel import FileChannel, receive_from_stdin
+from scan_store import ScanStore, DEFAULT_STORE_PATH
 
 # Colors
 RED = (255, 0, 0)
@@ -17,11 +18,6 @@ FONT_COLOR = "black"
 BACKGROUND = "white"
 BLUE = (0, 0, 255)
 
-# Fonts
-font = pygame.font.SysFont("arial", 30)
-big_font = pygame.font.SysFont("arial", 40)
-title_font = pygame.font.SysFont("arial", 50)
-
 def load_scan_data():
     """Load scanned data from temp file"""
     try:
@@ -81,29 +77,32 @@ def restart_scanner():
         pygame.quit()
         sys.exit(1)
 
-def confirm_and_save():
-    """Confirm the data and save to final file"""
+def already_confirmed_notice(store, student_no):
+    """Warning text if this student was confirmed earlier today, else "" """
     try:
-        # Load current data
-        student_no, name = load_scan_data()
-        
-        # Create confirmed_scans directory if it doesn't exist
-        confirmed_dir = "confirmed_scans"
-        if not os.path.exists(confirmed_dir):
-            os.makedirs(confirmed_dir)
-        
-        # Save confirmed data
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        confirmed_file = os.path.join(confirmed_dir, f"confirmed_scan_{timestamp}.txt")
+        if student_no and store.confirmed_today(student_no):
+            return "Already confirmed today"
+    except Exception as e:
+        print(f"Error checking scan store: {e}")
+    return ""
+
+def confirm_and_save(student_no=None, name=None, store=None, confidence=None):
+    """Confirm the data and save it to the scan store"""
+    try:
+        # Load current data (from the temp file when the scanner ran as a separate process)
+        if student_no is None or name is None:
+            student_no, name = load_scan_data()
         
-        with open(confirmed_file, "w") as f:
-            f.write(f"Confirmation Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"STUDENT NO: {student_no}\n")
-            f.write(f"NAME: {name}\n")
-            f.write(f"STATUS: CONFIRMED\n")
+        # Save confirmed data; a store we opened ourselves is closed (and flushed) straight away
+        own_store = store is None
+        if own_store:
+            store = ScanStore(DEFAULT_STORE_PATH)
+        store.add_confirmed(student_no, name, confidence=confidence, source="confirmation")
+        store.flush()
+        if own_store:
+            store.close()
         
-        print(f"Confirmed data saved to: {confirmed_file}")
+        print(f"Confirmed data saved to: {store.path}")
         
         # Clean up temp file
         temp_file_path = os.path.join(os.path.dirname(__file__), "temp_scan_data.txt")
@@ -116,7 +115,7 @@ def confirm_and_save():
         return False
 
 class Button():
-    def __init__(self, x, y, width, height, text, color):
+    def __init__(self, x, y, width, height, text, color, font):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.hover_color = HOVER_COLOR
@@ -132,56 +131,133 @@ class Button():
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
 
-# Load data
-student_no, name = load_scan_data()
+class ConfirmationScreen():
+    """Confirmation screen that can be drawn into any pygame window"""
+    def __init__(self):
+        # Fonts
+        self.font = pygame.font.SysFont("arial", 30)
+        self.big_font = pygame.font.SysFont("arial", 40)
+        self.title_font = pygame.font.SysFont("arial", 50)
 
-# Create buttons - positioned better for all data
-cancel_button = Button(200, 600, 200, 80, "Cancel", RED)
-confirm_button = Button(500, 600, 200, 80, "Confirm", GREEN)
+        # Create buttons - positioned better for all data
+        self.cancel_button = Button(200, 600, 200, 80, "Cancel", RED, self.font)
+        self.confirm_button = Button(500, 600, 200, 80, "Confirm", GREEN, self.font)
 
-# Main loop
-running = True
-clock = pygame.time.Clock()
+        self.student_no = ""
+        self.name = ""
+        self.notice = ""
 
-print("Confirmation screen started")
-print(f"Loaded data: {student_no}, {name}")
+    def set_data(self, student_no, name, notice=""):
+        self.student_no = student_no
+        self.name = name
+        self.notice = notice  # Shown in red under the data, e.g. a repeat scan
 
-while running:
-    for event in pygame.event.get():
+    def handle_event(self, event):
+        """Return "confirm", "cancel" or None for a pygame event"""
         if event.type == pygame.QUIT:
-            restart_scanner()
-            
+            return "cancel"
+
         if event.type == pygame.KEYDOWN:
             if event.key == K_ESCAPE:
-                restart_scanner()
+                return "cancel"
             elif event.key == K_RETURN:
-                if confirm_and_save():
-                    print("Data confirmed and saved successfully")
-                    # Show a brief confirmation message before restarting
-                    screen.fill(BACKGROUND)
-                    success_text = big_font.render("Data Saved Successfully!", True, GREEN)
-                    screen.blit(success_text, (screen.get_width()//2 - success_text.get_width()//2, screen.get_height()//2))
-                    pygame.display.flip()
-                    
-                    # Brief pause to show the message
-                    import time as time_module
-                    time_module.sleep(1.5)
-                    
-                    restart_scanner()
-                else:
-                    print("Failed to save data")
-                
+                return "confirm"
+
         if event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = pygame.mouse.get_pos()
-            if cancel_button.is_clicked(mouse_pos):
+            if self.cancel_button.is_clicked(mouse_pos):
+                return "cancel"
+            elif self.confirm_button.is_clicked(mouse_pos):
+                return "confirm"
+
+        return None
+
+    def draw(self, screen):
+        # Draw everything
+        screen.fill(BACKGROUND)
+        
+        # Title
+        title = self.title_font.render("Confirm Student Information", True, BLUE)
+        screen.blit(title, (screen.get_width()//2 - title.get_width()//2, 50))
+        
+        # Display boxes - made smaller since we have less data
+        info_box = pygame.Rect(100, 150, 700, 300)
+        pygame.draw.rect(screen, (240, 240, 240), info_box, border_radius=10)
+        pygame.draw.rect(screen, (200, 200, 200), info_box, 2, border_radius=10)
+        
+        # Display data with better spacing
+        y_offset = 200
+        line_spacing = 70
+        
+        # Student Number
+        id_label = self.big_font.render("Student No:", True, FONT_COLOR)
+        screen.blit(id_label, (150, y_offset))
+        id_text = self.big_font.render(self.student_no if self.student_no else "Not found", True, BLUE)
+        screen.blit(id_text, (350, y_offset))
+        
+        # Name
+        y_offset += line_spacing
+        name_label = self.big_font.render("Name:", True, FONT_COLOR)
+        screen.blit(name_label, (150, y_offset))
+        name_text = self.big_font.render(self.name if self.name else "Not found", True, BLUE)
+        screen.blit(name_text, (350, y_offset))
+
+        if self.notice:
+            y_offset += line_spacing
+            notice_text = self.font.render(self.notice, True, RED)
+            screen.blit(notice_text, (150, y_offset))
+
+        # Draw buttons
+        self.cancel_button.draw(screen)
+        self.confirm_button.draw(screen)
+        
+        # Instructions
+        instruction_text = self.font.render("Press ESC to cancel, ENTER to confirm, or click buttons", True, FONT_COLOR)
+        screen.blit(instruction_text, (screen.get_width()//2 - instruction_text.get_width()//2, 720))
+
+    def draw_saved(self, screen):
+        # Show a brief confirmation message
+        screen.fill(BACKGROUND)
+        success_text = self.big_font.render("Data Saved Successfully!", True, GREEN)
+        screen.blit(success_text, (screen.get_width()//2 - success_text.get_width()//2, screen.get_height()//2))
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080), pygame.FULLSCREEN)
+    pygame.display.set_caption("Confirmation")
+
+    # Load data - piped in by the scanner, or the old temp file if it was started without a pipe
+    record = receive_from_stdin() if "--scan-record-stdin" in sys.argv else None
+    if record is None:
+        record = FileChannel(os.path.join(os.path.dirname(__file__), "temp_scan_data.txt")).receive()
+    if record is not None:
+        student_no, name = record.student_no, record.name
+    else:
+        print("No scan data received, using default values")
+        student_no, name = "Not found", "Not found"
+
+    store = ScanStore(DEFAULT_STORE_PATH)
+    confirmation = ConfirmationScreen()
+    confirmation.set_data(student_no, name, already_confirmed_notice(store, student_no))
+
+    # Main loop
+    running = True
+    clock = pygame.time.Clock()
+
+    print("Confirmation screen started")
+    print(f"Loaded data: {student_no}, {name}")
+
+    while running:
+        for event in pygame.event.get():
+            action = confirmation.handle_event(event)
+
+            if action == "cancel":
                 restart_scanner()
-            elif confirm_button.is_clicked(mouse_pos):
-                if confirm_and_save():
+            elif action == "confirm":
+                if confirm_and_save(student_no, name, store, record.confidence if record else None):
                     print("Data confirmed and saved successfully")
                     # Show a brief confirmation message before restarting
-                    screen.fill(BACKGROUND)
-                    success_text = big_font.render("Data Saved Successfully!", True, GREEN)
-                    screen.blit(success_text, (screen.get_width()//2 - success_text.get_width()//2, screen.get_height()//2))
+                    confirmation.draw_saved(screen)
                     pygame.display.flip()
                     
                     # Brief pause to show the message
@@ -192,47 +268,15 @@ while running:
                 else:
                     print("Failed to save data")
 
-    # Draw everything
-    screen.fill(BACKGROUND)
-    
-    # Title
-    title = title_font.render("Confirm Student Information", True, BLUE)
-    screen.blit(title, (screen.get_width()//2 - title.get_width()//2, 50))
-    
-    # Display boxes - made smaller since we have less data
-    info_box = pygame.Rect(100, 150, 700, 300)
-    pygame.draw.rect(screen, (240, 240, 240), info_box, border_radius=10)
-    pygame.draw.rect(screen, (200, 200, 200), info_box, 2, border_radius=10)
-    
-    # Display data with better spacing
-    y_offset = 200
-    line_spacing = 70
-    
-    # Student Number
-    id_label = big_font.render("Student No:", True, FONT_COLOR)
-    screen.blit(id_label, (150, y_offset))
-    id_text = big_font.render(student_no if student_no else "Not found", True, BLUE)
-    screen.blit(id_text, (350, y_offset))
-    
-    # Name
-    y_offset += line_spacing
-    name_label = big_font.render("Name:", True, FONT_COLOR)
-    screen.blit(name_label, (150, y_offset))
-    name_text = big_font.render(name if name else "Not found", True, BLUE)
-    screen.blit(name_text, (350, y_offset))
-
-    # Draw buttons
-    cancel_button.draw(screen)
-    confirm_button.draw(screen)
-    
-    # Instructions
-    instruction_text = font.render("Press ESC to cancel, ENTER to confirm, or click buttons", True, FONT_COLOR)
-    screen.blit(instruction_text, (screen.get_width()//2 - instruction_text.get_width()//2, 720))
-    
-    # Update display
-    pygame.display.flip()
-    clock.tick(60)
-
-# Cleanup
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        confirmation.draw(screen)
+        
+        # Update display
+        pygame.display.flip()
+        clock.tick(60)
+
+    # Cleanup
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
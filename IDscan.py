@@ -1,185 +1,166 @@
 import cv2
-import pytesseract
-import re
 import numpy as np
-from datetime import datetime
 import os
 import sys
 import subprocess
-import pygame
 import time
+import argparse
+import signal
+from frame_grabber import FrameGrabber
+from ocr_worker import OCRExecutor
+from ocr_backends import create_ocr_backend
+from presence_gate import CardPresenceGate
+from card_locator import CardLocator
+from field_voting import FieldVoter
+from frame_sources import CameraSource, add_source_arguments, create_frame_source
+from scan_events import JsonLinesEventSink, make_event
+from overlay_cache import OverlayCache
+from scan_channel import ScanRecord, PipeChannel, FileChannel
+from scan_store import ScanStore, DEFAULT_STORE_PATH
+from recent_scans import RecentScanCache
+from roster import Roster
+from field_extractor import FieldExtractor
+from text_scale import TextScaler, DEFAULT_TEXT_HEIGHT
+from code_reader import CodeReader
+from frame_quality import BestFrameSelector
+from digit_reader import TemplateDigitBackend, add_digit_templates, DEFAULT_TEMPLATES_PATH, BUILTIN_TEMPLATES
+from pipeline_metrics import PipelineMetrics, add_metrics_arguments, create_metrics
+from scan_trace import ScanTracer, add_trace_arguments, create_tracer
+from scan_pipeline import AsyncScanPipeline
 
 class IDScanner:
-    def __init__(self):
-        self.cap = None
-        self.camera_index = 0
+    def __init__(self, frame_source=None, ocr_workers=1, ocr_use_processes=False, ocr_backend="pytesseract",
+                 card_layout=None, headless=False, event_callback=None, scan_channel=None, file_handoff=False,
+                 scan_store=None, roster=None, metrics=None, tracer=None, ocr_executor=None, lane=None,
+                 ocr_text_height=DEFAULT_TEXT_HEIGHT, digit_templates=DEFAULT_TEMPLATES_PATH,
+                 read_codes=True):
+        # Live camera by default; video files, image folders and synthetic feeds replay the same way
+        self.frame_source = frame_source if frame_source is not None else CameraSource()
+        
+        # Per-stage latency histograms and counters; the HUD shows them on screen ('d' toggles it)
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.show_hud = False
+        self.card_seen_at = None  # When the current card first appeared, for time to ID
+        self.card_count = 0
+        
+        # Opt-in per-scan spans (a disabled tracer records nothing)
+        self.tracer = tracer if tracer is not None else ScanTracer(enabled=False)
+        
+        # Name of this scanner when it is one lane of several (tags events and stored scans)
+        self.lane = lane
+        
+        # Headless mode skips the window and overlay and reports results as events instead
+        self.headless = headless
+        self.stop_requested = False  # Set from another thread to end run_headless
+        self.persist_handler = None  # AsyncScanPipeline routes completed scans through its persist stage
+        self.confirmation_handler = None  # ... and launches confirmation only once it has shut down
+        self.event_callback = event_callback
+        self.awaiting_card_removal = False  # Headless: one result per card
+        
+        # Completed scans go to this channel instead of a newly launched confirmation process (kiosk mode)
+        self.scan_channel = scan_channel
+        # Hand data to a separately launched confirmation screen through the old temp file instead of a pipe
+        self.file_handoff = file_handoff
+        
+        # Overlay layers are prerendered and only redrawn when their content changes
+        self.overlay_cache = OverlayCache()
         self.last_scanned_data = {"student_no": "", "name": ""}
         
-        # Create directory for saved text files
-        self.text_output_dir = "id_text_output"
-        if not os.path.exists(self.text_output_dir):
-            os.makedirs(self.text_output_dir)
+        # Every detection is recorded in the indexed scan store (batched writes, no file per scan)
+        self.scan_store = scan_store if scan_store is not None else ScanStore(DEFAULT_STORE_PATH)
+        self.scan_store.metrics = self.metrics
+        self.scan_store.tracer = self.tracer if self.tracer.enabled else None
+        
+        # Students confirmed in the last few minutes: a student number read that matches one
+        # completes the scan straight away with the remembered name
+        self.recent_scans = RecentScanCache(capacity=256, ttl=900.0)
+        self.recent_scans.load(self.scan_store.recent_confirmed(time.time() - self.recent_scans.ttl))
+        
+        # Optional enrolled roster: near-miss reads snap to the closest enrolled student
+        self.roster = roster
+        
+        # (student_no, name, "recent" or "roster") once the current card is identified without voting
+        self.known_student = None
         
         # Auto-scanning variables
         self.last_scan_time = 0
-        self.scan_interval = 5.0  # Changed to 5 seconds
+        self.scan_interval = 1.0  # Minimum gap between OCR passes while the same card stays in view
         self.scanning_active = True
         self.current_scan_data = {"student_no": "", "name": ""}
         
-        # ID detection tracking
-        self.last_id_detection_time = 0
-        self.id_detection_timeout = 3.0  # Reset data if no ID detected for 3 seconds
-        
-        # Initialize camera with better error handling
-        self.initialize_camera()
-    
-    def find_available_cameras(self):
-        """Find all available camera indices"""
-        available_cameras = []
-        for i in range(5):  # Check first 5 camera indices
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                ret, _ = cap.read()
-                if ret:
-                    available_cameras.append(i)
-                    print(f"Found working camera at index {i}")
-                cap.release()
-            time.sleep(0.1)  # Small delay between attempts
-        return available_cameras
-
-    
-    def initialize_camera(self):
-        """Initialize camera with multiple fallback options"""
-        print("Initializing camera...")
+        # Readings are voted on across passes so one bad read cannot replace a good one
+        self.field_voter = FieldVoter(fields=("student_no", "name"), quorum=2)
         
-        # Find available cameras
-        available_cameras = self.find_available_cameras()
+        # OCR only runs once a card is present and steady in the scan area
+        self.presence_gate = CardPresenceGate(rescan_interval=self.scan_interval)
         
-        if not available_cameras:
-            print("No cameras found!")
-            return False
+        # The sharpest, least glared frame since the last pass is OCR'd, not whichever frame triggered it
+        self.frame_selector = BestFrameSelector()
         
-        # Try each available camera
-        for cam_index in available_cameras:
-            print(f"Trying camera index {cam_index}...")
-            
-            # Try different backends
-            backends = [
-                cv2.CAP_DSHOW,      # DirectShow (Windows)
-                cv2.CAP_MSMF,       # Microsoft Media Foundation
-                cv2.CAP_V4L2,       # Video4Linux (Linux)
-                cv2.CAP_ANY         # Auto-detect
-            ]
-            
-            for backend in backends:
-                try:
-                    if self.cap is not None:
-                        self.cap.release()
-                        time.sleep(0.2)
-                    
-                    print(f"  Trying backend: {backend}")
-                    self.cap = cv2.VideoCapture(cam_index, backend)
-                    
-                    if not self.cap.isOpened():
-                        continue
-                    
-                    # Set buffer size to reduce latency
-                    self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                    
-                    # Test if we can actually read frames
-                    ret, frame = self.cap.read()
-                    if ret and frame is not None:
-                        print(f"✓ Camera {cam_index} working with backend {backend}")
-                        
-                        # Try to set resolution (don't fail if it doesn't work)
-                        try:
-                            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-                            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-                        except:
-                            pass
-                        
-                        self.camera_index = cam_index
-                        return True
-                        
-                except Exception as e:
-                    print(f"  Backend {backend} failed: {e}")
-                    continue
+        # Card is flattened and only the configured field rectangles are OCR'd
+        self.card_locator = CardLocator(card_layout)
         
-        print("❌ Failed to initialize any camera")
-        return False
+        # Field patterns, label blacklist and name rules are compiled once here
+        self.field_extractor = FieldExtractor()
+        
+        # QR codes and barcodes are tried before OCR; a decoded number needs no voting
+        self.code_reader = CodeReader() if read_codes else None
+        self.code_reading = None
+        self.code_checked = False  # An OCR read of the number has been compared with the decoded code
+        self.code_attempts_per_card = 2  # Cards without a code stop paying for the detectors after this
+        self.code_attempts_left = self.code_attempts_per_card
+        
+        # Crops are resampled so their text is a size tesseract reads well (0 turns this off)
+        self.text_scaler = TextScaler(target_height=ocr_text_height) if ocr_text_height else None
+        
+        # ID detection tracking
+        self.last_id_detection_time = 0
+        self.id_detection_timeout = 10.0  # Reset data if no ID detected for 10 seconds
+        
+        # OCR runs on a worker pool so the preview never freezes; lanes pass in their share of a common pool
+        if ocr_executor is not None:
+            self.ocr_executor = ocr_executor
+        else:
+            self.ocr_backend = create_ocr_backend(ocr_backend)
+            if digit_templates is not None:
+                # Student numbers are matched against digit templates; tesseract only reads the ones they miss
+                self.ocr_backend = add_digit_templates(self.ocr_backend, digit_templates)
+            self.ocr_executor = OCRExecutor(self.ocr_backend.read_regions,
+                                            max_workers=ocr_workers, use_processes=ocr_use_processes)
+        
+        # Initialize camera (or replay source) with better error handling
+        self.frame_source.open()
+        
+        # Capture runs on its own thread so slow stages never back up the camera
+        self.frame_grabber = FrameGrabber(self.frame_source, metrics=self.metrics,
+                                          tracer=self.tracer if self.tracer.enabled else None)
     
-    def reconnect_camera(self):
-        """Attempt to reconnect the camera"""
-        print("Attempting to reconnect camera...")
-        if self.cap is not None:
-            self.cap.release()
-            time.sleep(1)  # Wait a bit before reconnecting
-        
-        return self.initialize_camera()
-    
-    def safe_read_frame(self):
-        """Safely read a frame with error handling"""
-        max_retries = 3
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            if self.cap is None or not self.cap.isOpened():
-                print("Camera not opened, attempting to reconnect...")
-                if not self.reconnect_camera():
-                    return False, None
-            
-            try:
-                ret, frame = self.cap.read()
-                if ret and frame is not None:
-                    return True, frame
-                else:
-                    print(f"Failed to read frame (attempt {retry_count + 1})")
-                    retry_count += 1
-                    time.sleep(0.1)
-                    
-            except Exception as e:
-                print(f"Exception reading frame: {e}")
-                retry_count += 1
-                time.sleep(0.1)
-        
-        # If all retries failed, try to reconnect
-        print("All frame read attempts failed, trying to reconnect camera...")
-        if self.reconnect_camera():
-            try:
-                return self.cap.read()
-            except:
-                return False, None
-        
-        return False, None
-    
-    def save_temp_scan_data(self, student_no, name):
-        """Save scan data to temp file for confirmation screen"""
-        try:
-            # Save to GUI folder (parent directory)
-            temp_file_path = os.path.join(os.path.dirname(__file__), "..", "GUI", "temp_scan_data.txt")
-            temp_file_path = os.path.normpath(temp_file_path)
-            
-            # Create GUI directory if it doesn't exist
-            gui_dir = os.path.dirname(temp_file_path)
-            if not os.path.exists(gui_dir):
-                os.makedirs(gui_dir)
-                
-            with open(temp_file_path, "w") as f:
-                f.write(f"{student_no}\n")
-                f.write(f"{name}\n")
-            
-            print(f"Temp data saved to: {temp_file_path}")
-            return True
-        except Exception as e:
-            print(f"Error saving temp data: {e}")
-            return False
+    def temp_scan_data_path(self):
+        """Path of the legacy temp file read by the confirmation screen"""
+        # Save to GUI folder (parent directory)
+        temp_file_path = os.path.join(os.path.dirname(__file__), "..", "GUI", "temp_scan_data.txt")
+        return os.path.normpath(temp_file_path)
+    
+    def build_scan_record(self, scan_time):
+        """Package the accepted fields for the confirmation screen"""
+        confidence = {field: 1.0 if self.known_student else round(self.field_voter.agreement(field), 2)
+                      for field in ("student_no", "name")}
+        if self.code_reading is not None:
+            confidence["student_no"] = 1.0
+        return ScanRecord(self.current_scan_data["student_no"], self.current_scan_data["name"],
+                          timestamp=scan_time,
+                          confidence=confidence,
+                          source=self.lane or self.frame_source.name,
+                          repeat=self.known_student is not None and self.known_student[2] == "recent")
     
-    def launch_confirmation(self):
-        """Launch the confirmation GUI"""
+    def launch_confirmation(self, record):
+        """Launch the confirmation GUI and pipe it the scan record"""
         try:
             # Clean up camera and CV2 windows
-            if self.cap is not None:
-                self.cap.release()
+            self.frame_grabber.stop()
+            self.ocr_executor.shutdown()
+            self.frame_source.release()
+            self.scan_store.close()
             cv2.destroyAllWindows()
             
             # Path to confirmation.py in GUI folder
@@ -187,7 +168,19 @@ class IDScanner:
             confirmation_script = os.path.normpath(confirmation_script)
             
             print(f"Launching confirmation script: {confirmation_script}")
-            subprocess.Popen([sys.executable, confirmation_script])
+            if self.file_handoff:
+                FileChannel(self.temp_scan_data_path()).send(record)
+                subprocess.Popen([sys.executable, confirmation_script])
+                sys.exit()
+            
+            # The record travels over the child's stdin - nothing is written to disk
+            process = subprocess.Popen([sys.executable, confirmation_script, "--scan-record-stdin"],
+                                       stdin=subprocess.PIPE)
+            channel = PipeChannel(process.stdin)
+            if not channel.send(record):
+                print("Pipe handoff failed - falling back to temp file")
+                FileChannel(self.temp_scan_data_path()).send(record)
+            channel.close()
             sys.exit()
         except Exception as e:
             print(f"Error launching confirmation: {e}")
@@ -225,66 +218,91 @@ class IDScanner:
         
         return x, y, scan_width, scan_height
     
-    def draw_scan_status(self, frame, frame_width, frame_height):
-        """Draw scanning status and current scan data"""
-        font_scale = frame_width / 1920 * 0.7
-        
+    def get_scan_status(self):
+        """Return (status_text, status_color) for the status banner"""
         # Status indicator
         current_time = time.time()
         time_since_scan = current_time - self.last_scan_time
         
         if time_since_scan < 0.5:  # Flash green when scanning
-            status_color = (0, 255, 0)
-            status_text = "SCANNING..."
+            return "SCANNING...", (0, 255, 0)
         elif self.all_fields_found():
-            status_color = (0, 255, 0)
-            status_text = "ID DETECTED - COMPLETE"
+            return "ID DETECTED - COMPLETE", (0, 255, 0)
         else:
-            status_color = (0, 255, 255)
-            status_text = "LOOKING FOR ID..."
+            return "LOOKING FOR ID...", (0, 255, 255)
+    
+    @staticmethod
+    def text_bounds(box, origin, baseline):
+        """Exclusive bounds of a background box (drawn inclusive) and the descenders hanging below it"""
+        x0, y0, x1, y1 = box
+        return x0, y0, x1 + 1, max(y1 + 1, origin[1] + baseline + 2)
+    
+    def status_banner_layout(self, frame_width, status_text):
+        """Return (font_scale, text origin, background box, bounds) for the status banner"""
+        font_scale = frame_width / 1920 * 0.7
         
-        # Draw status
-        status_size = cv2.getTextSize(status_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)[0]
+        status_size, baseline = cv2.getTextSize(status_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)
         status_x = (frame_width - status_size[0]) // 2
         status_y = 50
         
-        cv2.rectangle(frame, (status_x - 10, status_y - status_size[1] - 10), 
-                     (status_x + status_size[0] + 10, status_y + 10), (0, 0, 0), -1)
-        cv2.putText(frame, status_text, (status_x, status_y), 
+        box = (status_x - 10, status_y - status_size[1] - 10, status_x + status_size[0] + 10, status_y + 10)
+        return font_scale, (status_x, status_y), box, self.text_bounds(box, (status_x, status_y), baseline)
+    
+    def draw_status_banner(self, frame, frame_width, status_text, status_color):
+        """Draw the status text centred at the top of the frame"""
+        font_scale, origin, (x0, y0, x1, y1), _ = self.status_banner_layout(frame_width, status_text)
+        cv2.rectangle(frame, (x0, y0), (x1, y1), (0, 0, 0), -1)
+        cv2.putText(frame, status_text, origin, 
                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, status_color, 2)
-        
-        # Draw current scan data
+    
+    def field_values_layout(self, frame_width, student_no, name):
+        """Return (text, color, font_scale, text origin, background box, bounds) for each field line"""
+        font_scale = frame_width / 1920 * 0.7
         y_offset = 100
         data_font_scale = font_scale * 0.8
         
         fields = [
-            ("STUDENT NO:", self.current_scan_data["student_no"]),
-            ("NAME:", self.current_scan_data["name"])
+            ("STUDENT NO:", student_no),
+            ("NAME:", name)
         ]
         
+        lines = []
         for label, value in fields:
             display_value = value if value else "Not detected"
             color = (0, 255, 0) if value else (0, 255, 255)
             
             text = f"{label} {display_value}"
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, data_font_scale, 2)[0]
+            text_size, baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, data_font_scale, 2)
             text_x = 20
             text_y = y_offset
             
-            cv2.rectangle(frame, (text_x - 5, text_y - text_size[1] - 5), 
-                         (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
-            cv2.putText(frame, text, (text_x, text_y), 
-                       cv2.FONT_HERSHEY_SIMPLEX, data_font_scale, color, 2)
+            box = (text_x - 5, text_y - text_size[1] - 5, text_x + text_size[0] + 5, text_y + 5)
+            lines.append((text, color, data_font_scale, (text_x, text_y), box,
+                          self.text_bounds(box, (text_x, text_y), baseline)))
             
             y_offset += 40
+        return lines
     
-    def draw_scan_overlay(self, frame):
-        """Draw scanning overlay with guidelines and instructions"""
-        height, width = frame.shape[:2]
-        x, y, scan_width, scan_height = self.calculate_scan_area(width, height)
+    def draw_field_values(self, frame, frame_width, student_no, name):
+        """Draw the current scan data in the top-left corner"""
+        lines = self.field_values_layout(frame_width, student_no, name)
+        for text, color, font_scale, origin, (x0, y0, x1, y1), _ in lines:
+            cv2.rectangle(frame, (x0, y0), (x1, y1), (0, 0, 0), -1)
+            cv2.putText(frame, text, origin, 
+                       cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, 2)
+    
+    def draw_scan_status(self, frame, frame_width, frame_height):
+        """Draw scanning status and current scan data"""
+        status_text, status_color = self.get_scan_status()
+        self.draw_status_banner(frame, frame_width, status_text, status_color)
+        self.draw_field_values(frame, frame_width,
+                               self.current_scan_data["student_no"], self.current_scan_data["name"])
+    
+    def draw_scan_guides(self, frame, scan_area, rect_color):
+        """Draw the scanning rectangle, corner indicators and crosshair"""
+        x, y, scan_width, scan_height = scan_area
         
         # Draw main scanning rectangle
-        rect_color = (0, 255, 0) if self.all_fields_found() else (0, 255, 255)
         cv2.rectangle(frame, (x, y), (x + scan_width, y + scan_height), rect_color, 3)
         
         # Draw corner indicators
@@ -313,30 +331,114 @@ class IDScanner:
         crosshair_size = 20
         cv2.line(frame, (center_x - crosshair_size, center_y), (center_x + crosshair_size, center_y), rect_color, 2)
         cv2.line(frame, (center_x, center_y - crosshair_size), (center_x, center_y + crosshair_size), rect_color, 2)
-        
-        # Draw scanning status and data
-        self.draw_scan_status(frame, width, height)
-        
-        # Add instruction text
+    
+    def scan_guides_boxes(self, scan_area):
+        """Return the boxes draw_scan_guides draws inside: the four edges and the crosshair"""
+        x, y, scan_width, scan_height = scan_area
+        pad = 3  # Half the line thickness, rounded up generously
+        center_x = x + scan_width // 2
+        center_y = y + scan_height // 2
+        crosshair = 20 + pad
+        return [
+            (x - pad, y - pad, x + scan_width + pad + 1, y + pad + 1),
+            (x - pad, y + scan_height - pad, x + scan_width + pad + 1, y + scan_height + pad + 1),
+            (x - pad, y - pad, x + pad + 1, y + scan_height + pad + 1),
+            (x + scan_width - pad, y - pad, x + scan_width + pad + 1, y + scan_height + pad + 1),
+            (center_x - crosshair, center_y - crosshair, center_x + crosshair + 1, center_y + crosshair + 1),
+        ]
+    
+    def instructions_layout(self, width, height):
+        """Return (text, font_scale, text origin, background box, bounds) for the instruction banner"""
         font_scale = width / 1920 * 0.6
-        instruction_text = "Hold ID card steady in frame - Auto-scanning every 5 seconds - Press 'q' to quit"
-        text_size = cv2.getTextSize(instruction_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)[0]
+        instruction_text = "Hold ID card steady in frame - Scans automatically when the card is still - Press 'q' to quit"
+        text_size, baseline = cv2.getTextSize(instruction_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)
         text_x = (width - text_size[0]) // 2
         text_y = height - 30
         
+        box = (text_x - 10, text_y - text_size[1] - 10, text_x + text_size[0] + 10, text_y + 10)
+        return instruction_text, font_scale, (text_x, text_y), box, self.text_bounds(box, (text_x, text_y), baseline)
+    
+    def draw_instructions(self, frame, width, height):
+        """Draw the instruction banner along the bottom of the frame"""
+        instruction_text, font_scale, origin, (x0, y0, x1, y1), _ = self.instructions_layout(width, height)
+        
         # Add background for better text visibility
-        cv2.rectangle(frame, (text_x - 10, text_y - text_size[1] - 10), 
-                     (text_x + text_size[0] + 10, text_y + 10), (0, 0, 0), -1)
-        cv2.putText(frame, instruction_text, (text_x, text_y), 
+        cv2.rectangle(frame, (x0, y0), (x1, y1), (0, 0, 0), -1)
+        cv2.putText(frame, instruction_text, origin, 
                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 255, 255), 2)
-        
-        return x, y, scan_width, scan_height
     
-    def preprocess_image(self, image):
+    def draw_scan_overlay(self, frame, use_cache=True):
+        """Draw scanning overlay with guidelines and instructions"""
+        height, width = frame.shape[:2]
+        scan_area = self.overlay_cache.scan_area(width, height, self.calculate_scan_area)
+        rect_color = (0, 255, 0) if self.all_fields_found() else (0, 255, 255)
+        status_text, status_color = self.get_scan_status()
+        student_no, name = self.current_scan_data["student_no"], self.current_scan_data["name"]
+        
+        if not use_cache:
+            # Direct drawing, kept for benchmarking the cached path against
+            self.draw_scan_guides(frame, scan_area, rect_color)
+            self.draw_status_banner(frame, width, status_text, status_color)
+            self.draw_field_values(frame, width, student_no, name)
+            self.draw_instructions(frame, width, height)
+            if self.show_hud:
+                self.draw_metrics_hud(frame, width, height)
+            return scan_area
+        
+        # Each layer is re-rendered only when its inputs change, then stamped onto the frame.
+        # A re-render draws and reads back only inside the layer's boxes, never the whole frame.
+        def draw_static(canvas):
+            self.draw_scan_guides(canvas, scan_area, rect_color)
+            self.draw_instructions(canvas, width, height)
+        
+        def static_boxes():
+            return self.scan_guides_boxes(scan_area) + [self.instructions_layout(width, height)[4]]
+        
+        self.overlay_cache.apply(frame, "static", rect_color, draw_static, static_boxes)
+        self.overlay_cache.apply(frame, "status", (status_text, status_color),
+                                 lambda canvas: self.draw_status_banner(canvas, width, status_text, status_color),
+                                 lambda: [self.status_banner_layout(width, status_text)[3]])
+        self.overlay_cache.apply(frame, "fields", (student_no, name),
+                                 lambda canvas: self.draw_field_values(canvas, width, student_no, name),
+                                 lambda: [line[5] for line in self.field_values_layout(width, student_no, name)])
+        
+        # The HUD changes every frame, so caching it would gain nothing
+        if self.show_hud:
+            self.draw_metrics_hud(frame, width, height)
+        
+        return scan_area
+    
+    def draw_metrics_hud(self, frame, width, height):
+        """Draw pipeline counters and per-stage latencies in the bottom-left corner"""
+        font_scale = width / 1920 * 0.6
+        line_height = int(40 * width / 1920) + 4
+        lines = self.metrics.hud_lines()
+        # Ends above the instruction banner, clear of the field values at the top
+        top = int(height * 0.88) - line_height * len(lines)
+        # Stays left of the scan area so it never hides the card
+        box_width = self.overlay_cache.scan_area(width, height, self.calculate_scan_area)[0] - 20
+        cv2.rectangle(frame, (10, top - line_height), (10 + box_width, top + line_height * len(lines)),
+                      (0, 0, 0), -1)
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (20, top + i * line_height), cv2.FONT_HERSHEY_SIMPLEX,
+                        font_scale, (255, 255, 255), 1)
+    
+    def toggle_hud(self):
+        """Show or hide the metrics HUD"""
+        self.show_hud = not self.show_hud
+        print(f"Metrics HUD {'on' if self.show_hud else 'off'}")
+    
+    @staticmethod
+    def preprocess_image(image, text_scaler=None):
         """Preprocess the image for better OCR results"""
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
+        # Bring the text to tesseract's preferred height first, so the blur and
+        # threshold windows below act on the same stroke widths at any resolution
+        if text_scaler is not None:
+            gray = text_scaler.rescale(gray)
+        
         # Apply Gaussian blur to reduce noise
         blurred = cv2.GaussianBlur(gray, (5, 5), 0)
         
@@ -350,141 +452,88 @@ class IDScanner:
         
         return cleaned
     
-    def clean_special_characters(self, text):
-        """Remove special characters from text, keeping only letters, spaces, periods, and hyphens"""
-        if not text:
-            return ""
-        
-        # Keep only letters, spaces, periods, hyphens, and apostrophes (common in names)
-        # Remove other special characters that might be OCR artifacts
-        cleaned = re.sub(r'[^a-zA-Z\s.\'-]', '', text)
-        
-        # Clean up multiple spaces and trim
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        
-        # Remove leading/trailing periods or hyphens
-        cleaned = cleaned.strip('.-')
-        
-        return cleaned
+    def all_fields_found(self):
+        """Check if all required fields have been found"""
+        if self.known_student is not None:
+            return True
+        number_found = self.code_reading is not None or self.field_voter.accepted("student_no")
+        return bool(number_found and self.field_voter.accepted("name"))
     
-    def extract_student_info(self, text):
-        """Extract student number and name from OCR text"""
-        print(f"Raw OCR Text:\n{text}")
-        print("-" * 40)
-        
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        student_no = ""
-        name = ""
-        
-        # Look for student number pattern (like 1284-21)
-        student_no_pattern = r'\b\d{4}-\d{2}\b'
-        
-        # Labels to exclude from name detection
-        excluded_labels = [
-            "STUDENT NO", "STUDENT NO.", "NAME", "COURSE", "YEAR", 
-            "LYCEUM", "REPUBLIC", "PHILIPPINES", "ALABANG", "CERTIFIED",
-            "SEMESTER", "SCHOOL", "COLLEGE", "ENGINEERING", "BSCPE",
-            "THIRD YEAR", "2ND SEMESTER", "2023-2024"
-        ]
-        
-        name_found = False
-        
-        print("Processing lines:")
-        for i, line in enumerate(lines):
-            print(f"Line {i}: '{line}'")
-            line_upper = line.upper().strip()
-            
-            # Search for student number
-            student_match = re.search(student_no_pattern, line)
-            if student_match:
-                student_no = student_match.group()
-                print(f"  -> Found student number: {student_no}")
-            
-            # Enhanced name search with special character cleaning
-            if not name_found:
-                # Method 1: Look for "NAME" keyword and get the next valid line
-                if "NAME" in line_upper and not name_found:
-                    # Check if there's content after "NAME:" on the same line
-                    if ":" in line:
-                        name_part = line.split(":", 1)
-                        if len(name_part) > 1:
-                            potential_name = name_part[1].strip()
-                            # Clean special characters from potential name
-                            cleaned_name = self.clean_special_characters(potential_name)
-                            if self.is_valid_name(cleaned_name, excluded_labels):
-                                name = cleaned_name
-                                name_found = True
-                                print(f"  -> Found name (same line after NAME:): {name}")
-                                continue
-                    
-                    # Look in the next few lines for the actual name
-                    for j in range(i + 1, min(i + 4, len(lines))):
-                        next_line = lines[j].strip()
-                        # Clean special characters from next line
-                        cleaned_next_line = self.clean_special_characters(next_line)
-                        if self.is_valid_name(cleaned_next_line, excluded_labels):
-                            name = cleaned_next_line
-                            name_found = True
-                            print(f"  -> Found name (line {j} after NAME): {name}")
-                            break
-                
-                # Method 2: Look for lines that appear to be names (after we have student number)
-                elif student_no and not name_found:
-                    # Clean special characters from line
-                    cleaned_line = self.clean_special_characters(line)
-                    if self.is_valid_name(cleaned_line, excluded_labels):
-                        name = cleaned_line
-                        name_found = True
-                        print(f"  -> Found name (pattern matching): {name}")
-        
-        print("-" * 40)
-        return student_no, name
-    
-    def is_valid_name(self, text, excluded_labels):
-        """Check if a text line is likely to be a valid name"""
-        if not text or len(text.strip()) < 3:
-            return False
-        
-        text_upper = text.upper().strip()
-        
-        # Exclude obvious labels and non-name content
-        for label in excluded_labels:
-            if label in text_upper:
-                return False
-        
-        # Exclude lines with numbers (except simple patterns that might be in names)
-        if re.search(r'\d{2,}', text):  # Exclude lines with 2+ consecutive digits
-            return False
-        
-        # After cleaning, the text should not contain problematic special characters
-        # Check for remaining unwanted characters (OCR artifacts)
-        unwanted_chars = ['@', '#', '$', '%', '^', '&', '*', '(', ')', '+', '=', 
-                         '{', '}', '[', ']', '|', '\\', '/', '<', '>', '?', '`', '~']
-        if any(char in text for char in unwanted_chars):
+    def reset_scan_data(self):
+        """Clear the displayed data and every accumulated vote"""
+        self.current_scan_data = {"student_no": "", "name": ""}
+        self.field_voter.reset()
+        self.known_student = None
+        self.code_reading = None
+        self.code_checked = False
+        self.code_attempts_left = self.code_attempts_per_card
+    
+    def check_recent_scans(self, student_no, now):
+        """Fill the name from the recent-scan cache if this student number was confirmed recently"""
+        if not student_no or self.known_student is not None:
             return False
-        
-        # Must contain mostly alphabetic characters
-        alpha_ratio = sum(1 for c in text if c.isalpha()) / len(text)
-        if alpha_ratio < 0.6:
+        name = self.recent_scans.get(student_no, now)
+        if name is None:
             return False
-        
-        # Should look like a name (multiple words, proper capitalization)
-        words = text.split()
-        if len(words) >= 2:
-            # Check if it looks like a proper name format
-            if any(word[0].isupper() for word in words if word):
-                return True
-        
-        # Single word names are also possible but should be substantial
-        if len(words) == 1 and len(text) >= 4:
-            return True
-            
-        return False
+        self.known_student = (student_no, name, "recent")
+        print(f"Recently confirmed student {student_no} - using cached name '{name}'")
+        self.emit_event("recent_hit", student_no=student_no, name=name)
+        return True
     
-    def all_fields_found(self):
-        """Check if all required fields have been found"""
-        return (self.current_scan_data["student_no"] and 
-                self.current_scan_data["name"])
+    def match_roster(self, student_no, name, text):
+        """Snap a read to the closest enrolled student; returns the (possibly corrected) student_no and name"""
+        if self.roster is None or self.known_student is not None:
+            return student_no, name
+        match = self.roster.match(student_no, name, text)
+        if match is None:
+            return student_no, name
+        if not match.confirmed():
+            # A number or name read on its own can sit one edit from the wrong student; voting the
+            # roster's values would let two identical misreads complete that student, so keep the read
+            self.metrics.increment("roster_unconfirmed")
+            return student_no, name
+        if match.corrected():
+            print(f"Roster correction: '{student_no}' / '{name}' -> '{match.student_no}' / '{match.name}'")
+        # Number and name both point at the same enrolled student - no need for more passes
+        self.known_student = (match.student_no, match.name, "roster")
+        self.emit_event("roster_match", student_no=match.student_no, name=match.name,
+                        number_distance=match.number_distance, name_distance=match.name_distance)
+        return match.student_no, match.name
+    
+    def handle_code_reading(self, reading, scan_time):
+        """Take the student number from a decoded code; returns True if that completed the scan"""
+        self.code_reading = reading
+        self.metrics.increment("code_hits")
+        print(f"Student number from {reading.kind} code: {reading.student_no}")
+        self.emit_event("code_read", student_no=reading.student_no, kind=reading.kind)
+        # Reads from passes before the decode are checked against it too
+        self.cross_check_number(self.field_voter.best("student_no"))
+        
+        # An enrolled or recently confirmed number needs no OCR at all
+        if self.roster is not None and self.known_student is None and reading.student_no in self.roster.names:
+            self.known_student = (reading.student_no, self.roster.names[reading.student_no], "roster")
+            self.emit_event("roster_match", student_no=reading.student_no, name=self.known_student[1],
+                            number_distance=0, name_distance=None)
+        return self.record_fields(reading.student_no, "", 1.0, 0.0, f"{reading.kind}: {reading.payload}", scan_time)
+    
+    def cross_check_number(self, ocr_student_no):
+        """Compare an OCR read of the number with the decoded code, when there are both"""
+        if self.code_reading is None or not ocr_student_no:
+            return
+        self.code_checked = True
+        if ocr_student_no == self.code_reading.student_no:
+            self.metrics.increment("code_ocr_agree")
+            return
+        # The decoders check their own data, so the code wins; the mismatch is reported for review
+        self.metrics.increment("code_ocr_conflict")
+        print(f"Code/OCR mismatch: {self.code_reading.kind} code says {self.code_reading.student_no}, "
+              f"OCR read {ocr_student_no}")
+        self.emit_event("code_mismatch", code_student_no=self.code_reading.student_no,
+                        ocr_student_no=ocr_student_no, kind=self.code_reading.kind)
+    
+    def remember_confirmed(self, student_no, name):
+        """Add a confirmed student to the recent-scan cache"""
+        self.recent_scans.put(student_no, name)
     
     def check_and_reset_if_no_id(self):
         """Check if too much time has passed without detecting an ID and reset data"""
@@ -495,108 +544,318 @@ class IDScanner:
             (self.current_scan_data["student_no"] or self.current_scan_data["name"])):
             
             print("No ID detected for too long - resetting scan data")
-            self.current_scan_data = {"student_no": "", "name": ""}
+            self.reset_scan_data()
     
-    def auto_scan_and_process(self, frame, scan_area):
-        """Automatically scan the area and update current scan data"""
-        current_time = time.time()
-        
+    def gate_frame(self, frame, scan_area, current_time):
+        """Presence gate and best-frame selection: the (frame, scan_region) to read now, or None"""
         # Check if we should reset data due to no ID detection
         self.check_and_reset_if_no_id()
         
-        # Only scan if enough time has passed
-        if current_time - self.last_scan_time < self.scan_interval:
-            return False
-        
-        self.last_scan_time = current_time
-        
         x, y, w, h = scan_area
         
         # Extract the scan area from the frame
         scan_region = frame[y:y+h, x:x+w]
         
-        # Preprocess the image for OCR
-        processed = self.preprocess_image(scan_region)
+        # Skip OCR entirely until a card is present and held still
+        card_was_present = self.presence_gate.card_present
+        should_scan = self.presence_gate.update(scan_region, current_time)
+        if self.presence_gate.card_present and not card_was_present:
+            self.card_seen_at = current_time
+            self.card_count += 1
+            self.metrics.increment("cards_seen")
+            self.tracer.instant("card_present", card=self.card_count)
+        
+        # A removed card means the next reads belong to a different student
+        if card_was_present and not self.presence_gate.card_present:
+            self.reset_scan_data()
+            self.frame_selector.reset()
+            self.awaiting_card_removal = False
+            self.emit_event("card_removed")
+        
+        if self.presence_gate.card_present and not self.awaiting_card_removal:
+            self.frame_selector.offer(frame, scan_region, current_time)
+        
+        if not should_scan or self.awaiting_card_removal:
+            return None
+        
+        selected = self.frame_selector.select(current_time)
+        if selected is None:
+            # Every recent frame is blurred or glared - let the next steady frame try again
+            self.presence_gate.defer()
+            self.metrics.increment("ocr_deferred_for_quality")
+            return None
+        frame, quality = selected
+        self.metrics.set_gauge("ocr_frame_sharpness", round(quality.sharpness, 1))
+        
+        self.last_scan_time = current_time
+        return frame, frame[y:y+h, x:x+w]
+    
+    def code_attempt_due(self):
+        """True (and counted) if the scanner should look for a QR code or barcode on this pass"""
+        if self.code_reader is None or self.code_reading is not None or self.code_attempts_left <= 0:
+            return False
+        self.code_attempts_left -= 1
+        self.metrics.increment("code_attempts")
+        return True
+    
+    def read_code(self, scan_region):
+        """Run the QR and barcode detectors on the scan region (blocking)"""
+        with self.metrics.time("decode"), self.tracer.span("decode_code", card=self.card_count):
+            return self.code_reader.read(scan_region)
+    
+    def prepare_regions(self, frame, scan_region):
+        """Locate the card and preprocess the crops to OCR (blocking)"""
+        # OCR only the field rectangles of the flattened card when we can find it,
+        # otherwise fall back to the whole scan area
+        with self.metrics.time("preprocess"):
+            locate_start = time.time()
+            height, width = frame.shape[:2]
+            card = self.card_locator.locate_and_rectify(frame, self.calculate_scan_area(width, height))
+            preprocess_start = time.time()
+            if card is not None:
+                # Once a code has given the number, the number field is only read until one
+                # read has been cross-checked against it; after that only the name needs reading
+                skip_number = self.code_reading is not None and self.code_checked
+                regions = [(field_name, self.preprocess_image(crop, self.text_scaler), config)
+                           for field_name, crop, config in self.card_locator.field_regions(card)
+                           if not (skip_number and field_name == "student_no")]
+            else:
+                regions = [("scan_area", self.preprocess_image(scan_region, self.text_scaler), '--psm 6')]
+                self.metrics.increment("card_not_located")
+            preprocess_end = time.time()
+        
+        self.tracer.complete("locate_card", locate_start, preprocess_start, card=self.card_count,
+                             found=card is not None)
+        self.tracer.complete("preprocess_image", preprocess_start, preprocess_end, card=self.card_count,
+                             regions=len(regions),
+                             text_scale=round(self.text_scaler.last_scale, 2) if self.text_scaler else 1.0)
+        return regions
+    
+    def auto_scan_and_process(self, frame, scan_area):
+        """Submit the scan area for OCR as soon as a steady card is in it"""
+        current_time = time.time()
+        selected = self.gate_frame(frame, scan_area, current_time)
+        if selected is None:
+            return False
+        frame, scan_region = selected
+        
+        # A QR code or barcode gives the student number without any OCR
+        if self.code_attempt_due():
+            reading = self.read_code(scan_region)
+            if reading is not None and self.handle_code_reading(reading, current_time):
+                return True
+        
+        regions = self.prepare_regions(frame, scan_region)
         
-        # Perform OCR
+        # Hand the crops to the OCR pool - results arrive in process_ocr_results
+        job_id = self.ocr_executor.submit(regions)
+        self.metrics.increment("ocr_calls")
+        self.tracer.instant("ocr_submitted", card=self.card_count, job=job_id)
+        return True
+    
+    def process_ocr_results(self):
+        """Apply any OCR results that have come back from the worker pool"""
+        for result in self.ocr_executor.poll_results():
+            # Includes any wait for a free worker, which is part of what the user waits for
+            self.metrics.observe("ocr", result.duration * 1000)
+            self.tracer.complete("ocr_wait", result.submitted_at, result.started_at, "ocr",
+                                 thread="OCR pool", job=result.job_id)
+            self.tracer.complete("ocr", result.started_at, result.finished_at, "ocr",
+                                 thread="OCR pool", job=result.job_id, error=str(result.error or ""))
+            if result.error is not None:
+                print(f"OCR Error: {result.error}")
+                self.metrics.increment("ocr_errors")
+                continue
+            with self.tracer.span("handle_ocr_result", job=result.job_id, card=self.card_count):
+                if self.handle_ocr_text(result.texts, result.submitted_at):
+                    return True
+        return False
+    
+    def handle_ocr_text(self, texts, scan_time):
+        """Update current scan data from OCR text"""
         try:
-            text = pytesseract.image_to_string(processed, config='--psm 6')
-            student_no, name = self.extract_student_info(text)
-            
-            # Check if we detected any ID information
+            with self.metrics.time("parse"), self.tracer.span("extract_fields"):
+                if "scan_area" in texts:
+                    text = texts["scan_area"]
+                    result = self.field_extractor.extract(text)
+                    confidence = 0.7  # Whole-area reads pick up stray lines more often
+                else:
+                    text = "\n".join(f"{field_name}: {value.strip()}" for field_name, value in texts.items())
+                    result = self.field_extractor.extract_fields(texts)
+                    confidence = 1.0
+                
+                self.cross_check_number(result.student_no)
+                # A decoded code beats any OCR read of the number, so the roster is matched against the code
+                student_no = self.code_reading.student_no if self.code_reading is not None else result.student_no
+                student_no, name = self.match_roster(student_no, result.name, text)
+            print(f"OCR read: {result}")
             if student_no or name:
-                self.last_id_detection_time = current_time
+                self.metrics.increment("ocr_reads_with_fields")
+            return self.record_fields(student_no, name, confidence * result.confidence["student_no"],
+                                      confidence * result.confidence["name"], text, scan_time)
+        except Exception as e:
+            print(f"OCR Error: {e}")
+            return False
+    
+    def record_fields(self, student_no, name, number_confidence, name_confidence, text, scan_time):
+        """Vote on one reading of the fields and finish the scan once every field is known"""
+        # Check if we detected any ID information
+        if student_no or name:
+            self.last_id_detection_time = scan_time
+            
+            # Vote on the new readings and show the current leaders
+            self.field_voter.add("student_no", student_no, number_confidence, scan_time)
+            self.field_voter.add("name", name, name_confidence, scan_time)
+            for field in ("student_no", "name"):
+                self.current_scan_data[field] = (self.field_voter.accepted(field) or
+                                                 self.field_voter.best(field))
+            if self.code_reading is not None:
+                # A decoded code beats any OCR read of the number
+                self.current_scan_data["student_no"] = self.code_reading.student_no
+            
+            # A repeat student needs no further passes - the name is already known
+            self.check_recent_scans(student_no, scan_time)
+            if self.known_student is not None:
+                self.current_scan_data["student_no"], self.current_scan_data["name"] = self.known_student[:2]
+            self.emit_event("fields_updated", student_no=self.current_scan_data["student_no"],
+                            name=self.current_scan_data["name"], complete=bool(self.all_fields_found()))
+            
+            # Check if all fields are now found
+            if self.all_fields_found():
+                print("\n" + "="*60)
+                print("ALL REQUIRED FIELDS DETECTED!")
+                print("-" * 60)
+                print("EXTRACTED INFORMATION:")
+                print(f"STUDENT NO: {self.current_scan_data['student_no']}")
+                print(f"NAME: {self.current_scan_data['name']}")
+                print("="*60)
                 
-                # Update current scan data with any found information
-                if student_no:
-                    self.current_scan_data["student_no"] = student_no
-                if name:
-                    self.current_scan_data["name"] = name
+                record = self.build_scan_record(scan_time)
+                started_at = self.card_seen_at or scan_time
+                time_to_id = (time.time() - started_at) * 1000
+                self.metrics.increment("ids_completed")
+                self.metrics.increment("ids_number_from_code" if self.code_reading is not None else "ids_number_from_ocr")
+                self.metrics.observe("time_to_id", time_to_id)
                 
-                # Check if all fields are now found
-                if self.all_fields_found():
-                    print("\n" + "="*60)
-                    print("ALL REQUIRED FIELDS DETECTED!")
-                    print("-" * 60)
-                    print("EXTRACTED INFORMATION:")
-                    print(f"STUDENT NO: {self.current_scan_data['student_no']}")
-                    print(f"NAME: {self.current_scan_data['name']}")
-                    print("="*60)
-                    
-                    # Save to text file
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    text_filename = os.path.join(self.text_output_dir, f"id_scan_{timestamp}.txt")
-                    
-                    with open(text_filename, "w") as f:
-                        f.write(f"Scan Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        f.write(f"STUDENT NO: {self.current_scan_data['student_no']}\n")
-                        f.write(f"NAME: {self.current_scan_data['name']}\n")
-                        f.write(f"\nRaw OCR Text:\n{text}\n")
-                    
-                    print(f"Text data saved to: {text_filename}")
-                    
-                    # Save temp data and launch confirmation
-                    if self.save_temp_scan_data(self.current_scan_data["student_no"], 
-                                              self.current_scan_data["name"]):
-                        print("Launching confirmation screen...")
-                        self.launch_confirmation()
-                    
-                    return True
+                if self.persist_handler is not None:
+                    self.persist_handler(record, text, scan_time)
                 else:
-                    # Show what we've found so far
-                    found_fields = []
-                    if self.current_scan_data["student_no"]:
-                        found_fields.append("Student No.")
-                    if self.current_scan_data["name"]:
-                        found_fields.append("Name")
-                    
-                    if found_fields:
-                        print(f"Found fields: {', '.join(found_fields)}")
-                    
-                    return False
+                    self.persist_scan(record, text, scan_time)
+                
+                self.tracer.complete("scan", started_at, time.time(), card=self.card_count,
+                                     student_no=record.student_no, time_to_id_ms=round(time_to_id, 1))
+                self.tracer.check_slow(time_to_id, card=self.card_count)
+                
+                self.emit_event("id_complete", student_no=self.current_scan_data["student_no"],
+                                name=self.current_scan_data["name"], scan_time=scan_time,
+                                latency=time.time() - scan_time, scan_store=self.scan_store.path)
+                
+                if self.scan_channel is not None:
+                    # Confirmation runs in this process - stop scanning until it is done
+                    self.scanning_active = False
+                    with self.tracer.span("handoff", channel=type(self.scan_channel).__name__):
+                        self.scan_channel.send(record)
+                    return True
+                
+                if self.headless:
+                    # No confirmation screen - wait for this card to leave before reading the next
+                    self.awaiting_card_removal = True
+                    self.reset_scan_data()
+                    # Jobs still in flight are for this card and would complete it a second time
+                    self.ocr_executor.discard_results()
+                    return True
+                
+                if self.confirmation_handler is not None:
+                    self.scanning_active = False
+                    self.confirmation_handler(record)
+                    return True
+                
+                # Launch confirmation with the scan record
+                print("Launching confirmation screen...")
+                self.tracer.instant("handoff", channel="confirmation process")
+                self.launch_confirmation(record)
+                
+                return True
             else:
-                # No ID information detected in this scan
-                print("No ID information detected in current scan")
-                return False
+                # Show what we've found so far
+                print(f"Student No. votes: {self.field_voter.describe('student_no')}")
+                print(f"Name votes: {self.field_voter.describe('name')}")
                 
-        except Exception as e:
-            print(f"OCR Error: {e}")
+                return False
+        else:
+            # No ID information detected in this scan
+            print("No ID information detected in current scan")
+            self.metrics.increment("ocr_reads_empty")
             return False
     
+    def persist_scan(self, record, text, scan_time):
+        """Queue a completed scan for the scan store; the writer thread commits it with the next batch"""
+        with self.tracer.span("store_scan"):
+            self.scan_store.add_raw(record.student_no, record.name, scan_time, raw_text=text,
+                                    confidence=record.confidence, source=record.source)
+        print(f"Scan recorded in: {self.scan_store.path}")
+    
+    def process_frame(self, frame):
+        """Run the scanning stages on one frame and return the scan area"""
+        height, width = frame.shape[:2]
+        scan_area = self.overlay_cache.scan_area(width, height, self.calculate_scan_area)
+        if self.scanning_active:
+            self.auto_scan_and_process(frame, scan_area)
+        self.update_metrics()
+        return scan_area
+    
+    def update_metrics(self):
+        """Copy the frame counters into the metrics and write the metrics file when it is due"""
+        self.metrics.set_gauge("frames_captured", self.frame_grabber.captured_count)
+        self.metrics.set_gauge("frames_dropped", self.frame_grabber.dropped_count)
+        self.metrics.set_gauge("frames_processed", self.frame_grabber.displayed_count)
+        if self.text_scaler is not None:
+            self.metrics.set_gauge("ocr_crops_rescaled", self.text_scaler.crops_rescaled)
+            if self.text_scaler.last_text_height is not None:
+                self.metrics.set_gauge("ocr_text_height_px", self.text_scaler.last_text_height)
+        if isinstance(getattr(self, "ocr_backend", None), TemplateDigitBackend):
+            self.metrics.set_gauge("digit_template_reads", self.ocr_backend.template_reads)
+            self.metrics.set_gauge("digit_tesseract_fallbacks", self.ocr_backend.fallback_reads)
+        self.metrics.maybe_write()
+    
+    def resume_scanning(self, wait_for_card_removal=False):
+        """Start looking for the next ID (used after an in-process confirmation)"""
+        self.reset_scan_data()
+        self.presence_gate.reset()
+        self.ocr_executor.discard_results()  # Drop anything still in flight for the previous card
+        self.awaiting_card_removal = wait_for_card_removal
+        self.scanning_active = True
+    
+    def emit_event(self, event_type, **data):
+        """Send a structured event to the configured callback (no-op when there is none)"""
+        if self.event_callback is not None:
+            if self.lane is not None:
+                data["lane"] = self.lane
+            self.event_callback(make_event(event_type, **data))
+    
     def run(self):
         """Main loop for live feed scanning"""
-        if self.cap is None:
+        if not self.frame_source.is_opened():
             print("❌ No camera available. Exiting...")
+            self.emit_event("camera_error", message="No camera available")
+            return
+        
+        if self.headless:
+            self.run_headless()
             return
         
         print("✓ Auto ID Scanner Started!")
         print("Instructions:")
         print("- Hold your ID card steady within the green frame")
-        print("- The scanner will automatically detect and scan every 5 seconds")
+        print("- The scanner will automatically scan as soon as the card is held still")
         print("- Data will only be saved when both Student Number and Name are detected")
-        print("- Data will be reset if no ID is detected for 3 seconds")
+        print("- Each field is accepted once two scans agree on it")
+        print("- Data will be reset if no ID is detected for 10 seconds or the card is removed")
         print("- Press 'q' to quit")
-        print("- Text data will be saved in 'id_text_output' folder")
+        print("- Press 'd' to show pipeline metrics")
+        if self.tracer.enabled:
+            print("- Press 't' to write a trace file")
+        print(f"- Scans will be recorded in the '{self.scan_store.path}' database")
         print("- Special characters will be automatically filtered from names")
         print("-" * 60)
         
@@ -608,9 +867,28 @@ class IDScanner:
         
         consecutive_failures = 0
         max_failures = 10
+        last_frame_id = 0
+        
+        self.frame_grabber.start()
         
         while True:
-            ret, frame = self.safe_read_frame()
+            # Check for the end of a replay before reading so the last frame is never skipped
+            replay_finished = self.frame_grabber.finished
+            latest = self.frame_grabber.read_latest(last_frame_id)
+            
+            if latest is None:
+                if replay_finished:
+                    print("End of replay reached")
+                    break
+                
+                # No new frame yet - keep the window responsive without waiting on the camera
+                self.process_ocr_results()
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                continue
+            
+            last_frame_id, ret, frame = latest
             
             if not ret or frame is None:
                 consecutive_failures += 1
@@ -634,44 +912,203 @@ class IDScanner:
             # Reset failure counter on successful frame read
             consecutive_failures = 0
             
-            # Create a copy for processing
-            display_frame = frame.copy()
-            
-            # Draw scan overlay and get scan area coordinates
-            x, y, scan_width, scan_height = self.draw_scan_overlay(display_frame)
-            scan_area = (x, y, scan_width, scan_height)
-            
-            # Auto-scan the area
+            # Auto-scan the area first so the overlay can be drawn straight onto the frame without a copy
+            self.process_frame(frame)
             if self.scanning_active:
-                self.auto_scan_and_process(frame, scan_area)
+                self.process_ocr_results()
+            
+            # Draw scan overlay
+            self.draw_scan_overlay(frame)
             
             # Display the frame
-            cv2.imshow(window_name, display_frame)   
+            cv2.imshow(window_name, frame)   
+            self.frame_grabber.mark_displayed()
+            self.frame_grabber.maybe_report()
             
             # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            
-            if key == ord('q'):
+            if not self.handle_key(cv2.waitKey(1) & 0xFF):
                 break
-            if key == ord('r'):  # Reset current scan data
-                self.current_scan_data = {"student_no": "", "name": ""}
-                print("Scan data reset. Looking for new ID...")
+        
+        self.finish_run()
+    
+    def handle_key(self, key):
+        """Act on a key press in the live window; returns False when the user quits"""
+        if key == ord('q'):
+            return False
+        if key == ord('d'):  # Debug HUD with pipeline metrics
+            self.toggle_hud()
+        if key == ord('t'):  # Write the recorded trace
+            self.tracer.dump("manual")
+        if key == ord('r'):  # Reset current scan data
+            self.reset_scan_data()
+            self.presence_gate.reset()
+            print("Scan data reset. Looking for new ID...")
+        return True
+    
+    def run_headless(self):
+        """Scanning loop with no window or overlay, reporting results through emit_event"""
+        print(f"✓ Headless ID Scanner Started ({self.frame_source.name})")
+        self.emit_event("started", source=self.frame_source.name)
+        
+        consecutive_failures = 0
+        max_failures = 10
+        last_frame_id = 0
+        
+        self.frame_grabber.start()
+        
+        try:
+            while not self.stop_requested:
+                replay_finished = self.frame_grabber.finished
+                # Block briefly for the next frame instead of spinning
+                latest = self.frame_grabber.read_latest(last_frame_id, timeout=0.05)
+                self.process_ocr_results()
+                
+                if latest is None:
+                    if replay_finished:
+                        print("End of replay reached")
+                        break
+                    continue
+                
+                last_frame_id, ret, frame = latest
+                
+                if not ret or frame is None:
+                    consecutive_failures += 1
+                    print(f"Failed to read frame ({consecutive_failures}/{max_failures})")
+                    self.emit_event("camera_error", failures=consecutive_failures)
+                    if consecutive_failures >= max_failures:
+                        print("Too many consecutive failures, exiting...")
+                        break
+                    continue
+                
+                consecutive_failures = 0
+                
+                self.process_frame(frame)
+                
+                self.frame_grabber.mark_displayed()
+                self.frame_grabber.maybe_report()
+        except KeyboardInterrupt:
+            print("\nScanner stopped by user")
+        
+        self.finish_run()
+    
+    def finish_run(self):
+        """Stop capture and OCR, finishing any OCR still running at the end of a replay"""
+        self.frame_grabber.stop()
+        if self.frame_grabber.finished:
+            while self.ocr_executor.busy():
+                time.sleep(0.01)
+            self.process_ocr_results()
+        self.ocr_executor.shutdown()
+        self.scan_store.close()
+        self.update_metrics()
+        self.metrics.write()
+        self.tracer.dump("exit")
+        self.frame_grabber.print_summary()
+        print(f"Presence gate: {self.presence_gate.frames_checked} frames checked, "
+              f"{self.presence_gate.frames_empty} empty, {self.presence_gate.triggers} OCR triggers")
+        print(self.frame_selector.summary())
+        counters = self.metrics.snapshot()["counters"]
+        if counters.get("ids_completed"):
+            print(f"OCR passes per ID: {counters.get('ocr_calls', 0) / counters['ids_completed']:.1f}")
+        print(self.recent_scans.summary())
+        if self.text_scaler is not None:
+            print(self.text_scaler.summary())
+        if isinstance(getattr(self, "ocr_backend", None), TemplateDigitBackend):
+            print(self.ocr_backend.summary())
+        if self.code_reader is not None:
+            print(self.code_reader.summary())
+            completed = counters.get("ids_completed", 0)
+            from_code = counters.get("ids_number_from_code", 0)
+            print(f"Student numbers: {from_code} from codes, {completed - from_code} from OCR | cross-checks: "
+                  f"{counters.get('code_ocr_agree', 0)} agreed, {counters.get('code_ocr_conflict', 0)} conflicted")
+        self.emit_event("stopped", frames_captured=self.frame_grabber.captured_count,
+                        frames_dropped=self.frame_grabber.dropped_count,
+                        frames_processed=self.frame_grabber.displayed_count,
+                        ocr_jobs=self.ocr_executor.submitted_count,
+                        recent_scans=self.recent_scans.stats())
     
     def __del__(self):
         """Cleanup when object is destroyed"""
-        if hasattr(self, 'cap') and self.cap is not None:
-            self.cap.release()
-        cv2.destroyAllWindows()
+        if hasattr(self, 'frame_grabber'):
+            self.frame_grabber.stop()
+        if hasattr(self, 'ocr_executor'):
+            self.ocr_executor.shutdown()
+        if hasattr(self, 'frame_source'):
+            self.frame_source.release()
+        if hasattr(self, 'scan_store'):
+            self.scan_store.close()
+        if not getattr(self, 'headless', False):
+            cv2.destroyAllWindows()
+
+def add_recognition_arguments(parser):
+    """Add the options for how IDScanner reads a card (text scaling, digit templates, codes)"""
+    parser.add_argument("--ocr-text-height", type=int, default=DEFAULT_TEXT_HEIGHT,
+                        help="Resample OCR crops so text is about this many pixels tall (0 disables)")
+    parser.add_argument("--digit-templates", default=DEFAULT_TEMPLATES_PATH,
+                        help=f"Digit templates built from card crops, or '{BUILTIN_TEMPLATES}' for rendered ones "
+                             "(student numbers go to tesseract if the file is missing)")
+    parser.add_argument("--no-digit-templates", dest="digit_templates", action="store_const", const=None,
+                        help="Read student numbers with tesseract only")
+    parser.add_argument("--no-codes", dest="read_codes", action="store_false",
+                        help="Do not look for QR codes or barcodes before OCR")
+
 
 # Usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auto ID Scanner")
+    add_source_arguments(parser)
+    parser.add_argument("--ocr-backend", default="pytesseract", help="pytesseract or tesserocr")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="Number of OCR workers")
+    parser.add_argument("--ocr-processes", action="store_true", help="Use a process pool instead of threads")
+    add_recognition_arguments(parser)
+    parser.add_argument("--file-handoff", action="store_true",
+                        help="Pass results to the confirmation screen through temp_scan_data.txt (compatibility)")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path of the scan database")
+    parser.add_argument("--roster", help="CSV of enrolled students (student_no,name) used to correct misreads")
+    add_metrics_arguments(parser)
+    add_trace_arguments(parser)
+    parser.add_argument("--headless", action="store_true",
+                        help="No window; print results to stdout as JSON lines (logs go to stderr)")
+    parser.add_argument("--async-pipeline", action="store_true",
+                        help="Run capture, gating, preprocessing, OCR and persistence as asyncio stages")
+    args = parser.parse_args()
+    
+    event_callback = None
+    if args.headless:
+        # Keep stdout clean for the JSON events - every other print goes to stderr
+        event_callback = JsonLinesEventSink(sys.stdout)
+        sys.stdout = sys.stderr
+    
     try:
         # Create and run the scanner
-        scanner = IDScanner()
-        scanner.run()
+        scanner = IDScanner(frame_source=create_frame_source(args),
+                            ocr_workers=args.ocr_workers,
+                            ocr_use_processes=args.ocr_processes,
+                            ocr_backend=args.ocr_backend,
+                            ocr_text_height=args.ocr_text_height,
+                            digit_templates=args.digit_templates,
+                            read_codes=args.read_codes,
+                            headless=args.headless,
+                            event_callback=event_callback,
+                            file_handoff=args.file_handoff,
+                            scan_store=ScanStore(args.store),
+                            roster=Roster.load(args.roster) if args.roster else None,
+                            metrics=create_metrics(args),
+                            tracer=create_tracer(args))
+        if scanner.tracer.enabled and hasattr(signal, "SIGUSR1"):
+            # Lets a headless scanner write its trace on demand: kill -USR1 <pid>
+            signal.signal(signal.SIGUSR1, lambda signum, frame: scanner.tracer.dump("signal"))
+        if args.async_pipeline:
+            pipeline = AsyncScanPipeline(scanner)
+            if hasattr(signal, "SIGTERM"):
+                signal.signal(signal.SIGTERM, lambda signum, frame: pipeline.stop())
+            pipeline.run()
+        else:
+            scanner.run()
     except KeyboardInterrupt:
         print("\nScanner stopped by user")
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        cv2.destroyAllWindows()
\ No newline at end of file
+        if not args.headless:
+            cv2.destroyAllWindows()
\ No newline at end of file
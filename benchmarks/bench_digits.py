@@ -0,0 +1,92 @@
+"""Student number field: digit templates versus tesseract
+
+Synthetic cards with random numbers are placed in frames at several resolutions,
+located and rectified, and the student number field crop is preprocessed exactly as
+the scanner does. Each crop is then read by DigitTemplateReader and, when installed,
+by the tesseract backend with the field's whitelist config.
+
+Usage: python bench_digits.py [--cards N] [--templates FILE] [--min-confidence C] [--min-margin M]
+"""
+import argparse
+import random
+import time
+
+from bench_utils import summarize, open_ocr_backend
+from card_locator import CardLocator
+from digit_reader import DigitTemplateReader, BUILTIN_TEMPLATES
+from frame_sources import render_synthetic_card, place_card_in_frame
+from text_scale import TextScaler
+from IDscan import IDScanner
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+
+def number_crops(count, rng):
+    """[(student_no, preprocessed field crop)] from located synthetic cards"""
+    locator = CardLocator()
+    scaler = TextScaler()
+    crops = []
+    for _ in range(count):
+        student_no = f"{rng.randrange(10000):04d}-{rng.randrange(100):02d}"
+        frame = place_card_in_frame(render_synthetic_card(student_no, "Juan Dela Cruz"), rng.choice(RESOLUTIONS),
+                                    card_width_ratio=rng.uniform(0.3, 0.6), tilt=rng.uniform(0.0, 0.06))
+        height, width = frame.shape[:2]
+        card = locator.locate_and_rectify(frame, IDScanner.calculate_scan_area(None, width, height))
+        if card is None:
+            continue
+        for field_name, crop, config in locator.field_regions(card):
+            if field_name == "student_no":
+                crops.append((student_no, IDScanner.preprocess_image(crop, scaler), config))
+    return crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the student number digit reader")
+    parser.add_argument("--cards", type=int, default=300)
+    parser.add_argument("--templates", default=BUILTIN_TEMPLATES,
+                        help="Template file (the synthetic cards use the built-in font by default)")
+    parser.add_argument("--min-confidence", type=float, default=0.75)
+    parser.add_argument("--min-margin", type=float, default=0.1)
+    parser.add_argument("--ocr-backend", default="pytesseract")
+    args = parser.parse_args()
+
+    crops = number_crops(args.cards, random.Random(0))
+    print(f"{len(crops)} located cards")
+    reader = DigitTemplateReader.load(args.templates, min_confidence=args.min_confidence,
+                                      min_margin=args.min_margin)
+    if reader is None:
+        parser.error(f"No templates at {args.templates}")
+
+    durations, accepted, correct, wrong = [], 0, 0, 0
+    for student_no, image, _ in crops:
+        start = time.perf_counter()
+        reading = reader.read(image)
+        durations.append((time.perf_counter() - start) * 1000)
+        if not reader.accepts(reading):
+            continue
+        accepted += 1
+        if reading.text == student_no:
+            correct += 1
+        else:
+            wrong += 1
+    summarize("digit templates", durations)
+    print(f"  accepted {accepted}/{len(crops)} ({accepted / max(len(crops), 1):.0%}), "
+          f"{correct} correct, {wrong} wrong - the rest fall back to tesseract")
+
+    backend = open_ocr_backend(args.ocr_backend)
+    if backend is None:
+        print("Skipping the tesseract comparison")
+        return
+    durations, correct = [], 0
+    for student_no, image, config in crops:
+        start = time.perf_counter()
+        text = backend.image_to_string(image, config)
+        durations.append((time.perf_counter() - start) * 1000)
+        correct += text.strip() == student_no
+    summarize(f"{backend.name}", durations)
+    print(f"  correct {correct}/{len(crops)}")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Field extraction cost: the old per-call extract_student_info versus the compiled FieldExtractor
+
+The corpus is a JSON list of raw OCR strings (--corpus), or a synthetic one with the usual
+OCR noise: stray label lines, misplaced colons, junk characters and missing fields.
+Both extractors are also checked to return the same student number and name.
+
+Usage: python bench_extractor.py [--corpus FILE] [--size N] [--repeat N]
+"""
+import argparse
+import json
+import random
+import re
+
+from bench_utils import time_call, summarize
+from field_extractor import FieldExtractor
+
+NAMES = ["Juan Dela Cruz", "Maria Santos", "Jose Rizal", "Ana Reyes", "Mark Anthony Garcia",
+         "Kristine Mae Villanueva", "Paolo Bautista"]
+HEADERS = ["LYCEUM OF THE PHILIPPINES UNIVERSITY", "CAVITE - ALABANG", "REPUBLIC OF THE PHILIPPINES",
+           "COLLEGE OF ENGINEERING", "BSCPE - THIRD YEAR", "2ND SEMESTER 2023-2024", "CERTIFIED STUDENT"]
+JUNK = ["~ ,.", "| |", "@#", "ee", "—", "i", "))"]
+
+
+def synthetic_corpus(size, rng):
+    """Raw OCR strings shaped like whole-card reads"""
+    corpus = []
+    for _ in range(size):
+        number = f"{rng.randrange(10000):04d}-{rng.randrange(100):02d}"
+        name = rng.choice(NAMES)
+        lines = rng.sample(HEADERS, rng.randint(2, 5))
+        layout = rng.random()
+        if layout < 0.4:
+            lines += [f"STUDENT NO: {number}", f"NAME: {name}"]
+        elif layout < 0.7:
+            lines += ["STUDENT NO.", number, "NAME", rng.choice(JUNK), name.upper()]
+        elif layout < 0.9:
+            lines += [number, name]
+        else:
+            lines += [rng.choice(JUNK), f"NAME: {rng.choice(JUNK)}"]
+        for _ in range(rng.randint(0, 3)):
+            lines.insert(rng.randrange(len(lines) + 1), rng.choice(JUNK))
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def legacy_extract(text):
+    """The original IDScanner.extract_student_info / is_valid_name logic, without the prints"""
+    def clean_special_characters(value):
+        if not value:
+            return ""
+        cleaned = re.sub(r'[^a-zA-Z\s.\'-]', '', value)
+        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        return cleaned.strip('.-')
+
+    def is_valid_name(value, excluded_labels):
+        if not value or len(value.strip()) < 3:
+            return False
+        value_upper = value.upper().strip()
+        for label in excluded_labels:
+            if label in value_upper:
+                return False
+        if re.search(r'\d{2,}', value):
+            return False
+        unwanted_chars = ['@', '#', '$', '%', '^', '&', '*', '(', ')', '+', '=',
+                          '{', '}', '[', ']', '|', '\\', '/', '<', '>', '?', '`', '~']
+        if any(char in value for char in unwanted_chars):
+            return False
+        if sum(1 for c in value if c.isalpha()) / len(value) < 0.6:
+            return False
+        words = value.split()
+        if len(words) >= 2:
+            if any(word[0].isupper() for word in words if word):
+                return True
+        if len(words) == 1 and len(value) >= 4:
+            return True
+        return False
+
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    student_no = ""
+    name = ""
+    excluded_labels = [
+        "STUDENT NO", "STUDENT NO.", "NAME", "COURSE", "YEAR",
+        "LYCEUM", "REPUBLIC", "PHILIPPINES", "ALABANG", "CERTIFIED",
+        "SEMESTER", "SCHOOL", "COLLEGE", "ENGINEERING", "BSCPE",
+        "THIRD YEAR", "2ND SEMESTER", "2023-2024"
+    ]
+    name_found = False
+    for i, line in enumerate(lines):
+        line_upper = line.upper().strip()
+        student_match = re.search(r'\b\d{4}-\d{2}\b', line)
+        if student_match:
+            student_no = student_match.group()
+        if not name_found:
+            if "NAME" in line_upper and not name_found:
+                if ":" in line:
+                    name_part = line.split(":", 1)
+                    if len(name_part) > 1:
+                        cleaned_name = clean_special_characters(name_part[1].strip())
+                        if is_valid_name(cleaned_name, excluded_labels):
+                            name = cleaned_name
+                            name_found = True
+                            continue
+                for j in range(i + 1, min(i + 4, len(lines))):
+                    cleaned_next_line = clean_special_characters(lines[j].strip())
+                    if is_valid_name(cleaned_next_line, excluded_labels):
+                        name = cleaned_next_line
+                        name_found = True
+                        break
+            elif student_no and not name_found:
+                cleaned_line = clean_special_characters(line)
+                if is_valid_name(cleaned_line, excluded_labels):
+                    name = cleaned_line
+                    name_found = True
+    return student_no, name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR text field extraction")
+    parser.add_argument("--corpus", help="JSON file with a list of raw OCR strings")
+    parser.add_argument("--size", type=int, default=5000, help="Synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+    else:
+        corpus = synthetic_corpus(args.size, random.Random(0))
+    print(f"Corpus: {len(corpus)} OCR strings")
+
+    extractor = FieldExtractor()
+    mismatches = [text for text in corpus if tuple(extractor.extract(text)) != legacy_extract(text)]
+    print(f"Results differing from the old extractor: {len(mismatches)}")
+    for text in mismatches[:3]:
+        print(f"  {text!r}: old {legacy_extract(text)} new {tuple(extractor.extract(text))}")
+
+    for label, extract in (("old extract_student_info", legacy_extract), ("FieldExtractor.extract", extractor.extract)):
+        _, durations = time_call(lambda: [extract(text) for text in corpus], args.repeat)
+        summarize(f"{label} (corpus)", durations)
+        print(f"  {sum(durations) / args.repeat / len(corpus) * 1000:.1f} us per string")
+
+
+if __name__ == "__main__":
+    main()
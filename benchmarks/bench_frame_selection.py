@@ -0,0 +1,112 @@
+"""OCR passes per ID: the frame that triggered the pass versus the best frame of the window
+
+Synthetic cards are held in front of the camera for a few seconds, with some frames
+motion-blurred (hand shake) and some washed out by a glare spot. A pass runs every
+--interval frames. The naive policy reads the frame that triggered the pass; the selector
+reads the best-scored frame since the previous pass. A pass counts as successful when the
+student number field reads correctly with the digit template reader, which stands in for
+OCR here because it fails on the same blurred and glared crops.
+
+Usage: python bench_frame_selection.py [--cards N] [--interval FRAMES] [--blur-rate R] [--glare-rate R]
+"""
+import argparse
+import random
+
+import cv2
+import numpy as np
+
+from bench_utils import time_call, summarize
+from card_locator import CardLocator
+from digit_reader import DigitTemplateReader
+from frame_quality import BestFrameSelector
+from frame_sources import render_synthetic_card, place_card_in_frame
+from IDscan import IDScanner
+
+FRAME_SIZE = (1280, 720)
+
+
+def degrade(frame, rng, blur_rate, glare_rate):
+    """Apply hand-shake blur and/or a glare spot to some frames"""
+    if rng.random() < blur_rate:
+        length = rng.randrange(9, 31)
+        kernel = np.zeros((length, length), dtype=np.float32)
+        kernel[length // 2, :] = 1.0 / length
+        angle = rng.uniform(0, 180)
+        rotation = cv2.getRotationMatrix2D((length / 2 - 0.5, length / 2 - 0.5), angle, 1.0)
+        kernel = cv2.warpAffine(kernel, rotation, (length, length))
+        frame = cv2.filter2D(frame, -1, kernel / max(kernel.sum(), 1e-6))
+    if rng.random() < glare_rate:
+        spot = np.zeros_like(frame)
+        center = (int(FRAME_SIZE[0] * rng.uniform(0.4, 0.6)), int(FRAME_SIZE[1] * rng.uniform(0.45, 0.6)))
+        cv2.ellipse(spot, center, (rng.randrange(90, 180), rng.randrange(40, 80)), 0, 0, 360, (255, 255, 255), -1)
+        frame = cv2.add(frame, cv2.GaussianBlur(spot, (0, 0), 15))
+    return frame
+
+
+def number_read(frame, student_no, locator, reader):
+    card = locator.locate_and_rectify(frame, IDScanner.calculate_scan_area(None, *FRAME_SIZE))
+    if card is None:
+        return False
+    for field_name, crop, _ in locator.field_regions(card):
+        if field_name == "student_no":
+            reading = reader.read(IDScanner.preprocess_image(crop))
+            return reader.accepts(reading) and reading.text == student_no
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark best-frame selection for OCR")
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=60, help="Frames each card is held for")
+    parser.add_argument("--interval", type=int, default=15, help="Frames between OCR passes")
+    parser.add_argument("--blur-rate", type=float, default=0.5)
+    parser.add_argument("--glare-rate", type=float, default=0.25)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    locator = CardLocator()
+    reader = DigitTemplateReader()
+    x, y, w, h = IDScanner.calculate_scan_area(None, *FRAME_SIZE)
+    passes = {"naive": [], "selected": []}
+    score_times = []
+
+    for _ in range(args.cards):
+        student_no = f"{rng.randrange(10000):04d}-{rng.randrange(100):02d}"
+        clean = place_card_in_frame(render_synthetic_card(student_no), FRAME_SIZE,
+                                    card_width_ratio=rng.uniform(0.35, 0.45), tilt=rng.uniform(0.0, 0.05))
+        frames = [degrade(clean, rng, args.blur_rate, args.glare_rate) for _ in range(args.frames)]
+
+        # Naive: read the frame that happens to arrive when the pass is due
+        count = None
+        for attempt, index in enumerate(range(args.interval - 1, args.frames, args.interval), 1):
+            if number_read(frames[index], student_no, locator, reader):
+                count = attempt
+                break
+        passes["naive"].append(count)
+
+        # Selector: every frame is scored, the best one since the last pass is read
+        selector = BestFrameSelector(max_wait=0.0)
+        count = None
+        attempt = 0
+        for index, frame in enumerate(frames):
+            _, durations = time_call(lambda: selector.offer(frame, frame[y:y+h, x:x+w], index / 30.0), 1)
+            score_times.extend(durations)
+            if (index + 1) % args.interval:
+                continue
+            selected = selector.select(index / 30.0)
+            attempt += 1
+            if selected is not None and number_read(selected[0], student_no, locator, reader):
+                count = attempt
+                break
+        passes["selected"].append(count)
+
+    summarize("quality scoring per frame", score_times)
+    for policy, counts in passes.items():
+        read = [count for count in counts if count is not None]
+        mean = np.mean(read) if read else float("nan")
+        print(f"{policy:<9} {len(read)}/{len(counts)} cards read, {mean:.2f} passes per read card, "
+              f"{sum(count == 1 for count in read)} on the first pass")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare OCR backends on the same preprocessed crops
+
+Usage: python bench_ocr_backends.py [--repeat N] [crop images...]
+"""
+import argparse
+
+from bench_utils import load_crops, time_call, summarize, open_ocr_backend
+from card_locator import CardLocator
+from frame_sources import render_synthetic_card
+from ocr_backends import OCR_BACKENDS
+from IDscan import IDScanner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR backends")
+    parser.add_argument("images", nargs="*", help="Scan-area crops to OCR (synthetic card if omitted)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--config", default="--psm 6")
+    args = parser.parse_args()
+
+    crops = load_crops(args.images)
+    # Use the scanner's own preprocessing so both engines see identical input
+    processed = [(label, IDScanner.preprocess_image(crop)) for label, crop in crops]
+
+    # Field-level regions of a rectified card, as submitted when the card is located
+    locator = CardLocator()
+    field_regions = [(field_name, IDScanner.preprocess_image(crop), config)
+                     for field_name, crop, config in locator.field_regions(render_synthetic_card())]
+
+    for backend_name in OCR_BACKENDS:
+        # open_ocr_backend makes one call, so model loading is not counted against the persistent engine
+        backend = open_ocr_backend(backend_name)
+        if backend is None:
+            print(f"Skipping {backend_name}")
+            continue
+        for label, image in processed:
+            text, durations = time_call(lambda: backend.image_to_string(image, args.config), args.repeat)
+            summarize(f"{backend_name} [{label}]", durations)
+            print(f"  text: {' | '.join(line for line in text.splitlines() if line.strip())}")
+        texts, durations = time_call(lambda: backend.read_regions(field_regions), args.repeat)
+        summarize(f"{backend_name} [fields only]", durations)
+        print(f"  fields: {texts}")
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Per-frame overlay cost: direct drawing versus the cached overlay layers
+
+Two scenarios: "steady" keeps one completed read on screen, and "card held" replays what
+a held card does to the overlay at 30 fps - the status banner flashes "SCANNING..." on
+each OCR pass (about once a second) and the fields fill in as they are read, so the
+cached layers are re-rendered regularly. The cached output is checked against direct drawing.
+
+Usage: python bench_overlay.py [--frames N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_utils import time_call, summarize
+from frame_sources import GeneratorSource
+from ocr_worker import OCRExecutor
+from scan_store import ScanStore
+from IDscan import IDScanner
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+STUDENT_NO = "1284-21"
+NAME = "Juan Dela Cruz"
+
+
+def steady_state(frame_index):
+    """(student_no, name, scanning) with a completed read and no OCR running"""
+    return STUDENT_NO, NAME, False
+
+
+def card_held_state(frame_index):
+    """(student_no, name, scanning) for a card held at 30 fps: OCR every 30 frames, a new card every 150"""
+    position = frame_index % 150
+    student_no = STUDENT_NO if position >= 60 else ""
+    name = NAME if position >= 120 else ""
+    return student_no, name, frame_index % 30 < 15
+
+
+SCENARIOS = [("steady", steady_state), ("card held", card_held_state)]
+
+
+def set_state(scanner, state):
+    student_no, name, scanning = state
+    scanner.current_scan_data = {"student_no": student_no, "name": name}
+    scanner.last_scan_time = time.time() if scanning else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark draw_scan_overlay")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    # Drawing needs no OCR engine, and the store goes to a throwaway folder instead of id_scans.db
+    store_dir = tempfile.TemporaryDirectory()
+    scanner = IDScanner(frame_source=GeneratorSource(lambda: iter(())), headless=True,
+                        ocr_executor=OCRExecutor(lambda regions: {}),
+                        scan_store=ScanStore(os.path.join(store_dir.name, "bench.db")))
+
+    for width, height in RESOLUTIONS:
+        base = np.random.default_rng(0).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        for scenario, state_at in SCENARIOS:
+            mismatches = 0
+            for use_cache in (False, True):
+                scanner.overlay_cache.clear()
+                scanner.overlay_cache.render_count = 0
+                durations = []
+                for i in range(args.frames):
+                    set_state(scanner, state_at(i))
+                    frame = base.copy()
+                    _, timing = time_call(lambda: scanner.draw_scan_overlay(frame, use_cache=use_cache), 1)
+                    durations.extend(timing)
+                    if use_cache:
+                        expected = base.copy()
+                        scanner.draw_scan_overlay(expected, use_cache=False)
+                        mismatches += not np.array_equal(frame, expected)
+                label = "cached" if use_cache else "direct"
+                summarize(f"{width}x{height} {scenario} {label}", durations)
+            print(f"  layer renders for cached run: {scanner.overlay_cache.render_count}, "
+                  f"frames differing from direct drawing: {mismatches}")
+    scanner.scan_store.close()
+    store_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Camera-to-screen rendering in the GUI: the old surfarray chain versus FrameRenderer
+
+Each frame is drawn onto a screen the size of the camera, as CameraApp does. The old path
+is cvtColor, rot90, make_surface, transform.rotate and smoothscale; FrameRenderer does one
+resize and one transpose into a preallocated, buffer-backed surface. CPU is process time,
+so it also counts time spent in OpenCV's worker threads.
+
+Usage: SDL_VIDEODRIVER=dummy python bench_render.py [--frames N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+from bench_utils import time_call, summarize
+from frame_sources import render_synthetic_card, place_card_in_frame
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "GUI")))
+
+from UserInterface import FrameRenderer  # noqa: E402
+
+RESOLUTIONS = [(1280, 720), (1920, 1080)]
+
+
+def render_with_copies(frame, screen):
+    """The rendering CameraApp.run used before FrameRenderer"""
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if frame.shape[0] > frame.shape[1]:
+        frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+    frame_surface = pygame.surfarray.make_surface(np.rot90(frame))
+    rotated_surface = pygame.transform.rotate(frame_surface, 90)
+    rotated_surface = pygame.transform.smoothscale(rotated_surface, (screen.get_width(), screen.get_height()))
+    screen.blit(rotated_surface, (0, 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GUI frame rendering")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    for width, height in RESOLUTIONS:
+        screen = pygame.display.set_mode((width, height))
+        frame = place_card_in_frame(render_synthetic_card(), (width, height))
+        renderer = FrameRenderer()
+        outputs = {}
+        for label, render in (("copies", render_with_copies), ("renderer", renderer.render)):
+            render(frame, screen)  # Warm-up, and the renderer allocates its buffers here
+            cpu_start = time.process_time()
+            _, durations = time_call(lambda: render(frame, screen), args.frames)
+            cpu_ms = (time.process_time() - cpu_start) * 1000 / args.frames
+            summarize(f"{width}x{height} {label}", durations)
+            print(f"  {1000 / np.mean(durations):6.1f} fps max, {cpu_ms:.2f} ms CPU per frame")
+            outputs[label] = pygame.surfarray.array3d(screen).astype(np.int16)
+        difference = np.abs(outputs["copies"] - outputs["renderer"])
+        print(f"  output difference: mean {difference.mean():.2f}, max {difference.max()} gray levels")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
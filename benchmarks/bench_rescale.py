@@ -0,0 +1,74 @@
+"""Scan-area preprocessing with and without text-height rescaling, across camera resolutions
+
+A synthetic card is placed in frames of each resolution so that it fills the scan area,
+the scan area is cropped the way IDScanner does it, and the crop is preprocessed at its
+native size and after TextScaler. When a tesseract backend is installed, both versions are
+also OCR'd and checked for the student number and name.
+
+Usage: python bench_rescale.py [--repeat N] [--text-height PX] [--resolutions 640x480 1920x1080 ...]
+"""
+import argparse
+
+from bench_utils import time_call, summarize, open_ocr_backend
+from field_extractor import FieldExtractor
+from frame_sources import render_synthetic_card, place_card_in_frame
+from text_scale import TextScaler, DEFAULT_TEXT_HEIGHT
+from IDscan import IDScanner
+
+STUDENT_NO = "1284-21"
+NAME = "Juan Dela Cruz"
+
+
+def scan_area_crop(frame_width, frame_height, card_scale=1.0):
+    """Frame with the card card_scale times the scan area width, cropped like auto_scan_and_process"""
+    x, y, w, h = IDScanner.calculate_scan_area(None, frame_width, frame_height)
+    frame = place_card_in_frame(render_synthetic_card(STUDENT_NO, NAME), (frame_width, frame_height),
+                                card_width_ratio=min(w * card_scale / frame_width, 0.95), tilt=0.0)
+    return frame[y:y+h, x:x+w]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR crop rescaling across resolutions")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--text-height", type=int, default=DEFAULT_TEXT_HEIGHT)
+    parser.add_argument("--resolutions", nargs="+", default=["640x480", "1280x720", "1920x1080", "3840x2160"])
+    parser.add_argument("--card-scales", type=float, nargs="+", default=[1.0, 1.8],
+                        help="Card width relative to the scan area (above 1 is a card held close)")
+    parser.add_argument("--ocr-backend", default="pytesseract")
+    args = parser.parse_args()
+
+    scaler = TextScaler(target_height=args.text_height)
+    extractor = FieldExtractor()
+    backend = open_ocr_backend(args.ocr_backend)
+    ocr_available = backend is not None
+    if not ocr_available:
+        print("Timing preprocessing only")
+
+    cases = [(resolution, card_scale) for resolution in args.resolutions for card_scale in args.card_scales]
+    for resolution, card_scale in cases:
+        frame_width, frame_height = (int(value) for value in resolution.split("x"))
+        crop = scan_area_crop(frame_width, frame_height, card_scale)
+        gray = crop[:, :, 0]
+        _, durations = time_call(lambda: scaler.estimate_text_height(gray), args.repeat)
+        text_height = scaler.estimate_text_height(gray)
+        scale = scaler.scale_for(gray)
+        print(f"{resolution} card x{card_scale:g}: scan area {crop.shape[1]}x{crop.shape[0]}, "
+              f"text ~{text_height or 0:.0f} px, scale x{scale:.2f}, estimated in {sum(durations) / len(durations):.2f} ms")
+
+        variants = (("native", None), ("rescaled", scaler))
+        for label, text_scaler in variants:
+            image, durations = time_call(lambda: IDScanner.preprocess_image(crop, text_scaler), args.repeat)
+            summarize(f"  preprocess {label} {image.shape[1]}x{image.shape[0]}", durations)
+            if not ocr_available:
+                continue
+            text, durations = time_call(lambda: backend.image_to_string(image, "--psm 6"), args.repeat)
+            result = extractor.extract(text)
+            summarize(f"  ocr {label}", durations)
+            print(f"    read: number {'ok' if result.student_no == STUDENT_NO else 'MISSED'}, "
+                  f"name {'ok' if result.name.lower() == NAME.lower() else 'MISSED'}")
+    if ocr_available:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
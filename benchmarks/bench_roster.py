@@ -0,0 +1,77 @@
+"""Roster lookup latency: exact, misread-number and misread-name reads against a large roster
+
+Usage: python bench_roster.py [--students N] [--queries N]
+"""
+import argparse
+import random
+import time
+
+from bench_utils import time_call, summarize
+from roster import Roster
+
+SYLLABLES = ["an", "ba", "cruz", "de", "el", "fer", "gar", "ia", "jo", "ka", "li", "ma", "no", "pe",
+             "ra", "san", "tos", "vi", "yu", "zon", "rey", "mon", "cas", "tro", "ven"]
+
+
+def random_word(rng, syllables):
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def build_roster(count, rng):
+    """Synthetic roster with unique numbers and mostly unique names"""
+    roster = Roster()
+    numbers = rng.sample(range(1000000), count)
+    for value in numbers:
+        name = f"{random_word(rng, 2)} {random_word(rng, 1)} {random_word(rng, 3)}"
+        roster.add(f"{value // 100:04d}-{value % 100:02d}", name)
+    return roster
+
+
+def misread(text, rng, alphabet):
+    """Replace one character, as a single OCR error would"""
+    position = rng.randrange(len(text))
+    while text[position] in " -":
+        position = rng.randrange(len(text))
+    return text[:position] + rng.choice(alphabet.replace(text[position], "")) + text[position + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark roster lookups")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    roster = build_roster(args.students, rng)
+    print(f"Built roster of {len(roster)} students in {time.perf_counter() - start:.1f} s")
+
+    students = rng.sample(list(roster.names.items()), args.queries)
+    cases = {
+        "exact number + name": [(number, name) for number, name in students],
+        "misread number + name": [(misread(number, rng, "0123456789"), name) for number, name in students],
+        "misread number only": [(misread(number, rng, "0123456789"), "") for number, _ in students],
+        "misread name only": [("", misread(name, rng, "abcdefghijklmnopqrstuvwxyz")) for _, name in students],
+    }
+
+    for label, reads in cases.items():
+        durations = []
+        correct, wrong, applied, applied_wrong = 0, 0, 0, 0
+        for (number, name), (true_number, _) in zip(reads, students):
+            match, timing = time_call(lambda: roster.match(number, name), 1)
+            durations.extend(timing)
+            if match is None:
+                continue
+            correct += match.student_no == true_number
+            wrong += match.student_no != true_number
+            # The scanner only replaces the read with a match that number and name both confirm
+            if match.confirmed():
+                applied += 1
+                applied_wrong += match.student_no != true_number
+        summarize(label, durations)
+        print(f"  matched correctly: {correct}/{len(reads)}, wrong student: {wrong} | "
+              f"applied by the scanner: {applied} ({applied_wrong} wrong)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Make the scanner modules importable when running from the benchmarks folder
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(__file__), "..")))
+
+from frame_sources import render_synthetic_card  # noqa: E402
+from ocr_backends import create_ocr_backend  # noqa: E402
+
+
+def load_crops(paths):
+    """Load crops from image paths, or render a synthetic one if none were given"""
+    crops = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Skipping unreadable image: {path}")
+            continue
+        crops.append((os.path.basename(path), image))
+    if not crops:
+        crops.append(("synthetic", render_synthetic_card()))
+    return crops
+
+
+def time_call(func, repeat):
+    """Run func repeat times and return (result of last call, list of durations in ms)"""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return result, durations
+
+
+def summarize(label, durations):
+    """Print mean/median/p95 for a list of millisecond timings"""
+    ordered = sorted(durations)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<32} mean {np.mean(ordered):8.2f} ms | median {np.median(ordered):8.2f} ms | p95 {p95:8.2f} ms")
+
+
+def open_ocr_backend(name):
+    """Create an OCR backend and make one call with it, or return None if it cannot run here
+
+    pytesseract imports fine without the tesseract binary and only fails on its first call;
+    tesserocr raises RuntimeError there when its language data is missing.
+    """
+    try:
+        backend = create_ocr_backend(name)
+        backend.image_to_string(np.full((32, 32), 255, dtype=np.uint8))
+    except (ImportError, OSError, RuntimeError) as e:
+        print(f"{name} not available ({e})")
+        return None
+    if backend.name != name:
+        backend.close()
+        return None
+    return backend
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+
+# Field positions are fractions (x, y, width, height) of the rectified card.
+# Adjust them to match the printed card layout.
+CARD_LAYOUT = {
+    "size": (856, 540),  # ISO ID-1 proportions (85.6 x 54 mm)
+    "fields": {
+        "student_no": {
+            "rect": (0.30, 0.50, 0.40, 0.13),
+            "config": "--psm 7 -c tessedit_char_whitelist=0123456789-",
+        },
+        "name": {
+            "rect": (0.30, 0.66, 0.66, 0.13),
+            "config": "--psm 7",
+        },
+    },
+}
+
+
+class CardLocator:
+    """Finds the ID card in a frame, flattens it and cuts out the configured fields"""
+
+    def __init__(self, layout=None, detect_width=480, min_area_ratio=0.2, search_margin=0.5,
+                 min_aspect=1.2, max_aspect=2.2):
+        self.layout = layout or CARD_LAYOUT
+        self.detect_width = detect_width      # Search window is downscaled to this width for contour search
+        self.min_area_ratio = min_area_ratio  # Smallest card area as a fraction of the scan area
+        # Cards overhang the on-screen guide, so the search extends this fraction of the guide's
+        # width past each of its edges (the guide is wider than a card, hence width for both axes)
+        self.search_margin = search_margin
+        self.min_aspect = min_aspect
+        self.max_aspect = max_aspect
+
+    @staticmethod
+    def order_points(points):
+        """Order four points as top-left, top-right, bottom-right, bottom-left"""
+        points = points.reshape(4, 2).astype(np.float32)
+        sums = points.sum(axis=1)
+        diffs = np.diff(points, axis=1).ravel()
+        return np.array([
+            points[np.argmin(sums)],
+            points[np.argmin(diffs)],
+            points[np.argmax(sums)],
+            points[np.argmax(diffs)],
+        ], dtype=np.float32)
+
+    def search_window(self, frame, scan_area):
+        """Return (left, top, right, bottom) of the part of the frame searched for the card"""
+        height, width = frame.shape[:2]
+        x, y, w, h = scan_area
+        margin = int(w * self.search_margin)
+        return max(0, x - margin), max(0, y - margin), min(width, x + w + margin), min(height, y + h + margin)
+
+    def locate(self, frame, scan_area=None):
+        """Return the card corners in frame coordinates, or None if no card-shaped outline is found
+
+        scan_area is the on-screen guide as (x, y, width, height); without it the whole frame is the guide.
+        """
+        height, width = frame.shape[:2]
+        if scan_area is None:
+            scan_area = (0, 0, width, height)
+        left, top, right, bottom = self.search_window(frame, scan_area)
+        window = frame[top:bottom, left:right]
+        scale = min(1.0, self.detect_width / float(right - left))
+        small = cv2.resize(window, (int((right - left) * scale), int((bottom - top) * scale)),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(blurred, 40, 120)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = self.min_area_ratio * scan_area[2] * scan_area[3] * scale * scale
+
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            if cv2.contourArea(contour) < min_area:
+                break
+            perimeter = cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, 0.02 * perimeter, True)
+            if len(approx) != 4 or not cv2.isContourConvex(approx):
+                continue
+
+            corners = self.order_points(approx)
+            card_width = np.linalg.norm(corners[1] - corners[0])
+            card_height = np.linalg.norm(corners[3] - corners[0])
+            if card_height == 0:
+                continue
+            aspect = card_width / card_height
+            if self.min_aspect <= aspect <= self.max_aspect:
+                return corners / scale + np.array([left, top], dtype=np.float32)
+
+        return None
+
+    def rectify(self, frame, corners):
+        """Warp the card to the canonical layout size"""
+        card_width, card_height = self.layout["size"]
+        target = np.array([[0, 0], [card_width - 1, 0],
+                           [card_width - 1, card_height - 1], [0, card_height - 1]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(corners.astype(np.float32), target)
+        return cv2.warpPerspective(frame, matrix, (card_width, card_height))
+
+    def locate_and_rectify(self, frame, scan_area=None):
+        """Return the flattened card image, or None if no card was found"""
+        corners = self.locate(frame, scan_area)
+        if corners is None:
+            return None
+        return self.rectify(frame, corners)
+
+    def field_regions(self, card):
+        """Yield (field_name, crop, tesseract_config) for every configured field"""
+        card_height, card_width = card.shape[:2]
+        for field_name, field in self.layout["fields"].items():
+            fx, fy, fw, fh = field["rect"]
+            x, y = int(fx * card_width), int(fy * card_height)
+            w, h = int(fw * card_width), int(fh * card_height)
+            yield field_name, card[y:y+h, x:x+w], field["config"]
@@ -0,0 +1,87 @@
+import re
+
+import cv2
+
+# Student number inside a code payload, with or without the dash (e.g. "1284-21" or "ID128421")
+PAYLOAD_NUMBER_PATTERN = r'(?<!\d)(\d{4})-?(\d{2})(?!\d)'
+
+
+class CodeReading:
+    """Student number decoded from a QR code or barcode on the card"""
+
+    def __init__(self, student_no, kind, payload):
+        self.student_no = student_no
+        self.kind = kind        # "qr" or the barcode symbology reported by OpenCV
+        self.payload = payload  # Full decoded text, kept for the raw scan record
+
+    def __repr__(self):
+        return f"CodeReading({self.student_no!r}, kind={self.kind!r})"
+
+
+class CodeReader:
+    """Tries OpenCV's built-in QR and barcode detectors on the scan region
+
+    Decoders carry their own error detection (Reed-Solomon for QR, check digits for
+    most barcodes), so a decoded number needs no voting. The barcode detector ships
+    with OpenCV 4.8+ (or opencv-contrib before that); without it only QR codes are read.
+    """
+
+    def __init__(self, use_qr=True, use_barcode=True, payload_pattern=PAYLOAD_NUMBER_PATTERN):
+        self.qr_detector = cv2.QRCodeDetector() if use_qr else None
+        barcode_class = getattr(getattr(cv2, "barcode", None), "BarcodeDetector", None)
+        self.barcode_detector = barcode_class() if use_barcode and barcode_class is not None else None
+        self.payload_pattern = re.compile(payload_pattern)
+
+        # Stats
+        self.attempts = 0
+        self.hits = {}  # kind -> decodes that held a student number
+        self.unusable = 0  # Codes that decoded but held no student number
+
+    def available(self):
+        return self.qr_detector is not None or self.barcode_detector is not None
+
+    def student_no_from(self, payload):
+        match = self.payload_pattern.search(payload or "")
+        return f"{match.group(1)}-{match.group(2)}" if match else None
+
+    def decode_qr(self, image):
+        payload, _, _ = self.qr_detector.detectAndDecode(image)
+        return [("qr", payload)] if payload else []
+
+    def decode_barcodes(self, image):
+        if hasattr(self.barcode_detector, "detectAndDecodeWithType"):
+            found, payloads, kinds, _ = self.barcode_detector.detectAndDecodeWithType(image)
+        else:
+            # opencv-contrib before 4.8 returned the types from detectAndDecode itself
+            found, payloads, kinds, _ = self.barcode_detector.detectAndDecode(image)
+        if not found:
+            return []
+        return [(kind.lower() if kind else "barcode", payload) for payload, kind in zip(payloads, kinds) if payload]
+
+    def read(self, image):
+        """Return a CodeReading for the first code holding a student number, or None"""
+        self.attempts += 1
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        for detector, decode in ((self.qr_detector, self.decode_qr), (self.barcode_detector, self.decode_barcodes)):
+            if detector is None:
+                continue
+            try:
+                decoded = decode(gray)
+            except cv2.error:
+                continue
+            for kind, payload in decoded:
+                student_no = self.student_no_from(payload)
+                if student_no is None:
+                    self.unusable += 1
+                    continue
+                self.hits[kind] = self.hits.get(kind, 0) + 1
+                return CodeReading(student_no, kind, payload)
+        return None
+
+    def hit_rate(self):
+        return sum(self.hits.values()) / self.attempts if self.attempts else 0.0
+
+    def summary(self):
+        kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(self.hits.items())) or "none"
+        return (f"Codes: {sum(self.hits.values())}/{self.attempts} decode attempts found a student number "
+                f"({self.hit_rate():.0%}; {kinds}; {self.unusable} other codes)")
@@ -0,0 +1,328 @@
+import argparse
+import os
+import re
+import threading
+
+import cv2
+import numpy as np
+
+from ocr_backends import OCRBackend
+
+DEFAULT_TEMPLATES_PATH = "digit_templates.npz"
+BUILTIN_TEMPLATES = "builtin"  # Use the rendered templates instead of a harvested file
+GLYPH_SIZE = (16, 24)  # Width, height every glyph is normalised to before matching
+DIGIT_ASPECT = 0.8  # Typical digit width / height; much wider boxes are touching digits
+DIGITS = "0123456789"
+STUDENT_NO_GLYPHS = "dddd-dd"  # Digit positions and the dash of a student number
+
+
+class DigitReading:
+    """Student number read by template matching, with a 0..1 confidence per glyph
+
+    margins holds how far each glyph's best digit scored above the best other digit.
+    """
+
+    def __init__(self, text, confidences, margins=None):
+        self.text = text
+        self.confidences = confidences
+        self.margins = margins if margins is not None else confidences
+
+    @property
+    def confidence(self):
+        """The weakest glyph decides how far the whole number can be trusted"""
+        return min(self.confidences) if self.confidences else 0.0
+
+    @property
+    def margin(self):
+        return min(self.margins) if self.margins else 0.0
+
+    def __repr__(self):
+        return f"DigitReading({self.text!r}, confidence={self.confidence:.2f}, margin={self.margin:.2f})"
+
+
+class ScoredText(str):
+    """OCR text that carries the reader's own 0..1 confidence (FieldExtractor votes with it)"""
+
+    def __new__(cls, text, confidence):
+        scored = super().__new__(cls, text)
+        scored.confidence = confidence
+        return scored
+
+    def __reduce__(self):
+        return ScoredText, (str(self), self.confidence)
+
+
+def glyph_vector(glyph):
+    """Resize a white-on-black glyph to GLYPH_SIZE and normalise it for correlation"""
+    vector = cv2.resize(glyph, GLYPH_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    # A little blur makes the score tolerant of stroke width and one-pixel shifts
+    vector = cv2.GaussianBlur(vector, (3, 3), 0).ravel()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def render_templates(fonts=(cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX), thicknesses=(1, 2, 3)):
+    """Built-in templates drawn with OpenCV's fonts (the font the synthetic cards use)
+
+    Real cards should use templates harvested from card crops with `python digit_reader.py build`.
+    """
+    vectors, labels = [], []
+    for font in fonts:
+        for thickness in thicknesses:
+            for digit in DIGITS:
+                canvas = np.zeros((60, 50), dtype=np.uint8)
+                cv2.putText(canvas, digit, (5, 48), font, 1.5, 255, thickness, cv2.LINE_AA)
+                _, canvas = cv2.threshold(canvas, 127, 255, cv2.THRESH_BINARY)
+                ys, xs = np.nonzero(canvas)
+                vectors.append(glyph_vector(canvas[ys.min():ys.max() + 1, xs.min():xs.max() + 1]))
+                labels.append(digit)
+    return np.array(vectors), np.array(labels)
+
+
+class DigitTemplateReader:
+    """Reads the `dddd-dd` student number by matching segmented glyphs against digit templates
+
+    The field crop is split into glyphs with connected components; all digit glyphs are
+    then scored against every template with a single matrix product (normalised
+    correlation), so a whole number costs one small NumPy multiply.
+    """
+
+    def __init__(self, templates=None, labels=None, min_confidence=0.75, min_margin=0.1):
+        if templates is None:
+            templates, labels = render_templates()
+        self.templates = np.asarray(templates, dtype=np.float32)  # (n_templates, glyph pixels)
+        self.labels = np.asarray(labels)
+        self.min_confidence = min_confidence
+        # Similar digits (8/0, 3/8, 6/5) can all correlate well with a glyph in an unfamiliar
+        # font; a read is only trusted when the winner is clearly ahead of every other digit
+        self.min_margin = min_margin
+        self.digits = sorted(set(self.labels.tolist()))
+        self.digit_columns = [np.flatnonzero(self.labels == digit) for digit in self.digits]
+
+    @classmethod
+    def load(cls, path=DEFAULT_TEMPLATES_PATH, **kwargs):
+        """Templates saved by `build`, the rendered ones for BUILTIN_TEMPLATES, or None if the file is missing"""
+        if path == BUILTIN_TEMPLATES:
+            return cls(**kwargs)
+        if path and os.path.exists(path):
+            data = np.load(path)
+            return cls(data["templates"], data["labels"], **kwargs)
+        return None
+
+    def save(self, path):
+        np.savez_compressed(path, templates=self.templates, labels=self.labels)
+
+    @staticmethod
+    def binarize(image):
+        """Text becomes white on black whatever the crop's polarity or channels"""
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # The card background is the majority of the crop
+        if np.count_nonzero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)
+        return binary
+
+    def segment(self, image):
+        """Return the glyph images of the crop from left to right, or None if it does not split cleanly"""
+        binary = self.binarize(image)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        boxes = [list(stats[i, :4]) for i in range(1, count) if stats[i, cv2.CC_STAT_AREA] >= 4]
+        if not boxes:
+            return None
+        tallest = max(box[3] for box in boxes)
+        # Specks and stray marks are much shorter than digits; the dash is short but wide
+        boxes = [box for box in boxes if box[3] >= tallest * 0.5 or box[2] >= tallest * 0.25]
+        boxes.sort(key=lambda box: box[0])
+
+        # Pieces of a broken glyph overlap horizontally - join them back into one box
+        merged = []
+        for x, y, w, h in boxes:
+            if merged:
+                mx, my, mw, mh = merged[-1]
+                overlap = min(mx + mw, x + w) - max(mx, x)
+                if overlap > min(mw, w) * 0.5:
+                    left, top = min(mx, x), min(my, y)
+                    merged[-1] = [left, top, max(mx + mw, x + w) - left, max(my + mh, y + h) - top]
+                    continue
+            merged.append([x, y, w, h])
+
+        glyphs = []
+        for x, y, w, h in merged:
+            glyph = binary[y:y + h, x:x + w]
+            if h >= tallest * 0.5 and w > h * DIGIT_ASPECT * 1.5:
+                parts = int(round(w / (h * DIGIT_ASPECT)))
+                glyphs.extend((part, False) for part in self.split_touching(glyph, parts))
+            else:
+                glyphs.append((glyph, h < tallest * 0.5))
+        if len(glyphs) != len(STUDENT_NO_GLYPHS):
+            return None
+        return glyphs
+
+    @staticmethod
+    def split_touching(glyph, parts):
+        """Cut a box holding several touching digits at the thinnest columns near the expected cuts"""
+        columns = np.count_nonzero(glyph, axis=0)
+        width = glyph.shape[1]
+        step = width / float(parts)
+        cuts = [0]
+        for k in range(1, parts):
+            low, high = int(k * step - step * 0.25), int(k * step + step * 0.25) + 1
+            cuts.append(low + int(np.argmin(columns[low:high])))
+        cuts.append(width)
+        pieces = []
+        for left, right in zip(cuts, cuts[1:]):
+            piece = glyph[:, left:right]
+            rows = np.flatnonzero(np.count_nonzero(piece, axis=1))
+            pieces.append(piece[rows.min():rows.max() + 1] if rows.size else piece)
+        return pieces
+
+    def read(self, image):
+        """Return a DigitReading for the crop, or None if it does not look like a student number"""
+        glyphs = self.segment(image)
+        if glyphs is None:
+            return None
+        # The dash must be where the layout expects it and nowhere else
+        if [is_dash for _, is_dash in glyphs] != [kind == "-" for kind in STUDENT_NO_GLYPHS]:
+            return None
+
+        digits = np.array([glyph_vector(glyph) for glyph, is_dash in glyphs if not is_dash])
+        scores = digits @ self.templates.T  # (6 glyphs, n_templates)
+        # Best template of each digit, so the runner-up below is always a different digit
+        digit_scores = np.stack([scores[:, columns].max(axis=1) for columns in self.digit_columns], axis=1)
+        ranked = np.sort(digit_scores, axis=1)
+        best = digit_scores.argmax(axis=1)
+        confidences = np.clip(ranked[:, -1], 0.0, 1.0)
+        margins = ranked[:, -1] - ranked[:, -2] if len(self.digits) > 1 else confidences
+
+        characters = iter(self.digits[index] for index in best)
+        text = "".join(next(characters) if kind == "d" else "-" for kind in STUDENT_NO_GLYPHS)
+        return DigitReading(text, [float(c) for c in confidences], [float(m) for m in margins])
+
+    def accepts(self, reading):
+        """True if a reading is confident and unambiguous enough to skip tesseract"""
+        return (reading is not None and reading.confidence >= self.min_confidence and
+                reading.margin >= self.min_margin)
+
+
+class TemplateDigitBackend(OCRBackend):
+    """Reads number fields with DigitTemplateReader and everything else with the wrapped engine
+
+    Tesseract is only asked for a number field when the template read is missing, any
+    glyph falls below the reader's confidence threshold or is too close to another digit.
+    Template reads come back as ScoredText so the vote sees their confidence.
+    """
+
+    def __init__(self, fallback, reader=None, fields=("student_no",)):
+        self.fallback = fallback
+        self.reader = reader if reader is not None else DigitTemplateReader()
+        self.fields = tuple(fields)
+        self.name = f"{fallback.name}+templates"
+        self.lock = threading.Lock()
+
+        # Stats
+        self.template_reads = 0
+        self.fallback_reads = 0
+
+    def image_to_string(self, image, config='--psm 6'):
+        return self.fallback.image_to_string(image, config)
+
+    def read_field(self, image, config):
+        reading = self.reader.read(image)
+        if self.reader.accepts(reading):
+            with self.lock:
+                self.template_reads += 1
+            return ScoredText(reading.text, reading.confidence)
+        with self.lock:
+            self.fallback_reads += 1
+        return self.fallback.image_to_string(image, config)
+
+    def read_regions(self, regions):
+        texts = {}
+        for name, image, config in regions:
+            if name in self.fields:
+                texts[name] = self.read_field(image, config)
+            else:
+                texts[name] = self.fallback.image_to_string(image, config)
+        return texts
+
+    def hit_rate(self):
+        total = self.template_reads + self.fallback_reads
+        return self.template_reads / total if total else 0.0
+
+    def summary(self):
+        return (f"Digit templates: {self.template_reads} number reads, {self.fallback_reads} tesseract fallbacks "
+                f"({self.hit_rate():.0%} without tesseract)")
+
+    def close(self):
+        self.fallback.close()
+
+    def __getstate__(self):
+        # The lock stays behind; worker processes keep their own counts
+        state = dict(self.__dict__)
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+
+def add_digit_templates(backend, path=DEFAULT_TEMPLATES_PATH):
+    """Wrap an OCR backend in TemplateDigitBackend if templates exist at path, else return it unchanged"""
+    reader = DigitTemplateReader.load(path)
+    if reader is None:
+        print(f"No digit templates at {path} - student numbers are read by tesseract "
+              f"(build them with `python digit_reader.py build`, or pass '{BUILTIN_TEMPLATES}')")
+        return backend
+    return TemplateDigitBackend(backend, reader)
+
+
+def harvest_templates(paths, reader):
+    """Cut labelled glyphs out of student number crops named after their number (e.g. 1284-21_a.png)"""
+    vectors, labels = [], []
+    for path in paths:
+        match = re.match(r'(\d{4}-\d{2})', os.path.basename(path))
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if match is None or image is None:
+            print(f"Skipping {path} (unreadable or not named after its number)")
+            continue
+        glyphs = reader.segment(image)
+        if glyphs is None:
+            print(f"Skipping {path} (could not split it into {len(STUDENT_NO_GLYPHS)} glyphs)")
+            continue
+        for (glyph, is_dash), character in zip(glyphs, match.group(1)):
+            if not is_dash and character != "-":
+                vectors.append(glyph_vector(glyph))
+                labels.append(character)
+    return np.array(vectors), np.array(labels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Student number digit templates")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Build templates from student number crops named after their number")
+    build_parser.add_argument("images", nargs="+")
+    build_parser.add_argument("--output", default=DEFAULT_TEMPLATES_PATH)
+    read_parser = commands.add_parser("read", help="Read student number crops with the current templates")
+    read_parser.add_argument("images", nargs="+")
+    read_parser.add_argument("--templates", default=DEFAULT_TEMPLATES_PATH,
+                             help=f"Template file, or '{BUILTIN_TEMPLATES}' for the rendered ones")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        templates, labels = harvest_templates(args.images, DigitTemplateReader())
+        missing = sorted(set(DIGITS) - set(labels.tolist()))
+        if missing:
+            print(f"No samples of {', '.join(missing)} - add crops containing them")
+        if len(labels):
+            DigitTemplateReader(templates, labels).save(args.output)
+            print(f"{len(labels)} templates written to {args.output}")
+    elif args.command == "read":
+        reader = DigitTemplateReader.load(args.templates)
+        if reader is None:
+            parser.error(f"No templates at {args.templates} - build them first or use --templates {BUILTIN_TEMPLATES}")
+        for path in args.images:
+            image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            print(f"{path}: {reader.read(image) if image is not None else 'unreadable'}")
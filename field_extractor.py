@@ -0,0 +1,150 @@
+import re
+
+# What the extractor looks for in OCR text. Everything is compiled once in FieldExtractor.
+EXTRACTION_RULES = {
+    "student_no_pattern": r'\b\d{4}-\d{2}\b',  # Like 1284-21
+    "field_student_no_pattern": r'\d{4}-\d{2}',  # The student number crop holds nothing else
+    # Lines containing any of these are card labels, never names
+    "excluded_labels": [
+        "STUDENT NO", "STUDENT NO.", "NAME", "COURSE", "YEAR",
+        "LYCEUM", "REPUBLIC", "PHILIPPINES", "ALABANG", "CERTIFIED",
+        "SEMESTER", "SCHOOL", "COLLEGE", "ENGINEERING", "BSCPE",
+        "THIRD YEAR", "2ND SEMESTER", "2023-2024"
+    ],
+    "name_label": "NAME",
+    "name_lookahead": 3,  # Lines after the NAME label searched for the name
+    "name": {
+        "min_length": 3,
+        "min_single_word_length": 4,
+        "min_alpha_ratio": 0.6,
+        "max_digit_run": 1,  # Longest run of digits allowed in a name
+        "unwanted_chars": "@#$%^&*()+={}[]|\\/<>?`~",
+    },
+}
+
+# Confidence of each way a field can be found
+NAME_SAME_LINE = 1.0      # "NAME: Juan Dela Cruz"
+NAME_AFTER_LABEL = 0.9    # Name on a line after the NAME label
+NAME_BY_PATTERN = 0.6     # Name-like line after the student number, no label seen
+NUMBER_UNIQUE = 1.0
+NUMBER_CONFLICTING = 0.5  # Several different numbers in the same text
+
+
+class ExtractionResult:
+    """Student number and name read from OCR text, with a 0..1 confidence per field"""
+
+    def __init__(self, student_no="", name="", confidence=None):
+        self.student_no = student_no
+        self.name = name
+        self.confidence = confidence or {"student_no": 0.0, "name": 0.0}
+
+    def __iter__(self):
+        # Unpacks like the old (student_no, name) tuple
+        return iter((self.student_no, self.name))
+
+    def __repr__(self):
+        return f"ExtractionResult({self.student_no!r}, {self.name!r}, confidence={self.confidence})"
+
+
+class FieldExtractor:
+    """Finds the student number and name in OCR text using rules compiled once up front"""
+
+    def __init__(self, rules=None):
+        rules = rules or EXTRACTION_RULES
+        name_rules = rules["name"]
+        self.student_no_pattern = re.compile(rules["student_no_pattern"])
+        self.field_student_no_pattern = re.compile(rules["field_student_no_pattern"])
+        # One alternation instead of a substring test per label; longest labels first
+        labels = sorted(set(label.upper() for label in rules["excluded_labels"]), key=len, reverse=True)
+        self.label_pattern = re.compile("|".join(re.escape(label) for label in labels)) if labels else None
+        self.name_label = rules["name_label"].upper()
+        self.name_lookahead = rules["name_lookahead"]
+        self.min_length = name_rules["min_length"]
+        self.min_single_word_length = name_rules["min_single_word_length"]
+        self.min_alpha_ratio = name_rules["min_alpha_ratio"]
+        self.digit_run_pattern = re.compile(r'\d{%d,}' % (name_rules["max_digit_run"] + 1))
+        self.unwanted_pattern = re.compile("[" + re.escape(name_rules["unwanted_chars"]) + "]")
+        self.special_pattern = re.compile(r'[^a-zA-Z\s.\'-]')
+        self.space_pattern = re.compile(r'\s+')
+
+    def clean_special_characters(self, text):
+        """Keep only letters, spaces, periods, hyphens and apostrophes (common in names)"""
+        if not text:
+            return ""
+        cleaned = self.space_pattern.sub(' ', self.special_pattern.sub('', text)).strip()
+        return cleaned.strip('.-')
+
+    def is_valid_name(self, text, check_labels=True):
+        """Check if a text line is likely to be a valid name"""
+        if not text or len(text.strip()) < self.min_length:
+            return False
+        if check_labels and self.label_pattern is not None and self.label_pattern.search(text.upper()):
+            return False
+        if self.digit_run_pattern.search(text) or self.unwanted_pattern.search(text):
+            return False
+        if sum(1 for c in text if c.isalpha()) / len(text) < self.min_alpha_ratio:
+            return False
+
+        # Several words with at least one capitalised, or one substantial word
+        words = text.split()
+        if len(words) >= 2:
+            return any(word[0].isupper() for word in words)
+        return len(words) == 1 and len(text) >= self.min_single_word_length
+
+    def extract(self, text):
+        """Read the student number and name from whole-card OCR text"""
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        student_no = ""
+        numbers_seen = set()
+        name = ""
+        name_confidence = 0.0
+
+        for i, line in enumerate(lines):
+            match = self.student_no_pattern.search(line)
+            if match:
+                student_no = match.group()
+                numbers_seen.add(student_no)
+
+            if name:
+                continue
+
+            if self.name_label in line.upper():
+                # The name may follow "NAME:" on the same line...
+                if ":" in line:
+                    cleaned = self.clean_special_characters(line.split(":", 1)[1].strip())
+                    if self.is_valid_name(cleaned):
+                        name, name_confidence = cleaned, NAME_SAME_LINE
+                        continue
+                # ...or sit on one of the next few lines
+                for next_line in lines[i + 1:i + 1 + self.name_lookahead]:
+                    cleaned = self.clean_special_characters(next_line)
+                    if self.is_valid_name(cleaned):
+                        name, name_confidence = cleaned, NAME_AFTER_LABEL
+                        break
+            elif student_no:
+                # No label seen - take the first name-like line after the student number
+                cleaned = self.clean_special_characters(line)
+                if self.is_valid_name(cleaned):
+                    name, name_confidence = cleaned, NAME_BY_PATTERN
+
+        number_confidence = 0.0
+        if student_no:
+            number_confidence = NUMBER_UNIQUE if len(numbers_seen) == 1 else NUMBER_CONFLICTING
+        return ExtractionResult(student_no, name, {"student_no": number_confidence, "name": name_confidence})
+
+    def extract_fields(self, texts):
+        """Validate text read from the individual student number and name field crops"""
+        student_no = ""
+        match = self.field_student_no_pattern.search(texts.get("student_no", ""))
+        if match:
+            student_no = match.group()
+
+        # The name field holds only the name, so no label filtering is needed
+        name = self.clean_special_characters(texts.get("name", "").strip())
+        if not self.is_valid_name(name, check_labels=False):
+            name = ""
+
+        # Readers that score their own reads (the digit templates) attach that score to the text
+        number_confidence = getattr(texts.get("student_no"), "confidence", 1.0) if student_no else 0.0
+        return ExtractionResult(student_no, name, {"student_no": number_confidence,
+                                                   "name": 1.0 if name else 0.0})
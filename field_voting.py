@@ -0,0 +1,72 @@
+import time
+
+
+class FieldVoter:
+    """Accumulates OCR readings per field across passes and accepts a value once enough passes agree"""
+
+    def __init__(self, fields=("student_no", "name"), quorum=2, min_agreement=0.6, max_age=15.0):
+        self.fields = tuple(fields)
+        self.quorum = quorum                # Matching reads needed before a value is accepted
+        self.min_agreement = min_agreement  # Share of all recent reads the winner must hold
+        self.max_age = max_age              # Reads older than this (seconds) no longer count
+        self.reset()
+
+    def reset(self):
+        """Forget every candidate"""
+        # field -> value -> list of (timestamp, confidence)
+        self.candidates = {field: {} for field in self.fields}
+
+    def expire(self, now):
+        """Drop reads older than max_age"""
+        for field, values in self.candidates.items():
+            for value in list(values):
+                reads = [read for read in values[value] if now - read[0] <= self.max_age]
+                if reads:
+                    values[value] = reads
+                else:
+                    del values[value]
+
+    def add(self, field, value, confidence=1.0, now=None):
+        """Record one reading of a field"""
+        if not value:
+            return
+        now = time.time() if now is None else now
+        self.candidates[field].setdefault(value, []).append((now, confidence))
+        self.expire(now)
+
+    def tally(self, field):
+        """Return [(value, votes, confidence_sum)] sorted best first"""
+        rows = [(value, len(reads), sum(conf for _, conf in reads))
+                for value, reads in self.candidates[field].items()]
+        return sorted(rows, key=lambda row: (row[1], row[2]), reverse=True)
+
+    def best(self, field):
+        """Leading value for a field, or "" if nothing has been read"""
+        rows = self.tally(field)
+        return rows[0][0] if rows else ""
+
+    def accepted(self, field):
+        """Return the accepted value for a field, or "" if there is no quorum yet"""
+        rows = self.tally(field)
+        if not rows:
+            return ""
+        value, votes, _ = rows[0]
+        total_votes = sum(row[1] for row in rows)
+        if votes >= self.quorum and votes / float(total_votes) >= self.min_agreement:
+            return value
+        return ""
+
+    def agreement(self, field):
+        """Share of recent reads that agree with the leading value (0 when nothing was read)"""
+        rows = self.tally(field)
+        if not rows:
+            return 0.0
+        return rows[0][1] / float(sum(row[1] for row in rows))
+
+    def all_accepted(self):
+        """True once every field has reached quorum"""
+        return all(self.accepted(field) for field in self.fields)
+
+    def describe(self, field):
+        """Short text summary of the candidates for logging"""
+        return ", ".join(f"{value} x{votes}" for value, votes, _ in self.tally(field)) or "none"
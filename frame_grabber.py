@@ -0,0 +1,130 @@
+import threading
+import time
+
+
+class FrameGrabber:
+    """Background capture thread that always keeps the newest frame"""
+
+    def __init__(self, source, stats_interval=5.0, lossless=None, metrics=None, tracer=None):
+        # source is a FrameSource; read() returns (ret, frame) and finished marks the end of a replay
+        self.source = source
+        self.stats_interval = stats_interval
+        self.metrics = metrics  # Optional PipelineMetrics that receives capture timings
+        self.tracer = tracer    # Optional ScanTracer that records each read as a span
+        # Replays wait for each frame to be consumed so runs are repeatable; live cameras drop instead
+        self.lossless = (not source.realtime) if lossless is None else lossless
+
+        # Latest-frame slot (older unread frames are simply overwritten)
+        self.lock = threading.Lock()
+        self.consumed = threading.Condition(self.lock)
+        self.frame_ready = threading.Condition(self.lock)
+        self.latest_ret = False
+        self.latest_frame = None
+        self.latest_id = 0
+        self.consumed_id = 0
+
+        self.thread = None
+        self.running = False
+        self.finished = False
+
+        # Counters for FPS reporting
+        self.captured_count = 0
+        self.dropped_count = 0
+        self.displayed_count = 0
+        self.start_time = time.time()
+        self.last_report_time = time.time()
+        self.last_report_counts = (0, 0, 0)
+
+    def start(self):
+        """Start the capture thread"""
+        if self.running:
+            return
+        self.running = True
+        self.start_time = time.time()
+        self.thread = threading.Thread(target=self._capture_loop, name="FrameGrabber", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the capture thread and wait for it to finish"""
+        self.running = False
+        with self.lock:
+            self.consumed.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def _capture_loop(self):
+        """Read frames as fast as the camera delivers them"""
+        while self.running:
+            read_start = time.perf_counter()
+            read_start_time = time.time()
+            ret, frame = self.source.read()
+            if self.metrics is not None and ret:
+                self.metrics.observe("capture", (time.perf_counter() - read_start) * 1000)
+            if self.tracer is not None and self.tracer.enabled:
+                self.tracer.complete("frame_grab", read_start_time, time.time(), "capture",
+                                     frame=self.latest_id + 1, ok=bool(ret))
+
+            if not ret and self.source.finished:
+                # End of a replay - nothing more will arrive
+                with self.lock:
+                    self.finished = True
+                    self.frame_ready.notify_all()
+                break
+
+            with self.lock:
+                if self.lossless:
+                    while self.running and self.latest_id != self.consumed_id:
+                        self.consumed.wait(0.1)
+
+                if ret and frame is not None:
+                    self.captured_count += 1
+                    # Previous frame was never picked up by the UI loop
+                    if self.latest_ret and self.latest_id != self.consumed_id:
+                        self.dropped_count += 1
+                self.latest_ret = bool(ret) and frame is not None
+                self.latest_frame = frame
+                self.latest_id += 1
+                self.frame_ready.notify_all()
+
+    def read_latest(self, last_id, timeout=None):
+        """Return (frame_id, ret, frame), or None if nothing new since last_id
+
+        Never blocks unless a timeout is given, in which case it waits up to that long for a new frame.
+        """
+        with self.lock:
+            if self.latest_id == last_id and timeout and not self.finished:
+                self.frame_ready.wait(timeout)
+            if self.latest_id == last_id:
+                return None
+            self.consumed_id = self.latest_id
+            self.consumed.notify_all()
+            return self.latest_id, self.latest_ret, self.latest_frame
+
+    def mark_displayed(self):
+        """Count a frame that actually reached the screen"""
+        self.displayed_count += 1
+
+    def get_fps(self):
+        """Return (captured, dropped, displayed) FPS since the last call"""
+        now = time.time()
+        elapsed = max(now - self.last_report_time, 1e-6)
+        counts = (self.captured_count, self.dropped_count, self.displayed_count)
+        rates = tuple((c - p) / elapsed for c, p in zip(counts, self.last_report_counts))
+        self.last_report_time = now
+        self.last_report_counts = counts
+        return rates
+
+    def maybe_report(self):
+        """Print FPS statistics every stats_interval seconds"""
+        if time.time() - self.last_report_time < self.stats_interval:
+            return
+        captured, dropped, displayed = self.get_fps()
+        print(f"Capture: {captured:.1f} fps | Dropped: {dropped:.1f} fps | Displayed: {displayed:.1f} fps")
+
+    def print_summary(self):
+        """Print totals for the whole run"""
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        print(f"Frames: {self.captured_count} captured, {self.dropped_count} dropped, "
+              f"{self.displayed_count} displayed in {elapsed:.1f} s "
+              f"({self.displayed_count / elapsed:.1f} fps displayed)")
@@ -0,0 +1,121 @@
+import cv2
+
+
+class FrameQuality:
+    """Cheap image-quality measurements of one scan region"""
+
+    def __init__(self, sharpness, glare, contrast, max_glare):
+        self.sharpness = sharpness  # Variance of the Laplacian - drops sharply with motion blur
+        self.glare = glare          # Share of saturated pixels
+        self.contrast = contrast    # Standard deviation of the gray levels
+        # Glare hides text without blurring the rest, so it scales the score down to 0 at max_glare
+        self.score = sharpness * max(0.0, 1.0 - glare / max_glare)
+
+    def __repr__(self):
+        return (f"FrameQuality(score={self.score:.0f}, sharpness={self.sharpness:.0f}, "
+                f"glare={self.glare:.1%}, contrast={self.contrast:.0f})")
+
+
+class FrameQualityScorer:
+    """Scores scan regions for OCR on a small grayscale copy (about a millisecond per frame)"""
+
+    def __init__(self, sample_width=320, glare_level=250, max_glare=0.25, min_contrast=12.0):
+        self.sample_width = sample_width  # Enough resolution to keep text strokes for the Laplacian
+        self.glare_level = glare_level    # Gray level counted as saturated
+        self.max_glare = max_glare        # Saturated share at which a frame is useless
+        self.min_contrast = min_contrast  # Below this the card is washed out or too dark
+
+    def measure(self, region):
+        height, width = region.shape[:2]
+        if width > self.sample_width:
+            region = cv2.resize(region, (self.sample_width, max(1, int(height * self.sample_width / width))),
+                                interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY) if region.ndim == 3 else region
+        # meanStdDev and countNonZero avoid the float temporaries numpy would allocate
+        _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+        _, gray_std = cv2.meanStdDev(gray)
+        _, saturated = cv2.threshold(gray, self.glare_level - 1, 255, cv2.THRESH_BINARY)
+        glare = cv2.countNonZero(saturated) / float(gray.size)
+        return FrameQuality(float(laplacian_std[0, 0]) ** 2, glare, float(gray_std[0, 0]), self.max_glare)
+
+    def usable(self, quality):
+        return quality.glare < self.max_glare and quality.contrast >= self.min_contrast
+
+
+class BestFrameSelector:
+    """Keeps the best-scoring frame seen since the last OCR pass and hands that to OCR
+
+    Every frame with a card in view is scored; a frame is only copied when it beats
+    the one being held, so a burst of blurred frames costs nothing but the scoring.
+    When even the best frame is blurred or glared, OCR is held back for up to
+    max_wait seconds in the hope of a better one.
+    """
+
+    def __init__(self, scorer=None, max_age=1.5, max_wait=0.5, min_relative_sharpness=0.5):
+        self.scorer = scorer if scorer is not None else FrameQualityScorer()
+        self.max_age = max_age    # Older held frames are dropped (the card may have moved since)
+        self.max_wait = max_wait  # Longest OCR is delayed waiting for a usable frame
+        self.min_relative_sharpness = min_relative_sharpness  # Versus the sharpest frame of this card
+        self.best_frame = None
+        self.best_quality = None
+        self.best_time = 0.0
+        self.card_sharpness = 0.0
+        self.waiting_since = None
+
+        # Stats
+        self.frames_scored = 0
+        self.frames_copied = 0
+        self.selections = 0
+        self.earlier_frame_selected = 0
+        self.deferred = 0
+
+    def offer(self, frame, region, now):
+        """Score a frame's scan region and hold on to the frame if it is the best so far"""
+        quality = self.scorer.measure(region)
+        self.frames_scored += 1
+        self.card_sharpness = max(self.card_sharpness, quality.sharpness)
+        if self.best_frame is not None and now - self.best_time > self.max_age:
+            self.best_frame = None
+        if self.best_frame is None or quality.score > self.best_quality.score:
+            # Copy, because the caller draws the overlay onto the live frame
+            self.best_frame = frame.copy()
+            self.best_quality = quality
+            self.best_time = now
+            self.frames_copied += 1
+        return quality
+
+    def usable(self, quality):
+        return (self.scorer.usable(quality) and
+                quality.sharpness >= self.card_sharpness * self.min_relative_sharpness)
+
+    def select(self, now):
+        """Return (frame, quality) to OCR now, or None to wait for a better frame"""
+        if self.best_frame is None:
+            return None
+        if not self.usable(self.best_quality):
+            if self.waiting_since is None:
+                self.waiting_since = now
+            if now - self.waiting_since < self.max_wait:
+                self.deferred += 1
+                return None
+        frame, quality = self.best_frame, self.best_quality
+        if now - self.best_time > 0:
+            self.earlier_frame_selected += 1
+        self.selections += 1
+        # The next OCR pass gets a fresh window
+        self.best_frame = None
+        self.best_quality = None
+        self.waiting_since = None
+        return frame, quality
+
+    def reset(self):
+        """Forget the held frame and the card's sharpness (the card left)"""
+        self.best_frame = None
+        self.best_quality = None
+        self.card_sharpness = 0.0
+        self.waiting_since = None
+
+    def summary(self):
+        return (f"Frame selection: {self.frames_scored} frames scored, {self.frames_copied} copied, "
+                f"{self.earlier_frame_selected}/{self.selections} OCR passes used an earlier, sharper frame, "
+                f"{self.deferred} deferred for quality")
@@ -0,0 +1,525 @@
+import glob
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from card_locator import CARD_LAYOUT
+
+DEFAULT_CAMERA_PROFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "camera_profile.json")
+
+
+class FrameSource:
+    """Base class for anything the scanner can read frames from"""
+
+    name = "source"
+    realtime = True  # Live sources drop frames; replays can be processed losslessly
+
+    def __init__(self):
+        self.finished = False  # Set once a finite source has no more frames
+
+    def open(self):
+        """Prepare the source; returns True on success"""
+        return True
+
+    def is_opened(self):
+        return True
+
+    def read(self):
+        """Return (ret, frame) like cv2.VideoCapture.read"""
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class CameraProbe:
+    """Captures opened by the probe threads; one that opens after the deadline is released at once
+
+    A late capture would otherwise hold the device with nothing left to release it,
+    and the next reconnect could fail to open the camera.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.found = {}  # cam_index -> (backend, capture)
+        self.done = False
+
+    def offer(self, cam_index, backend, cap):
+        with self.lock:
+            if not self.done:
+                self.found[cam_index] = (backend, cap)
+                return
+        cap.release()
+
+    def finish(self):
+        """Stop accepting captures and return the ones found in time"""
+        with self.lock:
+            self.done = True
+            return dict(self.found)
+
+
+class CameraSource(FrameSource):
+    """Live webcam, probing indices and backends until one delivers frames"""
+
+    name = "camera"
+
+    BACKENDS = [
+        cv2.CAP_DSHOW,      # DirectShow (Windows)
+        cv2.CAP_MSMF,       # Microsoft Media Foundation
+        cv2.CAP_V4L2,       # Video4Linux (Linux)
+        cv2.CAP_ANY         # Auto-detect
+    ]
+
+    def __init__(self, camera_index=None, profile_path=DEFAULT_CAMERA_PROFILE, probe_count=5, probe_timeout=5.0):
+        super().__init__()
+        self.cap = None
+        # None means probe every index; otherwise only this camera is tried
+        self.requested_index = camera_index
+        self.camera_index = camera_index if camera_index is not None else 0
+        self.profile_path = profile_path    # Working index/backend/resolution from the last start
+        self.probe_count = probe_count      # Indices 0..probe_count-1 are probed when there is no profile
+        self.probe_timeout = probe_timeout  # Seconds to wait for probe threads
+
+    def open(self):
+        return self.initialize_camera()
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self):
+        return self.safe_read_frame()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def load_profile(self):
+        """Return the saved camera profile, or None if there is no usable one"""
+        if not self.profile_path or not os.path.exists(self.profile_path):
+            return None
+        try:
+            with open(self.profile_path, "r") as f:
+                profile = json.load(f)
+            if self.requested_index is not None and profile.get("camera_index") != self.requested_index:
+                return None
+            return profile
+        except Exception as e:
+            print(f"Ignoring unreadable camera profile: {e}")
+            return None
+
+    def save_profile(self, backend):
+        """Remember the working camera so the next start can skip probing"""
+        if not self.profile_path:
+            return
+        profile = {
+            "camera_index": self.camera_index,
+            "backend": backend,
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+        try:
+            with open(self.profile_path, "w") as f:
+                json.dump(profile, f, indent=2)
+            print(f"Camera profile saved to: {self.profile_path}")
+        except Exception as e:
+            print(f"Could not save camera profile: {e}")
+
+    @staticmethod
+    def open_capture(cam_index, backend, width=1280, height=720):
+        """Open one index/backend pair and return the capture if it delivers a frame, else None"""
+        try:
+            cap = cv2.VideoCapture(cam_index, backend)
+            if not cap.isOpened():
+                cap.release()
+                return None
+
+            # Set buffer size to reduce latency
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+            # Test if we can actually read frames
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                cap.release()
+                return None
+
+            # Try to set resolution (don't fail if it doesn't work)
+            try:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            except Exception:
+                pass
+            return cap
+        except Exception as e:
+            print(f"  Camera {cam_index} backend {backend} failed: {e}")
+            return None
+
+    def probe_index(self, cam_index, probe):
+        """Try each backend on one index (runs on a probe thread)"""
+        for backend in self.BACKENDS:
+            if probe.done:
+                return
+            cap = self.open_capture(cam_index, backend)
+            if cap is not None:
+                probe.offer(cam_index, backend, cap)
+                return
+
+    def probe_cameras(self):
+        """Probe candidate indices in parallel and keep the lowest one that works"""
+        indices = [self.requested_index] if self.requested_index is not None else list(range(self.probe_count))
+        probe = CameraProbe()
+        threads = []
+        for cam_index in indices:
+            # Daemon threads so a driver that hangs in VideoCapture cannot block shutdown
+            thread = threading.Thread(target=self.probe_index, args=(cam_index, probe), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        deadline = time.time() + self.probe_timeout
+        for thread in threads:
+            thread.join(max(0, deadline - time.time()))
+
+        found = probe.finish()
+        for cam_index, thread in zip(indices, threads):
+            if cam_index not in found and thread.is_alive():
+                print(f"  Camera {cam_index} probe timed out after {self.probe_timeout:.1f}s")
+
+        if not found:
+            return None
+
+        best_index = min(found)
+        for cam_index, (_, cap) in found.items():
+            if cam_index != best_index:
+                cap.release()
+            else:
+                print(f"Found working camera at index {cam_index}")
+        backend, self.cap = found[best_index]
+        self.camera_index = best_index
+        return backend
+
+    def initialize_camera(self):
+        """Initialize camera, trying the saved profile before a full probe"""
+        print("Initializing camera...")
+        start_time = time.time()
+
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+        # Fast path: reopen exactly what worked last time
+        profile = self.load_profile()
+        if profile is not None:
+            cap = self.open_capture(profile["camera_index"], profile["backend"],
+                                    profile.get("width", 1280), profile.get("height", 720))
+            if cap is not None:
+                self.cap = cap
+                self.camera_index = profile["camera_index"]
+                print(f"✓ Camera {self.camera_index} working with backend {profile['backend']} "
+                      f"(profile, {time.time() - start_time:.2f}s)")
+                return True
+            print("Saved camera profile did not work - probing all cameras")
+
+        backend = self.probe_cameras()
+        if backend is None:
+            print(f"❌ Failed to initialize any camera ({time.time() - start_time:.2f}s)")
+            return False
+
+        print(f"✓ Camera {self.camera_index} working with backend {backend} "
+              f"(full probe, {time.time() - start_time:.2f}s)")
+        self.save_profile(backend)
+        return True
+    
+    def reconnect_camera(self):
+        """Attempt to reconnect the camera"""
+        print("Attempting to reconnect camera...")
+        if self.cap is not None:
+            self.cap.release()
+            time.sleep(1)  # Wait a bit before reconnecting
+        
+        return self.initialize_camera()
+    
+    def safe_read_frame(self):
+        """Safely read a frame with error handling"""
+        max_retries = 3
+        retry_count = 0
+        
+        while retry_count < max_retries:
+            if self.cap is None or not self.cap.isOpened():
+                print("Camera not opened, attempting to reconnect...")
+                if not self.reconnect_camera():
+                    return False, None
+            
+            try:
+                ret, frame = self.cap.read()
+                if ret and frame is not None:
+                    return True, frame
+                else:
+                    print(f"Failed to read frame (attempt {retry_count + 1})")
+                    retry_count += 1
+                    time.sleep(0.1)
+                    
+            except Exception as e:
+                print(f"Exception reading frame: {e}")
+                retry_count += 1
+                time.sleep(0.1)
+        
+        # If all retries failed, try to reconnect
+        print("All frame read attempts failed, trying to reconnect camera...")
+        if self.reconnect_camera():
+            try:
+                return self.cap.read()
+            except:
+                return False, None
+        
+        return False, None
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video replayed frame by frame"""
+
+    name = "video"
+
+    def __init__(self, path, loop=False, fps=None):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.fps = fps  # Pace playback at this rate instead of running flat out
+        self.realtime = fps is not None
+        self.cap = None
+        self.frame_interval = 0
+        self.next_frame_time = 0
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            print(f"❌ Could not open video file: {self.path}")
+            return False
+        fps = self.fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_interval = 1.0 / fps
+        print(f"✓ Replaying video {self.path} ({fps:.1f} fps)")
+        return True
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self):
+        if self.finished or not self.is_opened():
+            return False, None
+
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+            return False, None
+
+        if self.realtime:
+            self.next_frame_time = pace(self.next_frame_time, self.frame_interval)
+        return True, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ImageFolderSource(FrameSource):
+    """Still images from a folder, read in file-name order"""
+
+    name = "images"
+    extensions = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, folder, loop=False, fps=None):
+        super().__init__()
+        self.folder = folder
+        self.loop = loop
+        self.realtime = fps is not None
+        self.frame_interval = 1.0 / fps if fps else 0
+        self.next_frame_time = 0
+        self.paths = []
+        self.position = 0
+
+    def open(self):
+        self.paths = sorted(path for path in glob.glob(os.path.join(self.folder, "*"))
+                            if path.lower().endswith(self.extensions))
+        if not self.paths:
+            print(f"❌ No images found in: {self.folder}")
+            return False
+        print(f"✓ Replaying {len(self.paths)} images from {self.folder}")
+        return True
+
+    def is_opened(self):
+        return bool(self.paths)
+
+    def read(self):
+        if self.position >= len(self.paths):
+            if not self.loop or not self.paths:
+                self.finished = True
+                return False, None
+            self.position = 0
+
+        frame = cv2.imread(self.paths[self.position])
+        self.position += 1
+        if frame is None:
+            print(f"Could not read image: {self.paths[self.position - 1]}")
+            return False, None
+
+        if self.realtime:
+            self.next_frame_time = pace(self.next_frame_time, self.frame_interval)
+        return True, frame
+
+
+class GeneratorSource(FrameSource):
+    """Frames produced in memory by a generator, e.g. synthetic_card_frames()"""
+
+    name = "generator"
+
+    def __init__(self, frame_factory, fps=None):
+        super().__init__()
+        # frame_factory is called on open() so the same replay can be run again
+        self.frame_factory = frame_factory
+        self.realtime = fps is not None
+        self.frame_interval = 1.0 / fps if fps else 0
+        self.next_frame_time = 0
+        self.frames = None
+
+    def open(self):
+        self.frames = iter(self.frame_factory())
+        self.finished = False
+        return True
+
+    def is_opened(self):
+        return self.frames is not None
+
+    def read(self):
+        if self.finished or self.frames is None:
+            return False, None
+        try:
+            frame = next(self.frames)
+        except StopIteration:
+            self.finished = True
+            return False, None
+
+        if self.realtime:
+            self.next_frame_time = pace(self.next_frame_time, self.frame_interval)
+        return True, frame
+
+
+def pace(next_frame_time, frame_interval):
+    """Sleep until next_frame_time and return when the following frame is due"""
+    now = time.time()
+    if next_frame_time > now:
+        time.sleep(next_frame_time - now)
+        now = next_frame_time
+    return now + frame_interval
+
+
+def render_synthetic_card(student_no="1284-21", name="Juan Dela Cruz", layout=None, qr_code=False):
+    """Draw a plain ID card at the canonical layout size with the fields where the layout expects them
+
+    With qr_code the student number is also printed as a QR code right of the number field.
+    """
+    layout = layout or CARD_LAYOUT
+    width, height = layout["size"]
+    card = np.full((height, width, 3), 245, dtype=np.uint8)
+    font_scale = width / 856 * 1.1
+    thickness = max(1, int(round(width / 856 * 2)))
+
+    def put(text, x, y):
+        cv2.putText(card, text, (int(x), int(y)), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, (20, 20, 20), thickness, cv2.LINE_AA)
+
+    put("LYCEUM OF THE PHILIPPINES", width * 0.05, height * 0.15)
+    put("COLLEGE OF ENGINEERING", width * 0.05, height * 0.28)
+    labels = {"student_no": ("STUDENT NO:", student_no), "name": ("NAME:", name)}
+    for field_name, (label, value) in labels.items():
+        fx, fy, fw, fh = layout["fields"][field_name]["rect"]
+        baseline = (fy + fh * 0.75) * height
+        put(label, width * 0.03, baseline)
+        put(value, (fx + 0.01) * width, baseline)
+    put("COURSE: BSCPE", width * 0.05, height * 0.92)
+    if qr_code:
+        # Includes the quiet zone; nearest-neighbour keeps the modules sharp
+        code = cv2.QRCodeEncoder.create().encode(student_no)
+        size = int(height * 0.3)
+        x, y = int(width * 0.76), int(height * 0.34)
+        card[y:y + size, x:x + size] = cv2.resize(code, (size, size), interpolation=cv2.INTER_NEAREST)[:, :, None]
+    return card
+
+
+def place_card_in_frame(card, frame_size=(1280, 720), card_width_ratio=0.38, tilt=0.04, background=90):
+    """Warp a card onto a plain background with a slight perspective tilt, centred in the frame"""
+    frame_width, frame_height = frame_size
+    frame = np.full((frame_height, frame_width, 3), background, dtype=np.uint8)
+    card_height, card_width = card.shape[:2]
+    target_width = frame_width * card_width_ratio
+    target_height = target_width * card_height / card_width
+    cx, cy = frame_width / 2, frame_height / 2
+    dx, dy = target_width / 2, target_height / 2
+    skew = tilt * target_width
+    target = np.array([[cx - dx + skew, cy - dy], [cx + dx, cy - dy + skew],
+                       [cx + dx - skew, cy + dy], [cx - dx, cy + dy - skew]], dtype=np.float32)
+    source = np.array([[0, 0], [card_width - 1, 0], [card_width - 1, card_height - 1],
+                       [0, card_height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(source, target)
+    cv2.warpPerspective(card, matrix, (frame_width, frame_height), dst=frame,
+                        borderMode=cv2.BORDER_TRANSPARENT)
+    return frame
+
+
+SYNTHETIC_STUDENTS = [
+    ("1284-21", "Juan Dela Cruz"),
+    ("2031-22", "Maria Santos"),
+    ("1776-23", "Jose Rizal Mercado"),
+]
+
+
+def synthetic_card_frames(cards=3, frame_size=(1280, 720), empty_frames=30, card_frames=90, seed=0,
+                          qr_codes=False):
+    """Yield a deterministic feed: empty background, then a card held for a while, repeated"""
+    rng = np.random.default_rng(seed)
+    background = np.full((frame_size[1], frame_size[0], 3), 90, dtype=np.uint8)
+    for i in range(cards):
+        student_no, name = SYNTHETIC_STUDENTS[i % len(SYNTHETIC_STUDENTS)]
+        for _ in range(empty_frames):
+            yield background.copy()
+        frame = place_card_in_frame(render_synthetic_card(student_no, name, qr_code=qr_codes), frame_size)
+        for _ in range(card_frames):
+            # Light sensor noise so frame differencing sees something realistic
+            noise = rng.integers(0, 3, size=frame.shape, dtype=np.uint8)
+            yield cv2.add(frame, noise)
+    for _ in range(empty_frames):
+        yield background.copy()
+
+
+def add_source_arguments(parser):
+    """Add the frame-source options to an argparse parser"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--camera", type=int, metavar="INDEX", help="Use only this camera index")
+    group.add_argument("--video", metavar="PATH", help="Replay a video file")
+    group.add_argument("--images", metavar="DIR", help="Replay the images in a folder")
+    group.add_argument("--synthetic", type=int, metavar="CARDS", help="Generate a synthetic feed with this many cards")
+    parser.add_argument("--synthetic-qr", action="store_true", help="Print a QR code on the synthetic cards")
+    parser.add_argument("--camera-profile", default=DEFAULT_CAMERA_PROFILE,
+                        help="File that remembers the working camera for fast startup")
+    parser.add_argument("--reprobe", action="store_true", help="Ignore the saved camera profile and probe again")
+    parser.add_argument("--loop", action="store_true", help="Restart video/image replays when they end")
+    parser.add_argument("--fps", type=float, help="Pace replays at this frame rate instead of as fast as possible")
+
+
+def create_frame_source(args):
+    """Build the frame source selected on the command line"""
+    if args.video:
+        return VideoFileSource(args.video, loop=args.loop, fps=args.fps)
+    if args.images:
+        return ImageFolderSource(args.images, loop=args.loop, fps=args.fps)
+    if args.synthetic:
+        return GeneratorSource(lambda: synthetic_card_frames(cards=args.synthetic, qr_codes=args.synthetic_qr),
+                               fps=args.fps)
+    source = CameraSource(args.camera, profile_path=args.camera_profile)
+    if args.reprobe and os.path.exists(args.camera_profile):
+        os.remove(args.camera_profile)
+    return source
@@ -0,0 +1,192 @@
+import argparse
+import sys
+import time
+
+import cv2
+import pygame
+
+from IDscan import IDScanner, add_recognition_arguments
+from frame_sources import add_source_arguments, create_frame_source
+from GUI.confirmation import ConfirmationScreen, already_confirmed_notice, confirm_and_save
+from scan_channel import QueueChannel
+from scan_store import ScanStore, DEFAULT_STORE_PATH
+from roster import Roster
+from pipeline_metrics import add_metrics_arguments, create_metrics
+from scan_trace import add_trace_arguments, create_tracer
+
+SCANNING = "scanning"
+CONFIRMING = "confirming"
+SAVED = "saved"
+
+
+class KioskApp:
+    """Scanner and confirmation screen in one long-lived process
+
+    The camera stays open and the OCR engine stays loaded for the whole session;
+    the kiosk just moves between states: scanning -> confirming -> saved -> scanning.
+    """
+
+    def __init__(self, scanner, screen_size=(1920, 1080), fullscreen=True, saved_message_time=1.5):
+        self.scanner = scanner
+        # Completed scans arrive as ScanRecords on an in-memory channel
+        self.scan_channel = QueueChannel()
+        self.scanner.scan_channel = self.scan_channel
+        self.saved_message_time = saved_message_time
+
+        pygame.init()
+        flags = pygame.FULLSCREEN if fullscreen else 0
+        self.screen = pygame.display.set_mode(screen_size, flags)
+        pygame.display.set_caption("Auto ID Scanner")
+        self.clock = pygame.time.Clock()
+
+        self.confirmation = ConfirmationScreen()
+        self.state = SCANNING
+        self.state_changed_at = time.time()
+        self.last_frame_id = 0
+        self.pending_record = None
+
+    def set_state(self, state):
+        """Move to a new state and log how long the previous one lasted"""
+        now = time.time()
+        print(f"Kiosk: {self.state} -> {state} ({(now - self.state_changed_at) * 1000:.0f} ms in {self.state})")
+        self.state = state
+        self.state_changed_at = now
+
+    def check_scan_channel(self):
+        """Switch to the confirmation screen when the scanner delivers a record"""
+        record = self.scan_channel.receive()
+        if record is None:
+            return
+        print(f"Received {record}")
+        self.pending_record = record
+        self.confirmation.set_data(record.student_no, record.name,
+                                   already_confirmed_notice(self.scanner.scan_store, record.student_no))
+        self.set_state(CONFIRMING)
+
+    def back_to_scanning(self, wait_for_card_removal):
+        """Return to the live feed without touching the camera or OCR engine"""
+        start = time.time()
+        self.pending_record = None
+        self.scanner.resume_scanning(wait_for_card_removal)
+        self.set_state(SCANNING)
+        print(f"Ready for next student in {(time.time() - start) * 1000:.1f} ms")
+
+    def show_frame(self, frame):
+        """Blit a BGR frame to the window, scaled to fit"""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        surface = pygame.image.frombuffer(rgb.tobytes(), (rgb.shape[1], rgb.shape[0]), "RGB")
+        if surface.get_size() != self.screen.get_size():
+            surface = pygame.transform.scale(surface, self.screen.get_size())
+        self.screen.blit(surface, (0, 0))
+
+    def update_scanning(self):
+        """Process the newest camera frame and draw the live view"""
+        latest = self.scanner.frame_grabber.read_latest(self.last_frame_id)
+        self.scanner.process_ocr_results()
+        if latest is None:
+            return
+
+        self.last_frame_id, ret, frame = latest
+        if not ret or frame is None:
+            return
+
+        self.scanner.process_frame(frame)
+        self.scanner.draw_scan_overlay(frame)
+        self.show_frame(frame)
+        self.scanner.frame_grabber.mark_displayed()
+        self.scanner.frame_grabber.maybe_report()
+
+    def handle_event(self, event):
+        """Handle one pygame event; returns False to quit"""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F8:
+            return False
+
+        if self.state == SCANNING:
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                return False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_d:
+                self.scanner.toggle_hud()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_t:
+                self.scanner.tracer.dump("manual")
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                self.scanner.resume_scanning()
+                print("Scan data reset. Looking for new ID...")
+
+        elif self.state == CONFIRMING:
+            action = self.confirmation.handle_event(event)
+            if action == "cancel":
+                # Data was wrong - let the same card be scanned again straight away
+                self.back_to_scanning(wait_for_card_removal=False)
+            elif action == "confirm":
+                record = self.pending_record
+                if confirm_and_save(record.student_no, record.name, self.scanner.scan_store, record.confidence):
+                    self.scanner.remember_confirmed(record.student_no, record.name)
+                    print("Data confirmed and saved successfully")
+                    self.set_state(SAVED)
+                else:
+                    print("Failed to save data")
+
+        return True
+
+    def run(self):
+        """Main kiosk loop"""
+        if not self.scanner.frame_source.is_opened():
+            print("❌ No camera available. Exiting...")
+            return
+
+        print("✓ Kiosk started - press 'q' to quit while scanning, F8 to quit at any time")
+        self.scanner.frame_grabber.start()
+
+        running = True
+        try:
+            while running:
+                for event in pygame.event.get():
+                    if not self.handle_event(event):
+                        running = False
+
+                if self.state == SCANNING:
+                    self.update_scanning()
+                    self.check_scan_channel()
+                elif self.state == CONFIRMING:
+                    self.confirmation.draw(self.screen)
+                elif self.state == SAVED:
+                    self.confirmation.draw_saved(self.screen)
+                    if time.time() - self.state_changed_at >= self.saved_message_time:
+                        # The student is probably still holding the card - wait for a new one
+                        self.back_to_scanning(wait_for_card_removal=True)
+
+                pygame.display.flip()
+                self.clock.tick(60)
+        except KeyboardInterrupt:
+            print("\nKiosk stopped by user")
+        finally:
+            self.scanner.finish_run()
+            pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auto ID Scanner kiosk (scanner and confirmation in one process)")
+    add_source_arguments(parser)
+    parser.add_argument("--ocr-backend", default="pytesseract", help="pytesseract or tesserocr")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="Number of OCR workers")
+    add_recognition_arguments(parser)
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path of the scan database")
+    parser.add_argument("--roster", help="CSV of enrolled students (student_no,name) used to correct misreads")
+    add_metrics_arguments(parser)
+    add_trace_arguments(parser)
+    parser.add_argument("--windowed", action="store_true", help="Run in a window instead of fullscreen")
+    args = parser.parse_args()
+
+    scanner = IDScanner(frame_source=create_frame_source(args),
+                        ocr_workers=args.ocr_workers,
+                        ocr_backend=args.ocr_backend,
+                        ocr_text_height=args.ocr_text_height,
+                        digit_templates=args.digit_templates,
+                        read_codes=args.read_codes,
+                        headless=True,
+                        scan_store=ScanStore(args.store),
+                        roster=Roster.load(args.roster) if args.roster else None,
+                        metrics=create_metrics(args),
+                        tracer=create_tracer(args))  # No OpenCV window - the kiosk draws the frames itself
+    KioskApp(scanner, fullscreen=not args.windowed).run()
+    sys.exit()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from IDscan import IDScanner, add_recognition_arguments
+from frame_sources import (CameraSource, GeneratorSource, VideoFileSource, DEFAULT_CAMERA_PROFILE,
+                           synthetic_card_frames)
+from digit_reader import TemplateDigitBackend, add_digit_templates, DEFAULT_TEMPLATES_PATH
+from ocr_backends import create_ocr_backend
+from ocr_worker import SharedOCRPool
+from pipeline_metrics import PipelineMetrics
+from roster import Roster
+from scan_events import JsonLinesEventSink
+from scan_store import ScanStore, DEFAULT_STORE_PATH
+from text_scale import DEFAULT_TEXT_HEIGHT
+
+
+def lane_profile_path(camera_index):
+    """Each lane remembers its own camera so lanes never overwrite each other's profile"""
+    base, extension = os.path.splitext(DEFAULT_CAMERA_PROFILE)
+    return f"{base}_{camera_index}{extension}"
+
+
+class LaneSupervisor:
+    """Runs several headless scan lanes in one process, all sharing one OCR worker pool
+
+    Every lane is a full IDScanner (its own capture thread, presence gate, votes and
+    state) running on its own thread; only the OCR workers are shared, scheduled
+    round-robin across lanes by SharedOCRPool.
+    """
+
+    def __init__(self, sources, ocr_workers=None, ocr_use_processes=False, ocr_backend="pytesseract",
+                 store_path=DEFAULT_STORE_PATH, roster=None, event_callback=None,
+                 digit_templates=DEFAULT_TEMPLATES_PATH, ocr_text_height=DEFAULT_TEXT_HEIGHT, read_codes=True):
+        # sources: [(lane_name, FrameSource)]
+        ocr_workers = ocr_workers or len(sources)
+        self.ocr_backend = create_ocr_backend(ocr_backend)
+        if digit_templates is not None:
+            self.ocr_backend = add_digit_templates(self.ocr_backend, digit_templates)
+        self.ocr_pool = SharedOCRPool(self.ocr_backend.read_regions, max_workers=ocr_workers,
+                                      use_processes=ocr_use_processes)
+        print(f"Shared OCR pool: {ocr_workers} workers for {len(sources)} lanes")
+
+        self.scanners = []
+        for lane_name, source in sources:
+            scanner = IDScanner(frame_source=source,
+                                headless=True,
+                                event_callback=event_callback,
+                                scan_store=ScanStore(store_path),  # One connection per lane, same WAL database
+                                roster=roster,
+                                metrics=PipelineMetrics(),
+                                ocr_executor=self.ocr_pool.lane(lane_name),
+                                lane=lane_name,
+                                ocr_text_height=ocr_text_height,
+                                read_codes=read_codes)
+            self.scanners.append(scanner)
+        self.threads = []
+
+    def start(self):
+        """Start every lane's scanning loop on its own thread"""
+        for scanner in self.scanners:
+            if not scanner.frame_source.is_opened():
+                print(f"Lane {scanner.lane}: no camera available, skipping")
+                continue
+            thread = threading.Thread(target=scanner.run_headless, name=f"lane-{scanner.lane}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        for scanner in self.scanners:
+            scanner.stop_requested = True
+
+    def run(self):
+        """Run until every lane has finished (replays) or Ctrl+C"""
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self.threads):
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            print("\nStopping lanes...")
+            self.stop()
+        for thread in self.threads:
+            thread.join(timeout=10.0)
+        self.ocr_pool.shutdown()
+        self.print_summary()
+
+    def lane_stats(self):
+        """Per-lane counters and latency percentiles"""
+        stats = {}
+        for scanner in self.scanners:
+            snapshot = scanner.metrics.snapshot()
+            stats[scanner.lane] = {
+                "ids_completed": snapshot["counters"].get("ids_completed", 0),
+                "ocr_calls": snapshot["counters"].get("ocr_calls", 0),
+                "ids_number_from_code": snapshot["counters"].get("ids_number_from_code", 0),
+                "ocr_jobs_dropped": scanner.ocr_executor.stale_dropped_count,
+                "ocr_p50_ms": snapshot["stages"]["ocr"]["p50_ms"],
+                "ocr_p95_ms": snapshot["stages"]["ocr"]["p95_ms"],
+                "time_to_id_p50_ms": snapshot["stages"]["time_to_id"]["p50_ms"],
+                "time_to_id_p95_ms": snapshot["stages"]["time_to_id"]["p95_ms"],
+            }
+        return stats
+
+    def print_summary(self):
+        print("-" * 60)
+        for lane, stats in self.lane_stats().items():
+            print(f"Lane {lane}: {stats['ids_completed']} IDs, {stats['ocr_calls']} OCR calls "
+                  f"({stats['ocr_jobs_dropped']} dropped) | OCR p50 {stats['ocr_p50_ms']:.0f} ms "
+                  f"p95 {stats['ocr_p95_ms']:.0f} ms | time to ID p50 {stats['time_to_id_p50_ms']:.0f} ms "
+                  f"p95 {stats['time_to_id_p95_ms']:.0f} ms")
+        if isinstance(self.ocr_backend, TemplateDigitBackend):
+            print(self.ocr_backend.summary())
+
+
+def create_lane_sources(args):
+    """[(lane_name, FrameSource)] from the command line"""
+    if args.videos:
+        return [(f"video{i}", VideoFileSource(path, loop=args.loop, fps=args.fps))
+                for i, path in enumerate(args.videos)]
+    if args.synthetic:
+        return [(f"synthetic{i}", GeneratorSource(lambda seed=i: synthetic_card_frames(cards=args.synthetic, seed=seed),
+                                                  fps=args.fps))
+                for i in range(args.lanes)]
+    return [(f"camera{index}", CameraSource(index, profile_path=lane_profile_path(index)))
+            for index in args.cameras]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several scan lanes in one process with a shared OCR pool")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--cameras", type=int, nargs="+", metavar="INDEX", help="One lane per camera index")
+    group.add_argument("--videos", nargs="+", metavar="PATH", help="One lane per video file")
+    group.add_argument("--synthetic", type=int, metavar="CARDS", help="Synthetic lanes with this many cards each")
+    parser.add_argument("--lanes", type=int, default=2, help="Number of synthetic lanes")
+    parser.add_argument("--loop", action="store_true", help="Restart video replays when they end")
+    parser.add_argument("--fps", type=float, help="Pace replays at this frame rate")
+    parser.add_argument("--ocr-backend", default="pytesseract", help="pytesseract or tesserocr")
+    parser.add_argument("--ocr-workers", type=int, help="Shared OCR workers (default: one per lane)")
+    parser.add_argument("--ocr-processes", action="store_true", help="Use a process pool instead of threads")
+    add_recognition_arguments(parser)
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path of the scan database")
+    parser.add_argument("--roster", help="CSV of enrolled students (student_no,name) used to correct misreads")
+    parser.add_argument("--stats-file", help="Write per-lane statistics as JSON when the run ends")
+    args = parser.parse_args()
+
+    # Results go to stdout as JSON lines tagged with the lane; logs go to stderr
+    event_callback = JsonLinesEventSink(sys.stdout)
+    sys.stdout = sys.stderr
+
+    supervisor = LaneSupervisor(create_lane_sources(args),
+                                ocr_workers=args.ocr_workers,
+                                ocr_use_processes=args.ocr_processes,
+                                ocr_backend=args.ocr_backend,
+                                store_path=args.store,
+                                roster=Roster.load(args.roster) if args.roster else None,
+                                event_callback=event_callback,
+                                digit_templates=args.digit_templates,
+                                ocr_text_height=args.ocr_text_height,
+                                read_codes=args.read_codes)
+    supervisor.run()
+    if args.stats_file:
+        with open(args.stats_file, "w") as f:
+            json.dump(supervisor.lane_stats(), f, indent=2)
@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+
+
+class OCRBackend:
+    """Base class for OCR engines used by the scanner"""
+
+    name = "base"
+
+    def image_to_string(self, image, config='--psm 6'):
+        """Return the text found in a grayscale or BGR numpy image"""
+        raise NotImplementedError
+
+    def read_regions(self, regions):
+        """OCR a list of (region_name, image, config) and return {region_name: text}"""
+        return {name: self.image_to_string(image, config) for name, image, config in regions}
+
+    def close(self):
+        """Release any resources held by the engine"""
+        pass
+
+
+class PytesseractBackend(OCRBackend):
+    """Original path: pytesseract spawns a tesseract process per call"""
+
+    name = "pytesseract"
+
+    def __init__(self, lang="eng"):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.lang = lang
+
+    def image_to_string(self, image, config='--psm 6'):
+        return self.pytesseract.image_to_string(image, lang=self.lang, config=config)
+
+    def __getstate__(self):
+        # Modules cannot be pickled - re-import in the worker process
+        return {"lang": self.lang}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class TesserocrBackend(OCRBackend):
+    """Long-lived tesseract engine (via tesserocr) that loads the language model once"""
+
+    name = "tesserocr"
+
+    def __init__(self, lang="eng"):
+        import tesserocr
+        self.tesserocr = tesserocr
+        self.lang = lang
+        # One engine per thread because a TessBaseAPI instance is not thread-safe
+        self.local = threading.local()
+        self.apis = []
+        self.apis_lock = threading.Lock()
+
+    def get_api(self):
+        """Return this thread's engine, creating it on first use"""
+        api = getattr(self.local, "api", None)
+        if api is None:
+            api = self.tesserocr.PyTessBaseAPI(lang=self.lang)
+            self.local.api = api
+            self.local.defaults = {}
+            with self.apis_lock:
+                self.apis.append(api)
+        return api
+
+    def apply_config(self, api, config):
+        """Translate a pytesseract-style config string into engine settings"""
+        # Variables stick to the engine, so undo whatever the previous call changed
+        for key, value in self.local.defaults.items():
+            api.SetVariable(key, value)
+
+        tokens = config.split()
+        psm = self.tesserocr.PSM.AUTO
+        i = 0
+        while i < len(tokens):
+            if tokens[i] == "--psm" and i + 1 < len(tokens):
+                psm = int(tokens[i + 1])
+                i += 2
+            elif tokens[i] == "-c" and i + 1 < len(tokens) and "=" in tokens[i + 1]:
+                key, value = tokens[i + 1].split("=", 1)
+                if key not in self.local.defaults:
+                    self.local.defaults[key] = api.GetVariableAsString(key) or ""
+                api.SetVariable(key, value)
+                i += 2
+            else:
+                i += 1
+        api.SetPageSegMode(psm)
+
+    def image_to_string(self, image, config='--psm 6'):
+        api = self.get_api()
+        api.Clear()
+        self.apply_config(api, config)
+
+        # Hand the numpy buffer straight to tesseract - no temp files, no PIL round trip
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        if bytes_per_pixel == 3:
+            image = np.ascontiguousarray(image[:, :, ::-1])  # BGR -> RGB
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        return api.GetUTF8Text()
+
+    def close(self):
+        with self.apis_lock:
+            for api in self.apis:
+                api.End()
+            self.apis = []
+        self.local = threading.local()
+
+    def __getstate__(self):
+        # Engines live per process - workers build their own on first use
+        return {"lang": self.lang}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+OCR_BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+
+def create_ocr_backend(name="pytesseract", lang="eng"):
+    """Create the configured OCR backend, falling back to pytesseract if it is unavailable"""
+    if name not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{name}'. Choose from: {', '.join(OCR_BACKENDS)}")
+
+    try:
+        backend = OCR_BACKENDS[name](lang=lang)
+    except ImportError as e:
+        if name == PytesseractBackend.name:
+            raise
+        print(f"OCR backend '{name}' unavailable ({e}), falling back to pytesseract")
+        backend = PytesseractBackend(lang=lang)
+
+    print(f"✓ Using OCR backend: {backend.name}")
+    return backend
@@ -0,0 +1,267 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import util
+
+# The OCR function of a worker process, unpickled once when the process starts
+_process_ocr_function = None
+
+
+def _init_process_worker(ocr_function):
+    global _process_ocr_function
+    _process_ocr_function = ocr_function
+    backend = getattr(ocr_function, "__self__", None)
+    if hasattr(backend, "close"):
+        # Pool workers leave through os._exit, which skips atexit - multiprocessing still runs finalizers
+        util.Finalize(backend, backend.close, exitpriority=10)
+
+
+def _run_in_process_worker(regions):
+    return _process_ocr_function(regions)
+
+
+def create_ocr_pool(ocr_function, max_workers, use_processes):
+    """Return (pool, function to submit to it)
+
+    A process pool gets the OCR function once per worker through its initializer; submitting
+    a bound method instead would pickle it with every job, so each job would build a fresh
+    backend (and load a fresh tesseract model) in the worker.
+    """
+    if not use_processes:
+        return ThreadPoolExecutor(max_workers=max_workers), ocr_function
+    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_process_worker,
+                               initargs=(ocr_function,))
+    return pool, _run_in_process_worker
+
+
+class OCRResult:
+    """Outcome of one OCR job"""
+
+    def __init__(self, job_id, submitted_at, texts, error=None, started_at=None):
+        self.job_id = job_id
+        self.submitted_at = submitted_at
+        self.started_at = started_at if started_at is not None else submitted_at  # Handed to a worker
+        self.finished_at = time.time()
+        self.texts = texts  # {region_name: text}
+        self.error = error
+        self.duration = self.finished_at - submitted_at
+
+    @classmethod
+    def from_future(cls, job_id, submitted_at, started_at, future):
+        """Result of a finished pool future, with a cancellation or exception recorded as the error"""
+        if future.cancelled():
+            return cls(job_id, submitted_at, {}, error="cancelled", started_at=started_at)
+        if future.exception() is not None:
+            return cls(job_id, submitted_at, {}, error=future.exception(), started_at=started_at)
+        return cls(job_id, submitted_at, future.result(), started_at=started_at)
+
+
+class OCRResultQueue:
+    """Job ids, the waiting job and finished results of one OCR client, drained by the UI loop
+
+    Shared by OCRExecutor and the lanes of a SharedOCRPool; subclasses decide how jobs reach a worker.
+    """
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.next_job_id = 0
+        self.in_flight = 0
+        self.pending_job = None  # Newest job waiting for a free worker
+        self.results = []
+        self.last_delivered_id = 0
+
+        # Stats
+        self.submitted_count = 0
+        self.stale_dropped_count = 0
+
+    def _new_job(self, regions):
+        """Number a job and count it (caller holds the lock)"""
+        self.next_job_id += 1
+        self.submitted_count += 1
+        return self.next_job_id, time.time(), regions
+
+    def _finish_job(self, result):
+        """Queue a finished job's result for poll_results (caller holds the lock)"""
+        self.in_flight -= 1
+        self.results.append(result)
+
+    def poll_results(self):
+        """Return finished results, newest last, skipping any older than one already delivered"""
+        with self.lock:
+            finished = sorted(self.results, key=lambda r: r.job_id)
+            self.results = []
+
+        fresh = []
+        for result in finished:
+            if result.job_id < self.last_delivered_id:
+                self.stale_dropped_count += 1
+                continue
+            self.last_delivered_id = result.job_id
+            fresh.append(result)
+        return fresh
+
+    def discard_results(self):
+        """Forget queued work and ignore results of every job submitted so far"""
+        with self.lock:
+            self.pending_job = None
+            self.results = []
+            self.last_delivered_id = self.next_job_id + 1
+
+    def busy(self):
+        """True while a job is running or waiting"""
+        with self.lock:
+            return self.in_flight > 0 or self.pending_job is not None
+
+
+class OCRExecutor(OCRResultQueue):
+    """Runs OCR jobs on a worker pool and hands results back to the UI loop"""
+
+    def __init__(self, ocr_function, max_workers=1, use_processes=False):
+        # Re-entrant because a done callback can fire inline while submit() holds the lock
+        super().__init__(threading.RLock())
+        # ocr_function(regions) -> {region_name: text}; must be picklable when use_processes is set
+        self.ocr_function = ocr_function
+        self.max_workers = max(1, int(max_workers))
+        self.pool, self.pool_function = create_ocr_pool(ocr_function, self.max_workers, use_processes)
+
+    def submit(self, regions):
+        """Queue a list of (region_name, preprocessed_image, config) for OCR and return its job id (never blocks)"""
+        with self.lock:
+            job = self._new_job(regions)
+
+            if self.in_flight < self.max_workers:
+                self._start_job(job)
+            else:
+                # Only the newest frame is worth reading - replace whatever was waiting
+                if self.pending_job is not None:
+                    self.stale_dropped_count += 1
+                self.pending_job = job
+            return job[0]
+
+    def _start_job(self, job):
+        """Send a job to the pool (caller holds the lock)"""
+        job_id, submitted_at, regions = job
+        started_at = time.time()
+        future = self.pool.submit(self.pool_function, regions)
+        self.in_flight += 1
+        future.add_done_callback(lambda f: self._job_done(job_id, submitted_at, started_at, f))
+
+    def _job_done(self, job_id, submitted_at, started_at, future):
+        """Collect a finished job and start the pending one, if any"""
+        result = OCRResult.from_future(job_id, submitted_at, started_at, future)
+
+        with self.lock:
+            self._finish_job(result)
+            if self.pending_job is not None:
+                job = self.pending_job
+                self.pending_job = None
+                try:
+                    self._start_job(job)
+                except RuntimeError:
+                    # Pool already shut down
+                    pass
+
+    def shutdown(self):
+        """Stop accepting work and drop anything not yet started"""
+        with self.lock:
+            self.pending_job = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SharedOCRPool:
+    """One bounded OCR worker pool shared by several scan lanes
+
+    Each lane keeps at most one job running and one waiting (newer frames replace the
+    waiting one), and free workers go to the waiting lanes in round-robin order, so a busy
+    lane cannot starve the others and every lane's latency stays close to one OCR call.
+    """
+
+    def __init__(self, ocr_function, max_workers=2, use_processes=False, per_lane_limit=1):
+        self.ocr_function = ocr_function
+        self.max_workers = max(1, int(max_workers))
+        self.per_lane_limit = max(1, int(per_lane_limit))
+        self.pool, self.pool_function = create_ocr_pool(ocr_function, self.max_workers, use_processes)
+
+        self.lock = threading.RLock()
+        self.lanes = []
+        self.next_lane = 0  # Round-robin position
+        self.in_flight = 0
+        self.closed = False
+
+    def lane(self, name):
+        """Create the OCRExecutor-compatible client for one lane"""
+        with self.lock:
+            lane = OCRLane(self, name)
+            self.lanes.append(lane)
+            return lane
+
+    def _dispatch(self):
+        """Start waiting jobs while workers are free, visiting lanes in turn (caller holds the lock)"""
+        while not self.closed and self.in_flight < self.max_workers:
+            for offset in range(len(self.lanes)):
+                lane = self.lanes[(self.next_lane + offset) % len(self.lanes)]
+                if lane.pending_job is not None and lane.in_flight < self.per_lane_limit:
+                    self.next_lane = (self.next_lane + offset + 1) % len(self.lanes)
+                    job = lane.pending_job
+                    lane.pending_job = None
+                    self._start_job(lane, job)
+                    break
+            else:
+                return
+
+    def _start_job(self, lane, job):
+        job_id, submitted_at, regions = job
+        started_at = time.time()
+        try:
+            future = self.pool.submit(self.pool_function, regions)
+        except RuntimeError:
+            # Pool already shut down
+            return
+        self.in_flight += 1
+        lane.in_flight += 1
+        future.add_done_callback(lambda f: self._job_done(lane, job_id, submitted_at, started_at, f))
+
+    def _job_done(self, lane, job_id, submitted_at, started_at, future):
+        result = OCRResult.from_future(job_id, submitted_at, started_at, future)
+
+        with self.lock:
+            self.in_flight -= 1
+            lane._finish_job(result)
+            self._dispatch()
+
+    def queue_depth(self):
+        """Number of lanes with a job waiting for a worker"""
+        with self.lock:
+            return sum(1 for lane in self.lanes if lane.pending_job is not None)
+
+    def shutdown(self):
+        """Stop every lane's work"""
+        with self.lock:
+            self.closed = True
+            for lane in self.lanes:
+                lane.pending_job = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class OCRLane(OCRResultQueue):
+    """A lane's view of a SharedOCRPool, with the same interface as OCRExecutor"""
+
+    def __init__(self, shared_pool, name):
+        super().__init__(shared_pool.lock)
+        self.shared_pool = shared_pool
+        self.name = name
+
+    def submit(self, regions):
+        """Queue regions for OCR on the shared pool and return the job id (never blocks)"""
+        with self.lock:
+            job = self._new_job(regions)
+            if self.pending_job is not None:
+                self.stale_dropped_count += 1
+            self.pending_job = job
+            self.shared_pool._dispatch()
+            return job[0]
+
+    def shutdown(self):
+        """Drop this lane's waiting job; the shared pool itself is shut down by its owner"""
+        with self.lock:
+            self.pending_job = None
@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+
+# Canvas fill colour that the overlay itself never draws (no anti-aliasing is used),
+# so every pixel that differs from it belongs to the overlay - including black text backgrounds
+SENTINEL_COLOR = (1, 2, 3)
+
+
+class OverlayCache:
+    """Prerendered overlay layers composited onto frames with precomputed masks"""
+
+    def __init__(self):
+        # layer name -> (key, patches); only the latest state of each layer is kept
+        self.layers = {}
+        self.scan_areas = {}
+        # One scratch canvas per resolution; a render only clears and reads the boxes it draws in
+        self.canvases = {}
+        self.render_count = 0
+
+    def scan_area(self, width, height, calculate):
+        """Return calculate(width, height), computed once per resolution"""
+        key = (width, height)
+        if key not in self.scan_areas:
+            self.scan_areas[key] = calculate(width, height)
+        return self.scan_areas[key]
+
+    def render(self, width, height, draw, boxes):
+        """Run draw() inside the given (x0, y0, x1, y1) boxes and cut them out as masked patches"""
+        canvas = self.canvases.get((width, height))
+        if canvas is None:
+            canvas = np.empty((height, width, 3), dtype=np.uint8)
+            self.canvases[(width, height)] = canvas
+
+        clipped = []
+        for x0, y0, x1, y1 in boxes:
+            x0, y0 = max(int(x0), 0), max(int(y0), 0)
+            x1, y1 = min(int(x1), width), min(int(y1), height)
+            if x1 > x0 and y1 > y0:
+                canvas[y0:y1, x0:x1] = SENTINEL_COLOR
+                clipped.append((x0, y0, x1, y1))
+        draw(canvas)
+        self.render_count += 1
+
+        patches = []
+        for x0, y0, x1, y1 in clipped:
+            pixels = canvas[y0:y1, x0:x1].copy()
+            mask = cv2.bitwise_not(cv2.inRange(pixels, SENTINEL_COLOR, SENTINEL_COLOR))
+            if cv2.countNonZero(mask) == 0:
+                continue
+            # Text banners fill their whole box, so they are pasted without a mask
+            patches.append((x0, y0, pixels, None if cv2.countNonZero(mask) == mask.size else mask))
+        return patches
+
+    def apply(self, frame, layer, key, draw, boxes):
+        """Composite a layer onto frame, re-rendering it only if its key or the resolution changed
+
+        boxes() returns the (x0, y0, x1, y1) boxes draw() stays inside; it is only called on a re-render.
+        """
+        height, width = frame.shape[:2]
+        full_key = (width, height, key)
+        cached = self.layers.get(layer)
+        if cached is None or cached[0] != full_key:
+            cached = (full_key, self.render(width, height, draw, boxes()))
+            self.layers[layer] = cached
+
+        for x, y, pixels, mask in cached[1]:
+            h, w = pixels.shape[:2]
+            if mask is None:
+                frame[y:y+h, x:x+w] = pixels
+            else:
+                # cv2.copyTo writes through the ROI view in place and is far faster than np.copyto(where=...)
+                cv2.copyTo(pixels, mask, frame[y:y+h, x:x+w])
+
+    def clear(self):
+        """Drop every cached layer"""
+        self.layers = {}
+        self.scan_areas = {}
+        self.canvases = {}
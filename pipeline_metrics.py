@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# Pipeline stages timed by IDScanner, in pipeline order
+STAGES = ("capture", "decode", "preprocess", "ocr", "parse", "persist", "time_to_id")
+
+
+class Histogram:
+    """Latency histogram with fixed buckets (cumulative counts are derived when exported)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket that holds it"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if bucket_count and seen + bucket_count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+            lower = upper
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "sum_ms": round(self.total, 3), "mean_ms": round(self.mean(), 3),
+                "p50_ms": round(self.quantile(0.5), 3), "p95_ms": round(self.quantile(0.95), 3),
+                "max_ms": round(self.max, 3),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)}}
+
+
+class StageTimer:
+    """Context manager that records the time spent in a block"""
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class PipelineMetrics:
+    """Counters and per-stage latency histograms, exported as JSON or Prometheus text
+
+    Safe to update from the capture, OCR and store threads as well as the main loop.
+    """
+
+    def __init__(self, path=None, file_format="json", interval=5.0, prefix="idscanner"):
+        self.path = path
+        self.file_format = file_format
+        self.interval = interval
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.started_at = time.time()
+        self.last_write_time = time.time()
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, stage, value_ms):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(value_ms)
+
+    def time(self, stage):
+        """with metrics.time("parse"): ... records how long the block took"""
+        return StageTimer(self, stage)
+
+    def snapshot(self):
+        """Everything recorded so far as a JSON-friendly dict"""
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_s": round(time.time() - self.started_at, 3),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "stages": {stage: histogram.to_dict() for stage, histogram in self.histograms.items()},
+            }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+                lines.append(f"{self.prefix}_{name}_total {value}")
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {self.prefix}_{name} gauge")
+                lines.append(f"{self.prefix}_{name} {value}")
+            metric = f"{self.prefix}_stage_latency_ms"
+            lines.append(f"# TYPE {metric} histogram")
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.total:.3f}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Write the metrics file (replaced atomically so readers never see half a file)"""
+        if not self.path:
+            return
+        if self.file_format == "prometheus":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(content)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+
+    def maybe_write(self, now=None):
+        """Write the metrics file every interval seconds"""
+        now = time.time() if now is None else now
+        if not self.path or now - self.last_write_time < self.interval:
+            return False
+        self.last_write_time = now
+        self.write()
+        return True
+
+    def hud_lines(self):
+        """Short text lines for the on-screen debug HUD"""
+        snapshot = self.snapshot()
+        counters = snapshot["counters"]
+        gauges = snapshot["gauges"]
+        lines = [f"frames {gauges.get('frames_captured', 0)} read / {gauges.get('frames_dropped', 0)} dropped",
+                 f"ocr {counters.get('ocr_calls', 0)} calls, {counters.get('ocr_reads_with_fields', 0)} useful, "
+                 f"{counters.get('ocr_errors', 0)} errors",
+                 f"ids {counters.get('ids_completed', 0)} completed"]
+        for stage in STAGES:
+            stats = snapshot["stages"][stage]
+            if stats["count"]:
+                lines.append(f"{stage:<10} p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms  n={stats['count']}")
+        return lines
+
+
+def add_metrics_arguments(parser):
+    """Add the metrics file options to an argparse parser"""
+    parser.add_argument("--metrics-file", help="Write pipeline metrics to this file periodically")
+    parser.add_argument("--metrics-format", choices=("json", "prometheus"), default="json",
+                        help="Format of the metrics file")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="Seconds between metrics file writes")
+
+
+def create_metrics(args):
+    """Build PipelineMetrics from parsed command line arguments"""
+    return PipelineMetrics(args.metrics_file, args.metrics_format, args.metrics_interval)
@@ -0,0 +1,141 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class CardPresenceGate:
+    """Cheap per-frame check that decides when the scan area is worth OCR-ing"""
+
+    def __init__(self, min_edge_density=0.03, max_motion=6.0, stable_frames=4,
+                 rescan_interval=1.0, sample_width=160, min_background_change=10.0,
+                 background_rate=0.05, background_timeout=30.0):
+        self.min_edge_density = min_edge_density  # Fraction of edge pixels that means "something is there"
+        self.max_motion = max_motion              # Mean abs difference (0-255) still counted as steady
+        self.stable_frames = stable_frames        # Steady frames required before triggering OCR
+        self.rescan_interval = rescan_interval    # Minimum gap between OCR passes on the same card
+        self.sample_width = sample_width          # Region is downscaled to this width before analysis
+        # A textured background has edges too, so a card must also differ from the learned empty scene
+        self.min_background_change = min_background_change  # Mean abs difference from the background (0-255)
+        self.background_rate = background_rate        # How fast steady empty frames update the background
+        self.background_timeout = background_timeout  # A "card" still this long (s) is taken for background
+
+        self.previous_sample = None
+        self.background = None  # float32 sample of the empty scan area
+        self.replaced_background = None  # The one before a long-still scene was learned, for when it is removed
+        self.stable_count = 0
+        self.steady_since = None
+        self.card_present = False
+        self.last_trigger_time = None
+
+        # Stats
+        self.frames_checked = 0
+        self.frames_empty = 0
+        self.triggers = 0
+
+    def sample(self, region):
+        """Downscale the region to a small grayscale image"""
+        height, width = region.shape[:2]
+        scale = self.sample_width / float(width)
+        small = cv2.resize(region, (self.sample_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def measure(self, region):
+        """Return (edge_density, motion, background_change) for the region (the last two are None at first)
+
+        background_change is the difference from the closest known empty scene.
+        """
+        small = self.sample(region)
+        edges = cv2.Canny(small, 50, 150)
+        edge_density = np.count_nonzero(edges) / float(edges.size)
+
+        motion = None
+        if self.previous_sample is not None and self.previous_sample.shape == small.shape:
+            motion = float(cv2.absdiff(small, self.previous_sample).mean())
+        self.previous_sample = small
+
+        background_change = None
+        sample = small.astype(np.float32)
+        for background in (self.background, self.replaced_background):
+            if background is not None and background.shape == small.shape:
+                change = float(cv2.absdiff(sample, background).mean())
+                background_change = change if background_change is None else min(background_change, change)
+        return edge_density, motion, background_change
+
+    def learn_background(self, rate=None):
+        """Blend the latest sample into the empty-scene background (rate None replaces it)"""
+        sample = self.previous_sample.astype(np.float32)
+        if rate is None or self.background is None or self.background.shape != sample.shape:
+            self.background = sample
+        else:
+            cv2.accumulateWeighted(sample, self.background, rate)
+
+    def update(self, region, now=None):
+        """Feed one frame's scan region; returns True when OCR should run on it"""
+        now = time.time() if now is None else now
+        self.frames_checked += 1
+
+        edge_density, motion, background_change = self.measure(region)
+        steady = motion is not None and motion <= self.max_motion
+        # The first frame becomes the background, so a card is only seen once something arrives
+        present = (edge_density >= self.min_edge_density and background_change is not None and
+                   background_change >= self.min_background_change)
+
+        if present and steady:
+            if self.steady_since is None:
+                self.steady_since = now
+            elif now - self.steady_since >= self.background_timeout:
+                # Nobody holds a card this still for this long - the scene itself changed
+                # (something was left on the stand, the camera moved), so learn it as the background
+                print("Scan area unchanged for a long time - treating it as the empty background")
+                self.replaced_background = self.background
+                self.learn_background()
+                present = False
+        elif not steady:
+            self.steady_since = None
+
+        if not present:
+            if self.card_present:
+                print("Card removed from scan area")
+            self.card_present = False
+            self.stable_count = 0
+            self.steady_since = None
+            self.last_trigger_time = None
+            self.frames_empty += 1
+            if steady or self.background is None:
+                # Lighting drifts - keep the background current while nothing is in view
+                self.learn_background(self.background_rate)
+            return False
+
+        if not self.card_present:
+            print("Card entered scan area - waiting for it to settle")
+        self.card_present = True
+        self.stable_count = self.stable_count + 1 if steady else 0
+
+        if self.stable_count < self.stable_frames:
+            return False
+
+        if self.last_trigger_time is not None and now - self.last_trigger_time < self.rescan_interval:
+            return False
+
+        self.last_trigger_time = now
+        self.triggers += 1
+        return True
+
+    def defer(self):
+        """Undo the last trigger so the next steady frame triggers again (the frame was not good enough)"""
+        if self.last_trigger_time is not None:
+            self.last_trigger_time = None
+            self.triggers -= 1
+
+    def is_steady(self):
+        """True once the card has been still long enough to scan"""
+        return self.card_present and self.stable_count >= self.stable_frames
+
+    def reset(self):
+        """Forget the current card so the next steady frame triggers immediately"""
+        self.stable_count = 0
+        self.last_trigger_time = None
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+
+
+class RecentScanCache:
+    """Bounded, time-expiring cache of recently confirmed student numbers and their names
+
+    Least recently used entries are evicted once capacity is reached; entries older
+    than ttl seconds are treated as missing and dropped when they are next touched.
+    """
+
+    def __init__(self, capacity=256, ttl=900.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.entries = OrderedDict()  # student_no -> (name, confirmed_at)
+
+        # Counters for reporting
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, student_no, now=None):
+        """Return the cached name for a student number, or None"""
+        now = time.time() if now is None else now
+        entry = self.entries.get(student_no)
+        if entry is not None and now - entry[1] > self.ttl:
+            del self.entries[student_no]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(student_no)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, student_no, name, confirmed_at=None):
+        """Remember a confirmed student, evicting the least recently used entry if full"""
+        if not student_no or not name:
+            return
+        confirmed_at = time.time() if confirmed_at is None else confirmed_at
+        self.entries[student_no] = (name, confirmed_at)
+        self.entries.move_to_end(student_no)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def load(self, rows, now=None):
+        """Fill the cache from [(student_no, name, confirmed_at)] oldest first, skipping expired rows"""
+        now = time.time() if now is None else now
+        for student_no, name, confirmed_at in rows:
+            if now - confirmed_at <= self.ttl:
+                self.put(student_no, name, confirmed_at)
+
+    def clear(self):
+        self.entries.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / float(lookups) if lookups else 0.0
+
+    def stats(self):
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hit_rate(), 3), "evictions": self.evictions,
+                "expirations": self.expirations}
+
+    def summary(self):
+        return (f"Recent scans: {self.hits} hits / {self.hits + self.misses} lookups "
+                f"({self.hit_rate() * 100:.0f}%), {self.evictions} evicted, "
+                f"{self.expirations} expired, {len(self.entries)} cached")
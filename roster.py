@@ -0,0 +1,210 @@
+import csv
+import re
+
+NUMBER_ALPHABET = "0123456789-"
+
+# Characters tesseract commonly returns in place of digits
+DIGIT_CONFUSIONS = str.maketrans({"O": "0", "o": "0", "D": "0", "Q": "0", "I": "1", "l": "1", "i": "1",
+                                  "|": "1", "Z": "2", "z": "2", "S": "5", "s": "5", "B": "8", "G": "6",
+                                  "T": "7", "g": "9"})
+LOOSE_NUMBER_PATTERN = r'[0-9OoDQIli|ZzSsBGTg]{4}\s*-\s*[0-9OoDQIli|ZzSsBGTg]{2}'
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance between two strings
+
+    With a limit, gives up and returns limit + 1 as soon as the distance must exceed it.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def edits1(text, alphabet):
+    """Every string one substitution, deletion or insertion away from text"""
+    splits = [(text[:i], text[i:]) for i in range(len(text) + 1)]
+    deletes = [left + right[1:] for left, right in splits if right]
+    replaces = [left + c + right[1:] for left, right in splits if right for c in alphabet if c != right[0]]
+    inserts = [left + c + right for left, right in splits for c in alphabet]
+    return set(deletes + replaces + inserts)
+
+
+def normalize_name(name):
+    """Upper-case letters and single spaces only, so case and punctuation never count as errors"""
+    return " ".join(re.sub(r"[^A-Z ]", " ", name.upper()).split())
+
+
+class DeletionIndex:
+    """Nearest-word lookup by single-character deletions (symmetric delete)
+
+    Each word is stored under itself and every string one deletion away; a query
+    checks the same keys, which finds every word within edit distance 1 (and some
+    at 2) with a handful of dict lookups instead of a scan.
+    """
+
+    def __init__(self):
+        self.keys = {}
+
+    @staticmethod
+    def deletes(word):
+        return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+    def add(self, word):
+        for key in self.deletes(word):
+            self.keys.setdefault(key, set()).add(word)
+
+    def nearest(self, word, max_distance=1):
+        """Closest indexed words as (distance, [words]), or (None, []) if none are close enough"""
+        candidates = set()
+        for key in self.deletes(word):
+            candidates |= self.keys.get(key, set())
+        best_distance = None
+        best = []
+        for candidate in candidates:
+            distance = edit_distance(word, candidate)
+            if distance > max_distance:
+                continue
+            if best_distance is None or distance < best_distance:
+                best_distance, best = distance, [candidate]
+            elif distance == best_distance:
+                best.append(candidate)
+        return best_distance, best
+
+
+class RosterMatch:
+    """A read matched to an enrolled student"""
+
+    def __init__(self, student_no, name, number_distance=None, name_distance=None):
+        self.student_no = student_no
+        self.name = name
+        self.number_distance = number_distance  # None when no number was read
+        self.name_distance = name_distance      # None when no name was read
+
+    def corrected(self):
+        """True if the read differed from the roster record"""
+        return bool(self.number_distance) or bool(self.name_distance)
+
+    def confirmed(self, max_name_distance=2):
+        """Number and name both read and both point at this student"""
+        return (self.number_distance is not None and self.number_distance <= 1 and
+                self.name_distance is not None and self.name_distance <= max_name_distance)
+
+    def __repr__(self):
+        return (f"RosterMatch({self.student_no!r}, {self.name!r}, number_distance={self.number_distance}, "
+                f"name_distance={self.name_distance})")
+
+
+class Roster:
+    """Enrolled students indexed for exact and near-miss lookups by number and name"""
+
+    def __init__(self):
+        self.names = {}            # student_no -> name
+        self.by_name = {}          # normalized name -> [student_no]
+        self.name_words = DeletionIndex()
+
+    @classmethod
+    def load(cls, path):
+        """Load a CSV of student_no,name rows (a header row is skipped)"""
+        roster = cls()
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or not re.match(r'^\d{4}-\d{2}$', row[0].strip()):
+                    continue
+                roster.add(row[0].strip(), row[1].strip())
+        print(f"Roster loaded: {len(roster)} students from {path}")
+        return roster
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, student_no, name):
+        self.names[student_no] = name
+        normalized = normalize_name(name)
+        self.by_name.setdefault(normalized, []).append(student_no)
+        for word in normalized.split():
+            self.name_words.add(word)
+
+    def number_candidates(self, read):
+        """Enrolled numbers equal to the read, or else one edit away from it, as (distance, [student_no])"""
+        if read in self.names:
+            return 0, [read]
+        return 1, [candidate for candidate in edits1(read, NUMBER_ALPHABET) if candidate in self.names]
+
+    def closest_by_name(self, candidates, name_read, max_distance=4):
+        """Pick the candidate whose name is uniquely closest to the read, as (student_no, distance)"""
+        normalized = normalize_name(name_read)
+        exact = [candidate for candidate in self.by_name.get(normalized, []) if candidate in candidates]
+        if len(exact) == 1:
+            return exact[0], 0
+
+        best, best_distance, tied = None, max_distance + 1, False
+        for candidate in candidates:
+            # Candidates that cannot beat the current best are abandoned early
+            distance = edit_distance(normalized, normalize_name(self.names[candidate]), best_distance)
+            if distance < best_distance:
+                best, best_distance, tied = candidate, distance, False
+            elif distance == best_distance and best is not None:
+                tied = True
+        if best is None or tied:
+            return None, None
+        return best, best_distance
+
+    def match_name(self, read, max_word_distance=1):
+        """Return (student_no, distance) for a name that matches one student after per-word correction"""
+        words = normalize_name(read).split()
+        if not words:
+            return None
+        corrected = []
+        for word in words:
+            distance, best = self.name_words.nearest(word, max_word_distance)
+            if len(best) != 1:
+                return None
+            corrected.append(best[0])
+        students = self.by_name.get(" ".join(corrected), [])
+        if len(students) != 1:
+            return None
+        return students[0], edit_distance(normalize_name(read), " ".join(corrected))
+
+    def match(self, student_no_read="", name_read="", raw_text=""):
+        """Match a read to an enrolled student, or None if it cannot be matched unambiguously"""
+        number = student_no_read
+        if not number and raw_text:
+            # The strict \d{4}-\d{2} pattern missed it - look for a number with misread digits
+            loose = re.search(LOOSE_NUMBER_PATTERN, raw_text)
+            if loose:
+                number = re.sub(r"\s", "", loose.group()).translate(DIGIT_CONFUSIONS)
+
+        if number:
+            number_distance, candidates = self.number_candidates(number)
+            if len(candidates) == 1:
+                name_distance = None
+                if name_read:
+                    name_distance = edit_distance(normalize_name(name_read), normalize_name(self.names[candidates[0]]))
+                if number_distance == 0 and name_distance is not None and name_distance > 2:
+                    # The misread may have landed exactly on another enrolled number - check its neighbours
+                    neighbours = [read for read in edits1(number, NUMBER_ALPHABET) if read in self.names]
+                    student_no, closer = self.closest_by_name(neighbours, name_read, name_distance - 1)
+                    if student_no is not None:
+                        return RosterMatch(student_no, self.names[student_no], 1, closer)
+                return RosterMatch(candidates[0], self.names[candidates[0]], number_distance, name_distance)
+            if len(candidates) > 1 and name_read:
+                # A misread digit in a dense roster can land next to several numbers - the name decides
+                student_no, name_distance = self.closest_by_name(candidates, name_read)
+                if student_no is not None:
+                    return RosterMatch(student_no, self.names[student_no], number_distance, name_distance)
+
+        name_match = self.match_name(name_read) if name_read else None
+        if name_match is not None:
+            student_no, name_distance = name_match
+            return RosterMatch(student_no, self.names[student_no], None, name_distance)
+        return None
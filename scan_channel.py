@@ -0,0 +1,128 @@
+import json
+import os
+import queue
+import sys
+import time
+
+
+class ScanRecord:
+    """One completed scan handed from the scanner to the confirmation screen"""
+
+    def __init__(self, student_no, name, timestamp=None, confidence=None, source="", repeat=False):
+        self.student_no = student_no
+        self.name = name
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.confidence = confidence or {}  # field -> 0..1 agreement between OCR passes
+        self.source = source
+        self.repeat = repeat  # Student was confirmed recently; the name came from the recent-scan cache
+
+    def to_dict(self):
+        return {
+            "student_no": self.student_no,
+            "name": self.name,
+            "timestamp": self.timestamp,
+            "confidence": self.confidence,
+            "source": self.source,
+            "repeat": self.repeat,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("student_no", ""), data.get("name", ""), data.get("timestamp"),
+                   data.get("confidence"), data.get("source", ""), data.get("repeat", False))
+
+    def __repr__(self):
+        return f"ScanRecord({self.student_no!r}, {self.name!r}, confidence={self.confidence})"
+
+
+class QueueChannel:
+    """In-process channel for when scanner and confirmation share one process (kiosk)"""
+
+    def __init__(self, maxsize=16):
+        self.queue = queue.Queue(maxsize)
+
+    def send(self, record):
+        self.queue.put(record)
+        return True
+
+    def receive(self, timeout=None):
+        """Return the next ScanRecord, or None if nothing arrives (non-blocking when timeout is None)"""
+        try:
+            if timeout is None:
+                return self.queue.get_nowait()
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class PipeChannel:
+    """Records as JSON lines over a pipe, e.g. the stdin of a launched confirmation process"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def send(self, record):
+        try:
+            self.stream.write((json.dumps(record.to_dict()) + "\n").encode("utf-8"))
+            self.stream.flush()
+            return True
+        except Exception as e:
+            print(f"Error sending scan record: {e}")
+            return False
+
+    def receive(self, timeout=None):
+        try:
+            line = self.stream.readline()
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            return ScanRecord.from_dict(json.loads(line)) if line.strip() else None
+        except Exception as e:
+            print(f"Error reading scan record: {e}")
+            return None
+
+    def close(self):
+        try:
+            self.stream.close()
+        except Exception:
+            pass
+
+
+class FileChannel:
+    """Compatibility fallback: the old two-line temp_scan_data.txt handoff"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, record):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(self.path, "w") as f:
+                f.write(f"{record.student_no}\n")
+                f.write(f"{record.name}\n")
+            print(f"Temp data saved to: {self.path}")
+            return True
+        except Exception as e:
+            print(f"Error saving temp data: {e}")
+            return False
+
+    def receive(self, timeout=None):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as f:
+            lines = f.readlines()
+        student_no = lines[0].strip() if len(lines) > 0 else "Not found"
+        name = lines[1].strip() if len(lines) > 1 else "Not found"
+        return ScanRecord(student_no, name, timestamp=os.path.getmtime(self.path), source="file")
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def receive_from_stdin():
+    """Read a record piped in by the scanner, or None if stdin is a terminal or empty"""
+    if sys.stdin is None or sys.stdin.isatty():
+        return None
+    return PipeChannel(sys.stdin).receive()
@@ -0,0 +1,25 @@
+import json
+import sys
+import threading
+import time
+
+
+class JsonLinesEventSink:
+    """Writes scanner events as one JSON object per line"""
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.lock = threading.Lock()  # Several scan lanes may share one sink
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str) + "\n"
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+def make_event(event_type, **data):
+    """Build an event dict with a type and timestamp"""
+    event = {"event": event_type, "timestamp": time.time()}
+    event.update(data)
+    return event
@@ -0,0 +1,285 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+# Items allowed to wait between stages. Frame and OCR queues drop their oldest item
+# when full, so a slow stage always works on the newest card image.
+FRAME_QUEUE_SIZE = 2
+PREPROCESS_QUEUE_SIZE = 1
+OCR_QUEUE_SIZE = 1
+RESULT_QUEUE_SIZE = 8
+PERSIST_QUEUE_SIZE = 64
+
+
+class DropOldestQueue(asyncio.Queue):
+    """Bounded asyncio queue whose put_latest never waits: when full, the oldest item is dropped"""
+
+    def __init__(self, maxsize, name, metrics=None):
+        super().__init__(maxsize)
+        self.name = name
+        self.metrics = metrics
+        self.dropped = 0
+
+    def put_latest(self, item):
+        while self.full():
+            self.get_nowait()
+            self.task_done()
+            self.dropped += 1
+            if self.metrics is not None:
+                self.metrics.increment(f"queue_{self.name}_dropped")
+        self.put_nowait(item)
+
+
+class AsyncScanPipeline:
+    """Runs an IDScanner as explicit asyncio stages connected by bounded queues
+
+    capture -> gate -> preprocess -> OCR -> extract -> persist, plus a display stage
+    when there is a window. The event loop thread only runs the cheap, stateful steps
+    (presence gate, voting, events); camera reads, OpenCV work and OCR run in executors,
+    so a camera reconnect or a slow OCR call never stalls display or persistence.
+    """
+
+    def __init__(self, scanner, max_failures=10):
+        self.scanner = scanner
+        self.max_failures = max_failures
+        metrics = scanner.metrics
+        self.frames = DropOldestQueue(FRAME_QUEUE_SIZE, "frames", metrics)
+        self.to_preprocess = DropOldestQueue(PREPROCESS_QUEUE_SIZE, "preprocess", metrics)
+        self.to_ocr = DropOldestQueue(OCR_QUEUE_SIZE, "ocr", metrics)
+        self.to_display = DropOldestQueue(1, "display", metrics)
+        # Results and completed scans are never dropped - their producers wait instead
+        self.results = asyncio.Queue(RESULT_QUEUE_SIZE)
+        self.to_persist = asyncio.Queue(PERSIST_QUEUE_SIZE)
+
+        # Capture blocks on the camera and OpenCV work blocks the CPU; each gets its own thread
+        self.capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+        self.cv_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preprocess")
+        # OCR reuses the scanner's worker pool and backend
+        self.ocr_pool = scanner.ocr_executor.pool
+        self.ocr_function = scanner.ocr_executor.pool_function
+        self.ocr_workers = scanner.ocr_executor.max_workers
+
+        self.next_job_id = 0
+        self.confirmation_record = None
+        self.stopping = None
+        self.loop = None
+        self.window_name = "Auto ID Scanner - Live Feed"
+
+    def stop(self):
+        """Ask the pipeline to shut down (safe to call from any thread)"""
+        self.scanner.stop_requested = True
+        if self.loop is not None and self.stopping is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    def enqueue_persist(self, record, text, scan_time):
+        """Persist handler given to the scanner; falls back to a direct write if the stage is backed up"""
+        try:
+            self.to_persist.put_nowait((record, text, scan_time))
+        except asyncio.QueueFull:
+            self.scanner.metrics.increment("persist_queue_full")
+            self.scanner.persist_scan(record, text, scan_time)
+
+    def request_confirmation(self, record):
+        """Confirmation handler given to the scanner: stop now, confirm once queued scans are stored
+
+        launch_confirmation closes the store and exits the process, so it must not run inside a stage.
+        """
+        self.confirmation_record = record
+        self.stop()
+
+    async def capture_stage(self):
+        """Pull frames from the capture thread; retries and reconnect waits happen on that thread"""
+        grabber = self.scanner.frame_grabber
+        grabber.start()
+        lossless = grabber.lossless
+        last_frame_id = 0
+        failures = 0
+        while not self.scanner.stop_requested:
+            replay_finished = grabber.finished
+            latest = await self.loop.run_in_executor(self.capture_executor, grabber.read_latest, last_frame_id, 0.05)
+            if latest is None:
+                if replay_finished:
+                    print("End of replay reached")
+                    return
+                continue
+            last_frame_id, ret, frame = latest
+            if not ret or frame is None:
+                failures += 1
+                print(f"Failed to read frame ({failures}/{self.max_failures})")
+                self.scanner.emit_event("camera_error", failures=failures)
+                if failures >= self.max_failures:
+                    print("Too many consecutive failures, exiting...")
+                    self.stop()
+                    return
+                continue
+            failures = 0
+            if lossless:
+                # Replays are processed frame by frame so runs stay repeatable
+                await self.frames.put((time.time(), frame))
+            else:
+                self.frames.put_latest((time.time(), frame))
+
+    async def gate_stage(self):
+        """Presence gate and best-frame selection on every frame"""
+        scanner = self.scanner
+        while True:
+            captured_at, frame = await self.frames.get()
+            try:
+                height, width = frame.shape[:2]
+                scan_area = scanner.overlay_cache.scan_area(width, height, scanner.calculate_scan_area)
+                if scanner.scanning_active:
+                    selected = scanner.gate_frame(frame, scan_area, captured_at)
+                    if selected is not None:
+                        self.to_preprocess.put_latest((captured_at, scanner.card_count, selected))
+                scanner.update_metrics()
+                if not scanner.headless:
+                    self.to_display.put_latest(frame)
+                scanner.frame_grabber.mark_displayed()
+                scanner.frame_grabber.maybe_report()
+            finally:
+                self.frames.task_done()
+
+    def is_stale(self, card):
+        """True if work started for a card that has since left or already been read"""
+        scanner = self.scanner
+        return card != scanner.card_count or scanner.awaiting_card_removal or not scanner.scanning_active
+
+    async def preprocess_stage(self):
+        """Code decoding, card location and crop preprocessing in the OpenCV executor"""
+        scanner = self.scanner
+        while True:
+            scan_time, card, (frame, scan_region) = await self.to_preprocess.get()
+            try:
+                if scanner.code_attempt_due():
+                    reading = await self.loop.run_in_executor(self.cv_executor, scanner.read_code, scan_region)
+                    if reading is not None and not self.is_stale(card):
+                        if scanner.handle_code_reading(reading, scan_time):
+                            continue
+                if self.is_stale(card):
+                    continue
+                regions = await self.loop.run_in_executor(self.cv_executor, scanner.prepare_regions,
+                                                          frame, scan_region)
+                self.next_job_id += 1
+                self.to_ocr.put_latest((self.next_job_id, time.time(), scan_time, card, regions))
+                scanner.metrics.increment("ocr_calls")
+                scanner.tracer.instant("ocr_submitted", card=card, job=self.next_job_id)
+            finally:
+                self.to_preprocess.task_done()
+
+    async def ocr_stage(self):
+        """One OCR worker; the pipeline runs as many of these as the pool has workers"""
+        while True:
+            job_id, submitted_at, scan_time, card, regions = await self.to_ocr.get()
+            try:
+                started_at = time.time()
+                try:
+                    texts, error = await self.loop.run_in_executor(self.ocr_pool, self.ocr_function, regions), None
+                except Exception as e:
+                    texts, error = {}, e
+                await self.results.put((job_id, submitted_at, started_at, time.time(), scan_time, card, texts, error))
+            finally:
+                self.to_ocr.task_done()
+
+    async def extract_stage(self):
+        """Field extraction, voting and events on the loop thread"""
+        scanner = self.scanner
+        while True:
+            job_id, submitted_at, started_at, finished_at, scan_time, card, texts, error = await self.results.get()
+            try:
+                scanner.metrics.observe("ocr", (finished_at - submitted_at) * 1000)
+                scanner.tracer.complete("ocr_wait", submitted_at, started_at, "ocr", thread="OCR pool", job=job_id)
+                scanner.tracer.complete("ocr", started_at, finished_at, "ocr", thread="OCR pool", job=job_id,
+                                        error=str(error or ""))
+                if error is not None:
+                    print(f"OCR Error: {error}")
+                    scanner.metrics.increment("ocr_errors")
+                    continue
+                if self.is_stale(card):
+                    scanner.metrics.increment("ocr_results_stale")
+                    continue
+                with scanner.tracer.span("handle_ocr_result", job=job_id, card=card):
+                    scanner.handle_ocr_text(texts, scan_time)
+            finally:
+                self.results.task_done()
+
+    async def persist_stage(self):
+        """Hand completed scans to the scan store (its writer thread batches the commits)"""
+        while True:
+            record, text, scan_time = await self.to_persist.get()
+            try:
+                self.scanner.persist_scan(record, text, scan_time)
+            finally:
+                self.to_persist.task_done()
+
+    async def display_stage(self):
+        """Overlay and window for the newest gated frame"""
+        cv2.namedWindow(self.window_name, cv2.WND_PROP_FULLSCREEN)
+        cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        while True:
+            frame = await self.to_display.get()
+            try:
+                self.scanner.draw_scan_overlay(frame)
+                cv2.imshow(self.window_name, frame)
+                if not self.scanner.handle_key(cv2.waitKey(1) & 0xFF):
+                    self.stop()
+            finally:
+                self.to_display.task_done()
+
+    async def drain(self):
+        """Wait until everything captured so far has passed through every stage"""
+        for queue in (self.frames, self.to_preprocess, self.to_ocr, self.results, self.to_persist):
+            await queue.join()
+
+    async def run_async(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.scanner.persist_handler = self.enqueue_persist
+        self.scanner.confirmation_handler = self.request_confirmation
+        stages = [self.gate_stage(), self.preprocess_stage(), self.extract_stage(), self.persist_stage()]
+        stages += [self.ocr_stage() for _ in range(self.ocr_workers)]
+        if not self.scanner.headless:
+            stages.append(self.display_stage())
+        tasks = [asyncio.create_task(stage) for stage in stages]
+        capture = asyncio.create_task(self.capture_stage())
+        stop_wait = asyncio.create_task(self.stopping.wait())
+        try:
+            await asyncio.wait([capture, stop_wait], return_when=asyncio.FIRST_COMPLETED)
+            if capture.done() and not self.scanner.stop_requested:
+                # End of a replay: let the last frames run through before shutting down
+                await self.drain()
+        finally:
+            for task in tasks + [capture, stop_wait]:
+                task.cancel()
+            await asyncio.gather(*tasks, capture, stop_wait, return_exceptions=True)
+            # Completed scans still queued must reach the store even on Ctrl+C
+            while not self.to_persist.empty():
+                record, text, scan_time = self.to_persist.get_nowait()
+                self.scanner.persist_scan(record, text, scan_time)
+            self.scanner.persist_handler = None
+            self.scanner.confirmation_handler = None
+
+    def run(self):
+        """Run until the replay ends, the user quits or stop() is called"""
+        scanner = self.scanner
+        if not scanner.frame_source.is_opened():
+            print("❌ No camera available. Exiting...")
+            scanner.emit_event("camera_error", message="No camera available")
+            return
+        print(f"✓ ID Scanner Started as an async pipeline ({scanner.frame_source.name})")
+        scanner.emit_event("started", source=scanner.frame_source.name)
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            print("\nScanner stopped by user")
+        # Capture first, so an in-flight camera read cannot outlive the executor
+        scanner.frame_grabber.stop()
+        self.capture_executor.shutdown(wait=True)
+        self.cv_executor.shutdown(wait=True)
+        print("Queue drops: " + ", ".join(f"{queue.name} {queue.dropped}" for queue in
+                                          (self.frames, self.to_preprocess, self.to_ocr, self.to_display)))
+        scanner.finish_run()
+        if self.confirmation_record is not None:
+            print("Launching confirmation screen...")
+            scanner.launch_confirmation(self.confirmation_record)
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_STORE_PATH = "id_scans.db"
+
+RAW = "raw"
+CONFIRMED = "confirmed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    student_no TEXT NOT NULL,
+    name TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    raw_text TEXT,
+    confidence TEXT,
+    source TEXT,
+    imported_from TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS scans_student_time ON scans (student_no, kind, scanned_at);
+CREATE INDEX IF NOT EXISTS scans_kind_time ON scans (kind, scanned_at);
+"""
+
+INSERT = ("INSERT OR IGNORE INTO scans (kind, student_no, name, scanned_at, raw_text, confidence, source, imported_from) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+class ScanStore:
+    """Raw and confirmed scans in one SQLite database (WAL mode), indexed by student number and time
+
+    Writes are queued and committed in batches by a background thread, so a scan
+    never waits on the disk; call flush() when a write must be on disk before continuing.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, batch_size=50, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # One connection shared by the writer thread and readers, guarded by the lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+        self.lock = threading.Lock()
+        self.pending_changed = threading.Condition(self.lock)
+        self.pending = []
+        self.written_count = 0
+        self.batch_count = 0
+        self.metrics = None  # Optional PipelineMetrics that receives batch write timings
+        self.tracer = None   # Optional ScanTracer that records each batch write as a span
+
+        self.running = True
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    def add(self, kind, student_no, name, scanned_at=None, raw_text=None, confidence=None,
+            source=None, imported_from=None):
+        """Queue one scan for the next batch"""
+        scanned_at = time.time() if scanned_at is None else scanned_at
+        row = (kind, student_no, name, scanned_at, raw_text,
+               json.dumps(confidence) if confidence else None, source, imported_from)
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.batch_size:
+                self.pending_changed.notify_all()
+
+    def add_raw(self, student_no, name, scanned_at=None, raw_text=None, confidence=None, source=None):
+        """Queue an OCR detection"""
+        self.add(RAW, student_no, name, scanned_at, raw_text, confidence, source)
+
+    def add_confirmed(self, student_no, name, scanned_at=None, confidence=None, source=None):
+        """Queue a scan confirmed on the confirmation screen"""
+        self.add(CONFIRMED, student_no, name, scanned_at, None, confidence, source)
+
+    def _write_pending(self):
+        """Commit everything queued so far in one transaction (lock must be held)"""
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        start = time.perf_counter()
+        start_time = time.time()
+        with self.connection:
+            self.connection.executemany(INSERT, rows)
+        if self.tracer is not None:
+            self.tracer.complete("store_write", start_time, time.time(), "persist", rows=len(rows))
+        self.written_count += len(rows)
+        self.batch_count += 1
+        if self.metrics is not None:
+            self.metrics.observe("persist", (time.perf_counter() - start) * 1000)
+            self.metrics.increment("scans_persisted", len(rows))
+
+    def _writer_loop(self):
+        """Commit batches when they fill up or flush_interval passes"""
+        with self.lock:
+            while self.running:
+                self.pending_changed.wait(self.flush_interval)
+                try:
+                    self._write_pending()
+                except sqlite3.Error as e:
+                    print(f"Error writing scans: {e}")
+
+    def flush(self):
+        """Write queued scans now"""
+        with self.lock:
+            self._write_pending()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        if not self.running:
+            return
+        with self.lock:
+            self.running = False
+            self.pending_changed.notify_all()
+        self.thread.join(timeout=5.0)
+        with self.lock:
+            self._write_pending()
+            self.connection.close()
+
+    def query(self, sql, params=()):
+        """Run a read query after flushing queued writes so results include them"""
+        with self.lock:
+            self._write_pending()
+            return self.connection.execute(sql, params).fetchall()
+
+    def last_confirmed(self, student_no, since=None):
+        """Time of the latest confirmed scan of a student (optionally only after since), or None"""
+        rows = self.query("SELECT MAX(scanned_at) FROM scans WHERE student_no = ? AND kind = ? AND scanned_at >= ?",
+                          (student_no, CONFIRMED, since or 0))
+        return rows[0][0]
+
+    def recent_confirmed(self, since):
+        """Confirmed scans after since as [(student_no, name, scanned_at)], oldest first"""
+        return self.query("SELECT student_no, name, scanned_at FROM scans WHERE kind = ? AND scanned_at >= ? "
+                          "ORDER BY scanned_at", (CONFIRMED, since))
+
+    def confirmed_today(self, student_no):
+        """True if the student has already been confirmed since midnight"""
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        return self.last_confirmed(student_no, midnight) is not None
+
+    def history(self, student_no, kind=None, limit=20):
+        """Latest scans of a student as [(kind, name, scanned_at)], newest first"""
+        if kind is None:
+            return self.query("SELECT kind, name, scanned_at FROM scans WHERE student_no = ? "
+                              "ORDER BY scanned_at DESC LIMIT ?", (student_no, limit))
+        return self.query("SELECT kind, name, scanned_at FROM scans WHERE student_no = ? AND kind = ? "
+                          "ORDER BY scanned_at DESC LIMIT ?", (student_no, kind, limit))
+
+    def count(self, kind=None, since=None):
+        """Number of stored scans, optionally of one kind and after since"""
+        if kind is None:
+            return self.query("SELECT COUNT(*) FROM scans WHERE scanned_at >= ?", (since or 0,))[0][0]
+        return self.query("SELECT COUNT(*) FROM scans WHERE kind = ? AND scanned_at >= ?",
+                          (kind, since or 0))[0][0]
+
+
+def parse_scan_text_file(path):
+    """Read an id_scan_*.txt or confirmed_scan_*.txt file into a dict, or None if it is not one"""
+    with open(path, "r", errors="replace") as f:
+        content = f.read()
+
+    date_match = re.search(r"^(Scan|Confirmation) Date: (.+)$", content, re.MULTILINE)
+    student_match = re.search(r"^STUDENT NO: (.*)$", content, re.MULTILINE)
+    name_match = re.search(r"^NAME: (.*)$", content, re.MULTILINE)
+    if not date_match or not student_match:
+        return None
+
+    try:
+        scanned_at = datetime.strptime(date_match.group(2).strip(), "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        scanned_at = os.path.getmtime(path)
+
+    raw_text = None
+    if "Raw OCR Text:" in content:
+        raw_text = content.split("Raw OCR Text:", 1)[1].strip()
+
+    return {
+        "kind": CONFIRMED if date_match.group(1) == "Confirmation" else RAW,
+        "student_no": student_match.group(1).strip(),
+        "name": name_match.group(1).strip() if name_match else "",
+        "scanned_at": scanned_at,
+        "raw_text": raw_text,
+    }
+
+
+def import_text_files(store, directory):
+    """Import every scan text file in a directory; files imported before are skipped"""
+    before = store.count()
+    skipped = 0
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".txt"):
+            continue
+        path = os.path.abspath(os.path.join(directory, filename))
+        try:
+            scan = parse_scan_text_file(path)
+        except OSError as e:
+            print(f"Could not read {path}: {e}")
+            scan = None
+        if scan is None:
+            skipped += 1
+            continue
+        store.add(scan["kind"], scan["student_no"], scan["name"], scan["scanned_at"],
+                  raw_text=scan["raw_text"], source="import", imported_from=path)
+    imported = store.count() - before
+    print(f"Imported {imported} scans from {directory} ({skipped} files skipped)")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan store tools")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="Path of the scan database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import id_text_output / confirmed_scans text files")
+    import_parser.add_argument("directories", nargs="+")
+    lookup_parser = commands.add_parser("lookup", help="Show the scans of one student")
+    lookup_parser.add_argument("student_no")
+    args = parser.parse_args()
+
+    store = ScanStore(args.db)
+    try:
+        if args.command == "import":
+            for directory in args.directories:
+                import_text_files(store, directory)
+            print(f"{store.count(RAW)} raw and {store.count(CONFIRMED)} confirmed scans in {args.db}")
+        elif args.command == "lookup":
+            for kind, name, scanned_at in store.history(args.student_no):
+                print(f"{datetime.fromtimestamp(scanned_at):%Y-%m-%d %H:%M:%S}  {kind:<9}  {name}")
+    finally:
+        store.close()
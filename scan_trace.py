@@ -0,0 +1,151 @@
+import collections
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    """Returned by a disabled tracer so `with tracer.span(...)` costs next to nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = repr(exc)
+        self.tracer.complete(self.name, self.start, time.time(), self.category, **self.args)
+        return False
+
+
+class ScanTracer:
+    """Opt-in span recorder for individual scans, dumped as Chrome/Perfetto trace JSON
+
+    Spans go into a fixed-size ring buffer, so tracing can stay on for a whole session;
+    the buffer is written out on demand, and the spans of any scan that takes longer than
+    slow_threshold_ms are written on a background thread.
+    Open the files in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, enabled=False, capacity=20000, slow_threshold_ms=None, output_dir="traces"):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.output_dir = output_dir
+        # deque.append is atomic, so capture, OCR and store threads can record without a lock
+        self.events = collections.deque(maxlen=capacity)
+        self.thread_names = {}
+        self.pid = os.getpid()
+        self.dump_count = 0
+
+    def span(self, name, category="scan", **args):
+        """with tracer.span("parse", job=3): ... records the block as one span"""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def complete(self, name, start, end, category="scan", thread=None, **args):
+        """Record a span from time.time() start/end values, e.g. one measured on another thread"""
+        if not self.enabled:
+            return
+        if thread is None:
+            tid = threading.get_ident()
+            if tid not in self.thread_names:
+                self.thread_names[tid] = threading.current_thread().name
+        else:
+            # Named pseudo-thread for work timed elsewhere (worker processes, the OCR pool)
+            tid = thread
+            self.thread_names.setdefault(tid, thread)
+        self.events.append({"name": name, "cat": category, "ph": "X", "ts": start * 1e6,
+                            "dur": max(end - start, 0.0) * 1e6, "pid": self.pid, "tid": tid, "args": args})
+
+    def instant(self, name, category="scan", **args):
+        """Record a point in time (shown as a marker)"""
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        self.thread_names.setdefault(tid, threading.current_thread().name)
+        self.events.append({"name": name, "cat": category, "ph": "i", "s": "t", "ts": time.time() * 1e6,
+                            "pid": self.pid, "tid": tid, "args": args})
+
+    def to_chrome_trace(self, events=None):
+        """Buffered events (or the given ones) plus thread-name metadata in Chrome trace format"""
+        events = list(self.events) if events is None else events
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in list(self.thread_names.items())]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def trace_path(self, reason):
+        """Path of the next trace file"""
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+        self.dump_count += 1
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.output_dir, f"trace_{timestamp}_{self.dump_count:03d}_{reason}.json")
+
+    def write_trace(self, path, events, since=None):
+        """Write events (only those still running at or after the time.time() value since) to path"""
+        if since is not None:
+            since_us = since * 1e6
+            events = [event for event in events if event["ts"] + event.get("dur", 0.0) >= since_us]
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(events), f)
+        print(f"Trace written to: {path} ({len(events)} events)")
+
+    def dump(self, reason="manual"):
+        """Write the ring buffer to a new trace file and return its path (None if tracing is off)"""
+        if not self.enabled:
+            return None
+        path = self.trace_path(reason)
+        self.write_trace(path, list(self.events))
+        return path
+
+    def check_slow(self, latency_ms, **args):
+        """Write the spans of a scan that took longer than the threshold; returns the file path or None
+
+        Only the scan's own time window is kept, and the file is written on a background
+        thread, so recording a stall does not add to it. Copying the buffer is the only work done here.
+        """
+        if not self.enabled or self.slow_threshold_ms is None or latency_ms < self.slow_threshold_ms:
+            return None
+        self.instant("slow_scan", latency_ms=round(latency_ms, 1), **args)
+        since = time.time() - latency_ms / 1000.0
+        path = self.trace_path("slow")
+        # Not a daemon, so a slow scan's trace is still finished if the scanner exits right after
+        threading.Thread(target=self.write_trace, args=(path, list(self.events), since),
+                         name="trace-writer").start()
+        return path
+
+
+def add_trace_arguments(parser):
+    """Add the tracing options to an argparse parser"""
+    parser.add_argument("--trace", action="store_true",
+                        help="Record per-scan spans ('t' or SIGUSR1 writes a Chrome trace file)")
+    parser.add_argument("--trace-slow-ms", type=float,
+                        help="Also write a trace whenever a scan takes longer than this many ms")
+    parser.add_argument("--trace-dir", default="traces", help="Folder for trace files")
+    parser.add_argument("--trace-capacity", type=int, default=20000, help="Number of spans kept in memory")
+
+
+def create_tracer(args):
+    """Build a ScanTracer from parsed command line arguments"""
+    return ScanTracer(enabled=args.trace or args.trace_slow_ms is not None, capacity=args.trace_capacity,
+                      slow_threshold_ms=args.trace_slow_ms, output_dir=args.trace_dir)
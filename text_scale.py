@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+
+# Tesseract is most accurate when capital letters are roughly 20-40 px tall; much
+# smaller and glyphs lose strokes, much larger and it only costs time.
+DEFAULT_TEXT_HEIGHT = 30
+DEFAULT_TOLERANCE = (22, 40)  # Crops whose text is already in this range are left alone
+
+
+class TextScaler:
+    """Resamples OCR crops so their text lands in tesseract's preferred height range
+
+    Text height is estimated from the connected components of an Otsu-binarised copy
+    of the crop (median height of character-shaped blobs), falling back to the runs of
+    inked rows in the horizontal projection when characters are merged or broken.
+    """
+
+    def __init__(self, target_height=DEFAULT_TEXT_HEIGHT, tolerance=DEFAULT_TOLERANCE,
+                 min_scale=0.25, max_scale=4.0, min_components=3, sample_width=480):
+        self.target_height = target_height
+        self.tolerance = tolerance
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.min_components = min_components
+        self.sample_width = sample_width  # Wider crops are measured on a downscaled copy
+
+        # Stats
+        self.crops_checked = 0
+        self.crops_rescaled = 0
+        self.crops_unmeasured = 0
+        self.last_text_height = None
+        self.last_scale = 1.0
+
+    @staticmethod
+    def binarize(gray):
+        """Dark text on a light card becomes white-on-black for component analysis"""
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        return binary
+
+    def height_from_components(self, binary):
+        """Median height of blobs that look like characters, or None if there are too few"""
+        crop_height = binary.shape[0]
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        # Row 0 is the background
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        fill = areas / np.maximum(widths * heights, 1)
+        # Drop specks, card borders and underlines, and solid blocks like photos
+        keep = ((heights >= 4) & (heights < crop_height * 0.9) &
+                (widths <= heights * 3) & (fill > 0.1) & (fill < 0.95))
+        if np.count_nonzero(keep) < self.min_components:
+            return None
+        return float(np.median(heights[keep]))
+
+    def height_from_projection(self, binary):
+        """Median height of the bands of rows that contain ink, or None if there are none"""
+        inked = (np.count_nonzero(binary, axis=1) > binary.shape[1] * 0.01).astype(np.int8)
+        # Rising and falling edges of the inked rows give the text line bands
+        edges = np.diff(np.concatenate(([0], inked, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        heights = ends - starts
+        heights = heights[(heights >= 4) & (heights < binary.shape[0] * 0.9)]
+        if heights.size == 0:
+            return None
+        return float(np.median(heights))
+
+    def estimate_text_height(self, gray):
+        """Typical character height in pixels, or None if no text could be measured"""
+        factor = 1.0
+        if gray.shape[1] > self.sample_width:
+            factor = gray.shape[1] / float(self.sample_width)
+            gray = cv2.resize(gray, (self.sample_width, max(1, int(gray.shape[0] / factor))),
+                              interpolation=cv2.INTER_AREA)
+        binary = self.binarize(gray)
+        height = self.height_from_components(binary)
+        if height is None:
+            height = self.height_from_projection(binary)
+        return height * factor if height is not None else None
+
+    def scale_for(self, gray):
+        """Resize factor that brings the crop's text to target_height (1.0 if already fine)"""
+        text_height = self.estimate_text_height(gray)
+        self.last_text_height = text_height
+        if text_height is None:
+            return 1.0
+        low, high = self.tolerance
+        if low <= text_height <= high:
+            return 1.0
+        return min(max(self.target_height / text_height, self.min_scale), self.max_scale)
+
+    def rescale(self, gray):
+        """Return the grayscale crop resampled so its text is a good size for tesseract"""
+        self.crops_checked += 1
+        scale = self.scale_for(gray)
+        self.last_scale = scale
+        if self.last_text_height is None:
+            self.crops_unmeasured += 1
+        if scale == 1.0:
+            return gray
+        self.crops_rescaled += 1
+        # INTER_AREA averages when shrinking; INTER_CUBIC keeps strokes smooth when enlarging
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        height, width = gray.shape[:2]
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        return cv2.resize(gray, size, interpolation=interpolation)
+
+    def summary(self):
+        return (f"{self.crops_rescaled}/{self.crops_checked} OCR crops rescaled "
+                f"({self.crops_unmeasured} without measurable text)")